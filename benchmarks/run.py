@@ -0,0 +1,211 @@
+"""
+Search benchmarks over the fixed position corpus in benchmarks/positions.json.
+
+Every engine is run on every corpus position (AI to move) at each of its
+depths, starting from an empty transposition table and a fixed random
+seed, so node counts are reproducible and only the timings vary.  For each
+engine/depth the report has the total time (time-to-depth over the
+corpus, best of ``--repeat`` runs), nodes, nodes/sec, the transposition
+table hit rate, cutoff and branching statistics from models.ai.stats and
+the peak traced memory.  ``evaluate_board`` is timed separately as
+evaluations/sec.  ``--board bitboard`` runs everything on BitBoards
+(searched in place with play/undo) instead of string boards; node counts
+are the same for both.
+
+    python -m benchmarks.run --out results.json
+    python -m benchmarks.run --save-baseline              # writes benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+    python -m benchmarks.run --board bitboard --compare benchmarks/baseline.json
+
+Compare mode exits with status 1 if any metric regressed by more than
+``--threshold``: fewer nodes/sec or evaluations/sec, more time, more
+memory, or a different node count.  Node counts are deterministic, so
+any change to them is flagged.
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from models.bitboard import BitBoard
+from models.constants import AI_PIECE
+from models.heuristics import evaluate_board
+from models.ai import minimax_noprune as noprune_module
+from models.ai.minimax import minimax, _transposition_table_ab
+from models.ai.minimax_noprune import minimax_noprune
+from models.ai.expectiminimax import expectiminimax, _transposition_table_em
+from models.ai.stats import SearchStats
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CORPUS_PATH = os.path.join(HERE, "positions.json")
+BASELINE_PATH = os.path.join(HERE, "baseline.json")
+SEED = 12345
+# --board choice -> conversion of a corpus string board
+BOARD_TYPES = {"string": str, "bitboard": BitBoard.from_string}
+
+# name -> (search function of (board, depth, stats), transposition table cleared before each position)
+ENGINES = {
+    "minimax": (lambda b, d, s: minimax(b, d, -math.inf, math.inf, True, AI_PIECE, stats=s),
+                _transposition_table_ab),
+    "minimax_noprune": (lambda b, d, s: minimax_noprune(b, d, True, AI_PIECE, stats=s),
+                        noprune_module._transposition_table),
+    "expectiminimax": (lambda b, d, s: expectiminimax(b, d, -math.inf, math.inf, True, AI_PIECE, stats=s),
+                       _transposition_table_em),
+}
+DEPTHS = {"minimax": (2, 4, 6), "minimax_noprune": (2, 3, 4), "expectiminimax": (1, 2, 3)}
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _search_corpus(search, table, corpus, depth, stats=None, board_type="string"):
+    """Search every corpus position from a cold table. Returns the total seconds."""
+    seconds = 0
+    for position in corpus:
+        board = BOARD_TYPES[board_type](position["board"])
+        table.clear()
+        random.seed(SEED)
+        start = time.perf_counter()
+        search(board, depth, stats)
+        seconds += time.perf_counter() - start
+    return seconds
+
+
+def _peak_memory(fn):
+    """Peak traced allocation of ``fn()`` in KiB (a separate run: tracing slows the search down)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def bench_engine(name, depth, corpus, repeat=3, memory=True, board_type="string"):
+    search, table = ENGINES[name]
+    # Timed runs without statistics; one more run collects the counts (they do not depend on timing)
+    seconds = min(_search_corpus(search, table, corpus, depth, board_type=board_type) for _ in range(repeat))
+    stats = SearchStats()
+    traced = _search_corpus(search, table, corpus, depth, stats, board_type)
+    counts = stats.as_dict()
+    result = {
+        "seconds": round(seconds, 4),
+        "nodes": stats.nodes,
+        "nps": round(stats.nodes / seconds) if seconds else None,
+        "tt_hit_rate": counts["tt_hit_rate"],
+        "cutoffs": counts["cutoffs"],
+        "first_move_cutoffs": counts["first_move_cutoffs"],
+        "branching_factor": counts["branching_factor"],
+        "leaf_evals": counts["leaf_evals"],
+        "eval_share": round(stats.eval_seconds / traced, 3) if traced else None,
+        "movegen_share": round(stats.movegen_seconds / traced, 3) if traced else None,
+    }
+    if memory:
+        result["peak_kb"] = _peak_memory(lambda: _search_corpus(search, table, corpus, depth, board_type=board_type))
+    return result
+
+
+def bench_evaluate(corpus, rounds=200, repeat=3, board_type="string"):
+    boards = [BOARD_TYPES[board_type](p["board"]) for p in corpus]
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for board in boards:
+                evaluate_board(board, AI_PIECE)
+        best = min(best, time.perf_counter() - start)
+    calls = rounds * len(boards)
+    return {"calls": calls, "seconds": round(best, 4), "evals_per_sec": round(calls / best)}
+
+
+def run_benchmarks(corpus, engines=None, depths=None, repeat=3, memory=True, eval_rounds=200, verbose=True,
+                   board_type="string"):
+    results = {}
+    for name in engines or ENGINES:
+        for depth in (depths or {}).get(name, DEPTHS[name]):
+            results[f"{name}/d{depth}"] = bench_engine(name, depth, corpus, repeat, memory, board_type)
+            if verbose:
+                print(f"{name} depth {depth}: {results[f'{name}/d{depth}']}", file=sys.stderr)
+    results["evaluate_board"] = bench_evaluate(corpus, eval_rounds, repeat, board_type)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "positions": len(corpus),
+            "seed": SEED,
+            "board": board_type,
+        },
+        "results": results,
+    }
+
+
+# metric -> True when larger is better
+METRICS = {"seconds": False, "nps": True, "peak_kb": False, "evals_per_sec": True}
+
+
+def compare(baseline, current, threshold=0.10):
+    """List of regression messages of ``current`` against ``baseline`` (both run_benchmarks reports)."""
+    problems = []
+    for key, new in current["results"].items():
+        old = baseline["results"].get(key)
+        if old is None:
+            continue
+        if "nodes" in old and new.get("nodes") != old["nodes"]:
+            problems.append(f"{key}: nodes changed {old['nodes']} -> {new.get('nodes')}")
+        for metric, higher_is_better in METRICS.items():
+            if not old.get(metric) or new.get(metric) is None:
+                continue
+            change = (new[metric] - old[metric]) / old[metric]
+            if (change < -threshold) if higher_is_better else (change > threshold):
+                problems.append(f"{key}: {metric} {old[metric]} -> {new[metric]} ({change:+.1%})")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the search engines on the position corpus")
+    parser.add_argument("--engines", nargs="*", choices=list(ENGINES), help="engines to run (default all)")
+    parser.add_argument("--board", choices=list(BOARD_TYPES), default="string",
+                        help="board representation the engines search")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement; the fastest counts")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory runs")
+    parser.add_argument("--out", default="", help="write the JSON report here (default stdout)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write the report to {BASELINE_PATH}")
+    parser.add_argument("--compare", default="", help="baseline report to check this run against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(load_corpus(), args.engines, repeat=args.repeat, memory=not args.no_memory,
+                            board_type=args.board)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            f.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        problems = compare(baseline, report, args.threshold)
+        for problem in problems:
+            print("REGRESSION " + problem, file=sys.stderr)
+        if problems:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
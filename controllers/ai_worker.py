@@ -0,0 +1,159 @@
+"""
+Background AI worker for the game loop.
+
+The search runs on a single worker thread, so the pygame loop keeps
+handling events and redrawing while the AI thinks.  The loop polls the
+worker once per frame.  Cancelling sets a stop event that every engine
+checks through its Deadline, so a quit never waits for a deep search.
+
+While the player is thinking the same worker can ponder: it searches the
+positions after each player reply, most likely reply first.  Finished
+answers are kept, and the engines' transposition tables stay warm for
+the rest.
+"""
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from models.board import get_valid_locations, get_next_open_row, drop_piece, is_board_full
+from models.constants import AI_PIECE, PLAYER_PIECE
+from models.heuristics import evaluate_board
+from models.ai.minimax import minimax
+from models.ai.minimax_noprune import minimax_noprune
+from models.ai.expectiminimax import expectiminimax
+from models.ai.negamax import negamax
+from models.ai.iterative import Deadline, SearchTimeout, search
+from models.ai.tree_recorder import TreeRecorder
+from models.ai.endgame import ENDGAME_THRESHOLD, should_solve, solve
+from models.tactics import forced_move
+from utils.opening_book import load_book
+
+
+def compute_move(args, board, parallel=None, stop_event=None, verbose=True, stats=None):
+    """
+    Run the AI selected by ``args.mode`` on ``board``. Returns (col, score, graph).
+    A ``stats`` SearchStats is filled in by the sequential engines and stopped when the move is known.
+    """
+    try:
+        return _compute_move(args, board, parallel, stop_event, verbose, stats)
+    finally:
+        if stats is not None:
+            stats.finish()
+
+
+def _compute_move(args, board, parallel, stop_event, verbose, stats):
+    selected_ai, depth, visualize = args.mode, args.depth, bool(args.visualize)
+    # Shortcuts that bypass the chosen engine are skipped when its tree is to be shown, and for
+    # expectiminimax, whose moves may drift to a neighbouring column
+    shortcuts = not visualize and selected_ai != 3
+    book = load_book(getattr(args, "book", None)) if shortcuts else None
+    if book is not None:
+        hit = book.lookup(board)  # book positions never reach the engines
+        if hit is not None:
+            if verbose:
+                print("Opening book move")
+            return hit[0], hit[1], None
+
+    deadline = Deadline(stop_event=stop_event) if stop_event is not None else None
+    if shortcuts and should_solve(board, getattr(args, "endgame_cells", ENDGAME_THRESHOLD)):
+        col, score, nodes = solve(board, True, AI_PIECE, deadline=deadline)
+        if verbose:
+            print(f"Endgame solved exactly ({nodes} nodes), final margin {score}")
+        return col, score, None
+
+    tactics = getattr(args, "tactics", False)
+    # A lone four to complete or block is played without searching (expectiminimax moves may drift)
+    if tactics and selected_ai != 3:
+        col = forced_move(board, AI_PIECE)
+        if col is not None:
+            if verbose:
+                print(f"Forced move in column {col + 1}")
+            score = evaluate_board(drop_piece(board, get_next_open_row(board, col), col, AI_PIECE), AI_PIECE)
+            return col, score, None
+
+    # Modes 1-3 record the visualized search into this; --tree-nodes caps its size
+    recorder = TreeRecorder(getattr(args, "tree_nodes", 0) or None) if visualize else None
+    graph = None
+    if parallel is not None and selected_ai == 1:
+        col, score, graph = parallel.minimax(board, depth, AI_PIECE, deadline=deadline)
+    elif parallel is not None and selected_ai == 3:
+        col, score, graph = parallel.expectiminimax(board, depth, AI_PIECE, deadline=deadline)
+    elif selected_ai == 2:
+        col, score, graph = minimax_noprune(board, depth, True, AI_PIECE, visualize, graph=recorder,
+                                            deadline=deadline, stats=stats)
+    elif selected_ai == 3:
+        col, score, graph = expectiminimax(board, depth, -math.inf, math.inf, True, AI_PIECE, visualize,
+                                           graph=recorder, deadline=deadline, stats=stats)
+    elif selected_ai == 4:
+        col, score, reached = search(board, time_limit_ms=args.time_ms, max_depth=depth, stop_event=stop_event,
+                                     tactics=tactics, stats=stats)
+        if verbose:
+            print(f"Iterative deepening reached depth {reached}")
+    elif selected_ai == 5:
+        col, score, nodes = negamax(board, depth, True, AI_PIECE, deadline=deadline, tactics=tactics, stats=stats)
+        if verbose:
+            print(f"PVS searched {nodes} nodes")
+    else:
+        col, score, graph = minimax(board, depth, -math.inf, math.inf, True, AI_PIECE, visualize,
+                                    graph=recorder, deadline=deadline, batch=getattr(args, "batch", False),
+                                    tactics=tactics, stats=stats)
+    return col, score, graph
+
+
+def ponder(args, board, results, parallel=None, stop_event=None):
+    """
+    Search the AI's answer to every player reply on ``board``.
+    Replies are tried best-for-the-player first (lowest static score for
+    the AI); each finished answer is stored in ``results[reply_board]``.
+    Stops quietly when ``stop_event`` is set.
+    """
+    replies = []
+    for col in get_valid_locations(board):
+        reply = drop_piece(board, get_next_open_row(board, col), col, PLAYER_PIECE)
+        if not is_board_full(reply):
+            replies.append((evaluate_board(reply, AI_PIECE), reply))
+    replies.sort(key=lambda x: x[0])
+    for _, reply in replies:
+        try:
+            results[reply] = compute_move(args, reply, parallel, stop_event, verbose=False)
+        except SearchTimeout:
+            break
+    return results
+
+
+class AIWorker:
+    """Single background thread that runs one search at a time."""
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-search")
+        self.stop_event = threading.Event()
+        self.future = None
+
+    def start(self, fn, *args, **kwargs):
+        """Submit ``fn(*args, stop_event=..., **kwargs)``; the previous job is cancelled."""
+        self.cancel()
+        self.stop_event = threading.Event()
+        self.future = self.executor.submit(fn, *args, stop_event=self.stop_event, **kwargs)
+        return self.future
+
+    def busy(self):
+        """True from ``start`` until the job's result has been collected by ``poll``."""
+        return self.future is not None
+
+    def poll(self):
+        """Result of the finished job, or None while it is running (or if it was cancelled)."""
+        if self.future is None or not self.future.done():
+            return None
+        future, self.future = self.future, None
+        try:
+            return future.result()
+        except SearchTimeout:
+            return None
+
+    def cancel(self):
+        self.stop_event.set()
+        self.future = None
+
+    def close(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
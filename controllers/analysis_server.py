@@ -0,0 +1,288 @@
+"""
+Asyncio analysis server for many concurrent games.
+
+Clients send one JSON object per line over TCP:
+
+    {"id": 7, "board": "<42 cells>", "engine": "negamax", "depth": 8, "time_ms": 300}
+    {"op": "cancel", "id": 7}
+    {"op": "metrics"}
+
+and get one JSON line back per analysis, tagged with the request id:
+
+    {"id": 7, "col": 3, "score": 18, "depth": 6, "coalesced": false, "ms": 301.5}
+
+Errors come back as ``{"id": ..., "error": "..."}``, including searches
+that fail in their worker; a broken process pool is replaced.  Requests
+on one connection are answered as they finish, not in order.
+
+Searches run as iterative deepening on a bounded process pool, so every
+request gets its (clamped) time budget and a move even at depth 1.  At
+most ``workers`` searches run at once; the others wait in the queue, and
+past ``max_queue`` waiting requests new ones are refused.  Identical
+positions in flight (same board, engine, depth and budget) are searched
+once and every requester gets the answer.  A cancelled request leaves the
+queue at once; a search that is already running cannot be interrupted in
+its worker process, so it ends at its budget and nobody waits for it.
+
+``python controllers/analysis_server.py --port 8765`` serves until
+interrupted; utils/load_generator.py drives it with synthetic games.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from models.constants import ROW_COUNT, COLUMN_COUNT, PLAYER_PIECE, AI_PIECE, EMPTY
+from models.ai.iterative import search
+
+ENGINES = ("minimax", "negamax")
+
+
+def _analyse_job(board, engine, depth, time_ms, tactics):
+    col, score, reached = search(board, time_limit_ms=time_ms, max_depth=depth, engine=engine, tactics=tactics)
+    return col, score, reached
+
+
+class ServerBusy(Exception):
+    """The request queue is full."""
+
+
+class Metrics:
+    """Counters and a window of recent latencies (milliseconds)."""
+
+    def __init__(self, window=1000):
+        self.requests = self.completed = self.errors = self.cancelled = self.coalesced = self.refused = 0
+        self.failed = 0    # errors raised by the search itself (also counted in errors)
+        self.queued = 0    # waiting for a worker
+        self.running = 0   # being searched
+        self.latencies = deque(maxlen=window)
+
+    def snapshot(self):
+        ordered = sorted(self.latencies)
+
+        def pct(p):
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1) if ordered else None
+        return {
+            "requests": self.requests, "completed": self.completed, "errors": self.errors,
+            "cancelled": self.cancelled, "coalesced": self.coalesced, "refused": self.refused,
+            "failed": self.failed,
+            "queue_depth": self.queued, "running": self.running,
+            "latency_ms": {
+                "mean": round(sum(ordered) / len(ordered), 1) if ordered else None,
+                "p50": pct(0.50), "p95": pct(0.95), "max": pct(1.0),
+            },
+        }
+
+
+class _Search:
+    """One in-flight search shared by every request for the same position."""
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+def parse_request(request, default_time_ms, max_time_ms):
+    board = request.get("board")
+    if not isinstance(board, str) or len(board) != ROW_COUNT * COLUMN_COUNT \
+            or set(board) - {EMPTY, PLAYER_PIECE, AI_PIECE}:
+        raise ValueError("board must be 42 cells of 0, 1 and 2")
+    engine = request.get("engine", "negamax")
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {', '.join(ENGINES)}")
+    depth = request.get("depth")
+    depth = None if depth is None else max(1, int(depth))
+    time_ms = min(int(request.get("time_ms", default_time_ms)), max_time_ms)
+    return board, engine, depth, max(1, time_ms), bool(request.get("tactics", False))
+
+
+class AnalysisServer:
+    def __init__(self, workers=None, max_queue=256, default_time_ms=500, max_time_ms=5000):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.default_time_ms = default_time_ms
+        self.max_time_ms = max_time_ms
+        self.executor = self._new_pool()
+        self.slots = None  # created on the server's event loop
+        self.inflight = {}
+        self.metrics = Metrics()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def analyse(self, board, engine="negamax", depth=None, time_ms=None, tactics=False):
+        """Search ``board``; identical concurrent requests share one search. Returns (col, score, depth, coalesced)."""
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.workers)
+        time_ms = self.default_time_ms if time_ms is None else time_ms
+        key = (board, engine, depth, time_ms, tactics)
+        shared = self.inflight.get(key)
+        coalesced = shared is not None
+        if coalesced:
+            self.metrics.coalesced += 1
+        else:
+            if self.metrics.queued >= self.max_queue:
+                self.metrics.refused += 1
+                raise ServerBusy("queue is full")
+            shared = _Search(asyncio.ensure_future(self._run(*key)))
+            self.inflight[key] = shared
+            shared.task.add_done_callback(lambda _: self.inflight.pop(key, None))
+        shared.waiters += 1
+        try:
+            # shield: one requester giving up must not cancel the search for the others
+            col, score, reached = await asyncio.shield(shared.task)
+        except asyncio.CancelledError:
+            shared.waiters -= 1
+            if shared.waiters == 0:
+                shared.task.cancel()
+            raise
+        shared.waiters -= 1
+        return col, score, reached, coalesced
+
+    async def _run(self, board, engine, depth, time_ms, tactics):
+        self.metrics.queued += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.metrics.queued -= 1
+        self.metrics.running += 1
+        loop = asyncio.get_running_loop()
+
+        def finished(_):
+            self.metrics.running -= 1
+            self.slots.release()
+        executor = self.executor
+        try:
+            future = executor.submit(_analyse_job, board, engine, depth, time_ms, tactics)
+        except BrokenProcessPool:
+            finished(None)
+            self._replace_broken_pool(executor)
+            raise
+        # The slot is held until the worker process is really free, even when nobody waits any more
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(finished, f))
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._replace_broken_pool(executor)
+            raise
+
+    def _replace_broken_pool(self, broken):
+        """Start a fresh pool after ``broken`` raised BrokenProcessPool; every later submit to it would fail.
+
+        All searches of a broken pool fail together, but only the first one to get here replaces it.
+        """
+        if broken is not self.executor:  # already replaced
+            return
+        self.executor = self._new_pool()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def _answer(self, request, write):
+        rid = request.get("id")
+        start = time.perf_counter()
+        self.metrics.requests += 1
+        try:
+            board, engine, depth, time_ms, tactics = parse_request(request, self.default_time_ms, self.max_time_ms)
+            col, score, reached, coalesced = await self.analyse(board, engine, depth, time_ms, tactics)
+        except asyncio.CancelledError:
+            self.metrics.cancelled += 1
+            await write({"id": rid, "error": "cancelled"})
+            return
+        except (ValueError, TypeError, ServerBusy) as exc:
+            self.metrics.errors += 1
+            await write({"id": rid, "error": str(exc)})
+            return
+        except Exception as exc:  # the search failed (engine error, timeout, broken pool): still answer
+            self.metrics.errors += 1
+            self.metrics.failed += 1
+            await write({"id": rid, "error": f"search failed: {type(exc).__name__}: {exc}"})
+            return
+        ms = (time.perf_counter() - start) * 1000
+        self.metrics.completed += 1
+        self.metrics.latencies.append(ms)
+        await write({"id": rid, "col": col, "score": score, "depth": reached, "coalesced": coalesced,
+                     "ms": round(ms, 1)})
+
+    async def handle_client(self, reader, writer):
+        lock = asyncio.Lock()
+        tasks = {}
+
+        async def write(message):
+            async with lock:
+                if writer.is_closing():  # the client left; its answers go nowhere
+                    return
+                writer.write((json.dumps(message) + "\n").encode())
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    pass
+
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError:
+                    await write({"error": "invalid JSON"})
+                    continue
+                op = request.get("op", "analyse")
+                if op == "metrics":
+                    await write(self.metrics.snapshot())
+                elif op == "cancel":
+                    task = tasks.get(request.get("id"))
+                    if task is not None:
+                        task.cancel()
+                elif op == "analyse":
+                    task = asyncio.ensure_future(self._answer(request, write))
+                    rid = request.get("id")
+                    tasks[rid] = task
+                    task.add_done_callback(lambda t, rid=rid: tasks.pop(rid, None) if tasks.get(rid) is t else None)
+                else:
+                    await write({"id": request.get("id"), "error": f"unknown op {op}"})
+        except ConnectionError:
+            pass
+        finally:
+            for task in list(tasks.values()):  # a closed connection cancels its requests
+                task.cancel()
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        """Start listening; returns the asyncio server (port 0 picks a free port)."""
+        return await asyncio.start_server(self.handle_client, host, port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Connect 4 analysis server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=0, help="search processes (0 = one per CPU)")
+    parser.add_argument("--max-queue", type=int, default=256, help="waiting requests before new ones are refused")
+    parser.add_argument("--time-ms", type=int, default=500, help="budget of requests that do not give one")
+    parser.add_argument("--max-time-ms", type=int, default=5000, help="largest budget a request may ask for")
+    args = parser.parse_args(argv)
+
+    server = AnalysisServer(args.workers or None, args.max_queue, args.time_ms, args.max_time_ms)
+
+    async def run():
+        listener = await server.serve(args.host, args.port)
+        print(f"Analysis server on {args.host}:{listener.sockets[0].getsockname()[1]} "
+              f"with {server.workers} workers")
+        async with listener:
+            await listener.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
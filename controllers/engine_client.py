@@ -0,0 +1,182 @@
+"""
+Client side of the engine service (controllers/engine_service.py).
+
+``EngineClient.connect(path)`` talks to a running service on a Unix
+socket; ``EngineClient.spawn()`` starts a private service on a pipe.  A
+reader thread collects the service's lines, so the game loop can send
+``go`` and poll for the answer once per frame just like AIWorker.
+"""
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+
+class EngineError(RuntimeError):
+    """The service reported an error or went away."""
+
+
+class EngineClient:
+    def __init__(self, reader, writer, on_close=None):
+        self.reader = reader
+        self.writer = writer
+        self.on_close = on_close
+        self.answers = queue.Queue()  # bestmove lines
+        self.replies = queue.Queue()  # every other line
+        self.pending = False  # a ``go`` is waiting for its answer
+        self.closed = False  # the service closed the connection
+        self.thread = threading.Thread(target=self._read, name="engine-client", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def connect(cls, path, timeout=10.0):
+        """Connect to a service on ``path``, waiting up to ``timeout`` seconds for it to come up."""
+        end = time.time() + timeout
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(path)
+                break
+            except OSError:
+                sock.close()
+                if time.time() >= end:
+                    raise
+                time.sleep(0.05)
+        reader = sock.makefile("r", encoding="utf-8")
+        writer = sock.makefile("w", encoding="utf-8")
+
+        def hang_up():
+            # The reader's file object keeps the socket open, so end the connection explicitly
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        return cls(reader, writer, on_close=hang_up)
+
+    @classmethod
+    def spawn(cls, *service_args):
+        """Start a private service on a pipe; it exits when the client closes."""
+        proc = subprocess.Popen([sys.executable, "controllers/engine_service.py", *service_args],
+                                stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+        return cls(proc.stdout, proc.stdin, on_close=proc.wait)
+
+    def _read(self):
+        try:
+            for line in self.reader:
+                line = line.strip()
+                if line:
+                    # A failed search answers its ``go`` with an error instead of a bestmove
+                    (self.answers if line.startswith(("bestmove", "error go")) else self.replies).put(line)
+        except (OSError, ValueError):  # closed underneath us
+            pass
+        # Wake whoever waits for a reply or an answer: the connection is gone
+        self.closed = True
+        self.replies.put(None)
+        self.answers.put(None)
+
+    def send(self, *words):
+        self.writer.write(" ".join(str(w) for w in words) + "\n")
+        self.writer.flush()
+
+    def _reply(self, timeout):
+        try:
+            line = self.replies.get(timeout=timeout)
+        except queue.Empty:
+            raise EngineError("no reply from the engine") from None
+        if line is None:
+            raise EngineError("the engine closed the connection")
+        if line.startswith("error"):
+            raise EngineError(line[len("error "):])
+        return line
+
+    def configure(self, args, timeout=10.0):
+        """Send the game's settings (an argparse namespace of the game controller) and wait until applied."""
+        for name in ("mode", "depth", "time_ms", "workers", "endgame_cells"):
+            self.send("setoption", name, getattr(args, name))
+        for name in ("tactics", "batch"):
+            self.send("setoption", name, int(bool(getattr(args, name, False))))
+        for name in ("book", "cache"):
+            self.send("setoption", name, getattr(args, name, ""))
+        self.send("newgame")
+        self.ready(timeout)
+
+    def ready(self, timeout=10.0):
+        self.send("isready")
+        while self._reply(timeout) != "readyok":
+            pass
+
+    def go(self, board, **params):
+        """Start a search of ``board``; params are ``depth``, ``movetime`` and ``mode``."""
+        while not self.answers.empty():  # answers to earlier searches are stale now
+            if self.answers.get_nowait() is None:
+                self.answers.put(None)  # but a closed connection stays closed
+                break
+        self.send("position", "board", board)
+        self.send("go", *(str(x) for item in params.items() for x in item))
+        self.pending = True
+
+    def ponder(self, board):
+        self.send("position", "board", board)
+        self.send("ponder")
+
+    def poll(self):
+        """(col, score, None) once the latest ``go`` is answered, else None;
+        EngineError if it failed or the engine closed the connection."""
+        if not self.pending:
+            return None
+        try:
+            line = self.answers.get_nowait()
+        except queue.Empty:
+            return None
+        return self._answer(line)
+
+    def wait(self, timeout=None):
+        """Block until the latest ``go`` is answered; EngineError if it failed or the engine closed the connection."""
+        if not self.pending:
+            return None
+        try:
+            line = self.answers.get(timeout=timeout)
+        except queue.Empty:
+            raise EngineError("no answer from the engine") from None
+        return self._answer(line)
+
+    def _answer(self, line):
+        self.pending = False
+        if line is None:
+            self.answers.put(None)  # later searches fail the same way
+        return self._parse(line)
+
+    @staticmethod
+    def _parse(line):
+        if line is None:
+            raise EngineError("the engine closed the connection")
+        if line.startswith("error"):
+            raise EngineError(line[len("error "):])
+        words = line.split()
+        if words[1] == "none":
+            return None, None, None
+        score = float(words[3])
+        return int(words[1]), int(score) if score.is_integer() else score, None
+
+    def stop(self):
+        self.send("stop")
+
+    def stats(self, timeout=10.0):
+        self.send("stats")
+        line = self._reply(timeout)
+        while not line.startswith("stats"):
+            line = self._reply(timeout)
+        return {k: float(v) if "." in v else int(v) for k, v in (f.split("=") for f in line.split()[1:])}
+
+    def close(self, quit=False):
+        """Disconnect (and end the service too when ``quit``)."""
+        try:
+            self.send("quit" if quit else "stop")
+            self.writer.close()
+        except OSError:
+            pass
+        if self.on_close is not None:
+            self.on_close()
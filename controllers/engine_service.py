@@ -0,0 +1,306 @@
+"""
+Long-running engine service with a small line protocol.
+
+One process keeps the engines, their transposition tables, the opening
+book and the persistent cache loaded for a whole session; games talk to
+it over stdin/stdout or a Unix socket instead of importing everything
+themselves.  The protocol is UCI-like, one command per line:
+
+    isready                       -> readyok
+    newgame                       reset the position (caches stay warm)
+    setoption <name> <value>      mode, depth, time_ms, workers, tactics,
+                                  batch, endgame_cells, book, cache
+    position startpos [moves c c ...]   columns 0-6, the player moves first
+    position board <42 cells>     row 0 (bottom) first, as models.board
+    go [depth N] [movetime MS] [mode M]
+                                  -> bestmove <col> score <score>
+    ponder                        search the player's replies in the background
+    stop                          end the current search -> bestmove ...
+    stats                         -> stats key=value ...
+    quit
+
+``go`` answers asynchronously, so ``stop`` and ``stats`` are handled
+while it runs.  A search stopped before it has a move answers
+``bestmove none``; one that fails answers ``error go: <message>``.  Other
+errors are reported as ``error <message>``.
+
+Run with ``python controllers/engine_service.py`` for stdio or add
+``--socket PATH`` to serve one client at a time on a Unix socket.
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+from argparse import Namespace
+
+from models.board import create_board, drop_piece, get_next_open_row, is_valid_location
+from models.constants import ROW_COUNT, COLUMN_COUNT, PLAYER_PIECE, AI_PIECE, EMPTY
+from models.ai.endgame import ENDGAME_THRESHOLD
+from models.ai.iterative import SearchTimeout
+from models.ai.minimax import _transposition_table_ab
+from models.ai.negamax import _transposition_table_pvs
+from models.ai.expectiminimax import _transposition_table_em
+from models.ai.parallel import ParallelRootSearch
+from models.ai.persistent_cache import PersistentCache, attach
+from controllers.ai_worker import AIWorker, compute_move, ponder
+from utils.opening_book import DEFAULT_BOOK_PATH
+
+
+def _flag(value):
+    return value.lower() in ("1", "true", "on", "yes")
+
+
+# setoption name -> parser; the names are the game controller's argument names
+OPTIONS = {
+    "mode": int,
+    "depth": int,
+    "time_ms": int,
+    "workers": int,
+    "tactics": _flag,
+    "batch": _flag,
+    "endgame_cells": int,
+    "book": str,
+    "cache": str,
+}
+
+
+def default_options():
+    return Namespace(mode=1, depth=3, visualize=0, time_ms=1000, workers=0, tactics=False, batch=False,
+                     endgame_cells=ENDGAME_THRESHOLD, book=DEFAULT_BOOK_PATH, cache="")
+
+
+class EngineService:
+    """Engine state for a session; ``handle`` runs one protocol line."""
+
+    def __init__(self, write, options=None):
+        self.write = write
+        self.lock = threading.Lock()
+        self.args = options or default_options()
+        self.board = create_board()
+        self.worker = AIWorker()
+        self.search_id = 0
+        self.ponder_key = None  # (mode, depth, time_ms) the ponder results were searched with
+        self.ponder_results = {}
+        self.parallel = None
+        self.cache = None
+        self.searches = self.ponder_hits = 0
+        self.running = True
+        self._apply("workers", self.args.workers)
+        self._apply("cache", self.args.cache)
+
+    def emit(self, line):
+        with self.lock:
+            self.write(line)
+
+    def handle(self, line):
+        """Run one command line. Returns False once the service should exit."""
+        words = line.split()
+        if not words:
+            return True
+        command, rest = words[0], words[1:]
+        handler = getattr(self, "cmd_" + command, None)
+        if handler is None:
+            self.emit(f"error unknown command {command}")
+            return True
+        try:
+            handler(rest)
+        except (ValueError, IndexError) as exc:
+            self.emit(f"error {command}: {exc}")
+        return self.running
+
+    # --- commands ---
+
+    def cmd_isready(self, rest):
+        self.emit("readyok")
+
+    def cmd_newgame(self, rest):
+        self.cmd_stop([])
+        self.board = create_board()
+        self.ponder_key, self.ponder_results = None, {}
+
+    def cmd_setoption(self, rest):
+        name, value = rest[0], " ".join(rest[1:])
+        if name not in OPTIONS:
+            raise ValueError(f"unknown option {name}")
+        self._apply(name, OPTIONS[name](value))
+
+    def _apply(self, name, value):
+        setattr(self.args, name, value)
+        if name == "workers":
+            # The process pool is kept as long as the worker count does not change
+            if self.parallel is not None and self.parallel.workers != value:
+                self.parallel.close()
+                self.parallel = None
+            if value and self.parallel is None:
+                self.parallel = ParallelRootSearch(value)
+        elif name == "cache":
+            if self.cache is not None and self.cache.path != value:
+                self.cache.close()
+                self.cache = None
+            if value and self.cache is None:
+                self.cache = PersistentCache(value)
+            attach(self.cache, (_transposition_table_ab, _transposition_table_pvs))
+
+    def cmd_position(self, rest):
+        if rest[0] == "board":
+            board = rest[1]
+            if len(board) != ROW_COUNT * COLUMN_COUNT or set(board) - {EMPTY, PLAYER_PIECE, AI_PIECE}:
+                raise ValueError("board must be 42 cells of 0, 1 and 2")
+        elif rest[0] == "startpos":
+            board, piece = create_board(), PLAYER_PIECE
+            moves = rest[2:] if len(rest) > 1 and rest[1] == "moves" else []
+            for move in moves:
+                col = int(move)
+                if not 0 <= col < COLUMN_COUNT or not is_valid_location(board, col):
+                    raise ValueError(f"illegal move {move}")
+                board = drop_piece(board, get_next_open_row(board, col), col, piece)
+                piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+        else:
+            raise ValueError("expected 'startpos' or 'board'")
+        self.board = board
+
+    def cmd_go(self, rest):
+        params = dict(zip(rest[::2], rest[1::2]))
+        args = Namespace(**vars(self.args))
+        if "mode" in params:
+            args.mode = int(params["mode"])
+        if "depth" in params:
+            args.depth = int(params["depth"])
+        if "movetime" in params:  # a time budget means iterative deepening
+            args.mode, args.time_ms = 4, int(params["movetime"])
+
+        board = self.board
+        self.worker.cancel()  # stops pondering too
+        self.search_id += 1
+        self.searches += 1
+        answer = self.ponder_results.get(board)
+        if answer is not None and (args.mode, args.depth, args.time_ms) == self.ponder_key:
+            self.ponder_hits += 1
+            self._finish(answer)
+            return
+        search_id = self.search_id
+        future = self.worker.start(compute_move, args, board, self.parallel, verbose=False)
+        future.add_done_callback(lambda f: self._done(f, search_id))
+
+    def _done(self, future, search_id):
+        if search_id != self.search_id:  # replaced by a newer ``go``
+            return
+        try:
+            result = future.result()
+        except SearchTimeout:
+            result = None
+        except Exception as exc:  # the search itself failed: the waiting client still gets an answer
+            self.emit(f"error go: {type(exc).__name__}: {exc}")
+            return
+        self._finish(result)
+
+    def _finish(self, result):
+        col, score = (result[0], result[1]) if result is not None else (None, None)
+        if self.cache is not None:
+            self.cache.flush()  # end of an AI turn
+        if col is None:
+            self.emit("bestmove none")
+        else:
+            self.emit(f"bestmove {col} score {score}")
+
+    def cmd_ponder(self, rest):
+        self.worker.cancel()
+        self.ponder_key = (self.args.mode, self.args.depth, self.args.time_ms)
+        self.ponder_results = {}
+        self.worker.start(ponder, Namespace(**vars(self.args)), self.board, self.ponder_results, self.parallel)
+
+    def cmd_stop(self, rest):
+        # The running search's callback still answers (bestmove none unless it had a result)
+        self.worker.stop_event.set()
+
+    def cmd_stats(self, rest):
+        ab, pvs, em = (t.stats() for t in (_transposition_table_ab, _transposition_table_pvs,
+                                            _transposition_table_em))
+        fields = {
+            "searches": self.searches,
+            "ponder_hits": self.ponder_hits,
+            "tt_ab_used": ab["used"], "tt_ab_hits": ab["hits"],
+            "tt_pvs_used": pvs["used"], "tt_pvs_hits": pvs["hits"],
+            "tt_em_used": em["used"], "tt_em_hits": em["hits"],
+        }
+        if self.cache is not None:
+            fields.update({"cache_" + k: v for k, v in self.cache.stats().items()})
+        self.emit("stats " + " ".join(f"{k}={v}" for k, v in fields.items()))
+
+    def cmd_quit(self, rest):
+        self.running = False
+
+    def close(self):
+        self.worker.close()
+        if self.parallel is not None:
+            self.parallel.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def serve_stdio(service, stdin):
+    for line in stdin:
+        if not service.handle(line):
+            break
+
+
+def serve_socket(service, path):
+    """Accept clients on a Unix socket one after another until ``quit``."""
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    try:
+        while service.running:
+            conn, _ = server.accept()
+            with conn, conn.makefile("r", encoding="utf-8") as reader, \
+                    conn.makefile("w", encoding="utf-8") as writer:
+                def write(line):
+                    try:
+                        writer.write(line + "\n")
+                        writer.flush()
+                    except OSError:  # the client went away mid-search
+                        pass
+                service.write = write
+                for line in reader:
+                    if not service.handle(line):
+                        break
+                service.cmd_stop([])  # a disconnected client's search is not needed
+    finally:
+        server.close()
+        os.unlink(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Connect 4 engine service")
+    parser.add_argument("--socket", default="",
+                        help="serve on this Unix socket instead of stdin/stdout")
+    parser.add_argument("--cache", default="",
+                        help="SQLite file that keeps deep search results across games (empty string = off)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="worker processes for parallel root search of modes 1 and 3 (0 = off)")
+    cli = parser.parse_args(argv)
+
+    out = sys.stdout
+    sys.stdout = sys.stderr  # stdout is the protocol channel; stray prints go to stderr
+
+    def write(line):
+        out.write(line + "\n")
+        out.flush()
+
+    options = default_options()
+    options.cache, options.workers = cli.cache, cli.workers
+    service = EngineService(write, options)
+    try:
+        if cli.socket:
+            serve_socket(service, cli.socket)
+        else:
+            serve_stdio(service, sys.stdin)
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
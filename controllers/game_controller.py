@@ -1,5 +1,4 @@
-import math
-import random
+import argparse
 import sys
 import time
 import multiprocessing
@@ -14,13 +13,56 @@ from models.constants import (
     PLAYER, AI, PLAYER_PIECE, AI_PIECE,
     BLACK, RED
 )
-from views.game_view import draw_board, print_board
-from models.ai.minimax import minimax
-from models.ai.minimax_noprune import minimax_noprune
-from models.ai.expectiminimax import expectiminimax
+from views.game_view import draw_board, print_board, draw_thinking
+from models.ai.parallel import ParallelRootSearch
+from controllers.ai_worker import AIWorker, compute_move, ponder
+from controllers.engine_client import EngineClient, EngineError
+from models.ai.endgame import ENDGAME_THRESHOLD
+from models.ai.minimax import _transposition_table_ab
+from models.ai.negamax import _transposition_table_pvs
+from models.ai.persistent_cache import PersistentCache, attach
+from models.ai.stats import SearchStats
+from utils.opening_book import DEFAULT_BOOK_PATH
 from utils.tree_visualizer import draw_graph_process
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Connect 4 against the AI")
+    parser.add_argument("mode", nargs="?", type=int, default=1,
+                        help="1=minimax, 2=minimax without pruning, 3=expectiminimax, "
+                             "4=iterative deepening, 5=negamax PVS")
+    parser.add_argument("depth", nargs="?", type=int, default=3,
+                        help="search depth (maximum depth for iterative deepening)")
+    parser.add_argument("visualize", nargs="?", type=int, default=0,
+                        help="1 to open the search tree visualizer after each AI move")
+    parser.add_argument("--tree-nodes", type=int, default=0,
+                        help="most search tree nodes recorded for the visualizer (0 = no limit)")
+    parser.add_argument("--time-ms", type=int, default=1000,
+                        help="time budget per AI move for iterative deepening")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="worker processes for parallel root search of modes 1 and 3 (0 = off)")
+    parser.add_argument("--ponder", action="store_true",
+                        help="search the player's possible replies while waiting for the click")
+    parser.add_argument("--book", default=DEFAULT_BOOK_PATH,
+                        help="opening book file, used when it exists (empty string to disable)")
+    parser.add_argument("--endgame-cells", type=int, default=ENDGAME_THRESHOLD,
+                        help="solve the game exactly once this many cells are empty (0 = off)")
+    parser.add_argument("--batch", action="store_true",
+                        help="minimax scores each node's children in one vectorized batch (needs NumPy)")
+    parser.add_argument("--tactics", action="store_true",
+                        help="play lone forced fours/blocks at once and search only tactically sound moves")
+    parser.add_argument("--cache", default="",
+                        help="SQLite file that keeps deep search results across games (empty string = off)")
+    parser.add_argument("--stats", action="store_true",
+                        help="print a search_stats JSON line (nodes, cutoffs, TT, timing) after each AI move")
+    parser.add_argument("--engine", default="",
+                        help="Unix socket of a running engine service to search with (ignored when visualizing)")
+    args = parser.parse_args(argv)
+    if args.stats and args.engine and not args.visualize:
+        parser.error("--stats needs an in-process search; it cannot be combined with --engine")
+    return args
+
+
 def main():
     pygame.init()
     width = COLUMN_COUNT * SQUARESIZE
@@ -28,13 +70,39 @@ def main():
     screen = pygame.display.set_mode((width, height))
     pygame.display.set_caption("Connect 4")
 
-    depth = int(sys.argv[2]) if len(sys.argv)>2 else 3
-    visualize = bool(int(sys.argv[3])) if len(sys.argv)>3 else False
-    selected_ai = int(sys.argv[1]) if len(sys.argv)>1 else 1
+    args = parse_args()
+    visualize = bool(args.visualize)
+    # A session-wide engine service keeps its tables warm between games; the visualizer needs a local graph
+    engine = None
+    if args.engine and not visualize:
+        engine = EngineClient.connect(args.engine)
+        engine.configure(args)
+    local = engine is None
+    # One process pool per game; the tree visualizer needs the sequential search's graph
+    parallel = ParallelRootSearch(args.workers) if local and args.workers and not visualize else None
+    # The search runs in the background so the window keeps responding
+    worker = AIWorker()
+    # Deep minimax/PVS results shared with earlier and concurrent games through one database
+    cache = PersistentCache(args.cache) if local and args.cache else None
+    attach(cache, (_transposition_table_ab, _transposition_table_pvs))
+
+    def shutdown():
+        worker.close()
+        if engine is not None:
+            engine.close()
+        if parallel is not None:
+            parallel.close()
+        if cache is not None:
+            cache.close()
 
     board = create_board()
     game_over = False
     turn = PLAYER
+    frame = 0
+    searching = False
+    ponder_results = {}
+    stats = None
+    ai_turns = 0
 
     draw_board(screen, board)
     clock = pygame.time.Clock()
@@ -42,6 +110,7 @@ def main():
     while not game_over:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                shutdown()
                 sys.exit()
             if event.type == pygame.MOUSEMOTION:
                 pygame.draw.rect(screen, BLACK, (0,0,width,SQUARESIZE))
@@ -61,17 +130,40 @@ def main():
                     turn = AI
 
         if turn==AI and not is_board_full(board):
-            start = time.time()
-            graph = None
-            # choose AI
-            if selected_ai==1:
-                col, score, graph = minimax(board, depth, -math.inf, math.inf, True, AI_PIECE, visualize)
-            elif selected_ai==2:
-                col, score, graph = minimax_noprune(board, depth, True, AI_PIECE, visualize)
-            elif selected_ai==3:
-                col, score, graph = expectiminimax(board, depth, -math.inf, math.inf, True, AI_PIECE, visualize)
-            else:
-                col, score, graph = minimax(board, depth, -math.inf, math.inf, True, AI_PIECE, visualize)
+            if not searching:
+                start = time.time()
+                # A pondered answer for this exact position is used as is
+                result = ponder_results.get(board)
+                worker.cancel()
+                if engine is not None:
+                    engine.go(board)  # the service answers pondered positions itself
+                    searching = True
+                elif result is None:
+                    stats = SearchStats() if args.stats else None
+                    worker.start(compute_move, args, board, parallel, stats=stats)
+                    searching = True
+                else:
+                    print("AI answer came from pondering")
+
+            if searching:
+                try:
+                    result = engine.poll() if engine is not None else worker.poll()
+                except EngineError as exc:
+                    # The service failed this search (or went away): search this move locally instead
+                    print(f"Engine error: {exc}; searching locally")
+                    if engine.closed:
+                        engine.close()
+                        engine = None
+                    stats = SearchStats() if args.stats else None
+                    worker.start(compute_move, args, board, parallel, stats=stats)
+                    result = None
+                if result is None:
+                    frame += 1
+                    draw_thinking(screen, width, frame)
+                    clock.tick(30)
+                    continue
+                searching = False
+            col, score, graph = result
             end = time.time()
 
             valid = [c for c in range(COLUMN_COUNT) if is_valid_location(board, c)]
@@ -87,24 +179,39 @@ def main():
                 row = get_next_open_row(board, col)
                 board = drop_piece(board, row, col, AI_PIECE)
                 print_board(board)
+                pygame.draw.rect(screen, BLACK, (0,0,width,SQUARESIZE))
                 draw_board(screen, board)
                 print(f"AI move computed in {end-start:.2f}s with score: {score}")
+                ai_turns += 1
+                if stats is not None:
+                    print(stats.log_line(turn=ai_turns, mode=args.mode, depth=args.depth, col=col, score=score))
+                    stats = None
 
                 if visualize and graph is not None:
                     p = multiprocessing.Process(target=draw_graph_process, args=(graph, col))
                     p.daemon = True
                     p.start()
                 turn = PLAYER
-
-            if is_board_full(board):
-                w = check_winner(board)
-                if w[PLAYER_PIECE]>w[AI_PIECE]: print("Player wins!")
-                elif w[PLAYER_PIECE]<w[AI_PIECE]: print("AI wins!")
-                else: print("Draw!")
-                pygame.time.wait(3000)
-                game_over = True
-
-            clock.tick(30)
+                if cache is not None:
+                    cache.flush()  # one write per AI turn, before pondering starts adding more
+
+                if args.ponder and not is_board_full(board):
+                    if engine is not None:
+                        engine.ponder(board)
+                    else:
+                        ponder_results = {}
+                        worker.start(ponder, args, board, ponder_results, parallel)
+
+        if is_board_full(board):
+            w = check_winner(board)
+            if w[PLAYER_PIECE]>w[AI_PIECE]: print("Player wins!")
+            elif w[PLAYER_PIECE]<w[AI_PIECE]: print("AI wins!")
+            else: print("Draw!")
+            pygame.time.wait(3000)
+            game_over = True
+            shutdown()
+
+        clock.tick(30)
 
 if __name__=="__main__":
     multiprocessing.set_start_method('spawn', force=True)
@@ -0,0 +1,147 @@
+"""
+Exact endgame solver.
+
+The game is scored only when the board is full (fours owned by each side,
+as in check_winner), so once few cells remain the final score can be
+searched exactly instead of estimated.  The solver plays every remaining
+cell out on a BitBoard and scores each move by the fours it completes, so
+a position's value is the best achievable (own fours - opponent fours)
+from that point on and does not depend on how it was reached.
+
+Solved values are kept in their own transposition table keyed by the exact
+position key (folded with its mirror image), so they never mix with the
+heuristic engines' entries and stay valid for the rest of the game.
+"""
+import math
+
+from models.bitboard import BitBoard, H1, cell_bit, count_fours, canonical_position_key
+from models.board import WINDOWS
+from models.constants import PLAYER_PIECE, AI_PIECE, ROW_COUNT, COLUMN_COUNT, EMPTY
+from models.zobrist import oriented
+from models.ai.transposition import TranspositionTable, EXACT, LOWER, bound_flag
+
+# Switch from the heuristic engines to the solver at this many empty cells
+ENDGAME_THRESHOLD = 12
+
+_solved_table = TranspositionTable()
+
+CENTER_ORDER = sorted(range(COLUMN_COUNT), key=lambda c: abs(c - COLUMN_COUNT // 2))
+
+
+def _window_mask(window):
+    mask = 0
+    for idx in window:
+        row, col = divmod(idx, COLUMN_COUNT)
+        mask |= cell_bit(row, col)
+    return mask
+
+
+# Bit position -> masks of the 4-cell windows through that cell
+CELL_WINDOW_MASKS = {}
+for _window in WINDOWS:
+    _mask = _window_mask(_window)
+    for _idx in _window:
+        _row, _col = divmod(_idx, COLUMN_COUNT)
+        CELL_WINDOW_MASKS.setdefault(_col * H1 + _row, []).append(_mask)
+
+
+def fours_through(bits, row, col):
+    """Number of complete fours in ``bits`` that include (row, col)."""
+    return sum(1 for mask in CELL_WINDOW_MASKS[col * H1 + row] if bits & mask == mask)
+
+
+class EndgameSolver:
+    """
+    Negamax alpha-beta over the remaining cells of a BitBoard.
+
+    ``solve`` returns (col, score) where score is the exact final
+    (``piece`` fours - opponent fours) difference with best play from both
+    sides, counting the fours already on the board.  ``nodes`` counts
+    visited positions.
+    """
+
+    def __init__(self, piece=AI_PIECE, tt=None):
+        self.piece = piece
+        self.opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+        self.tt = _solved_table if tt is None else tt
+        self.nodes = 0
+
+    def solve(self, board, maximizingPlayer=True, deadline=None):
+        self.board = board.copy() if isinstance(board, BitBoard) else BitBoard.from_string(board)
+        self.deadline = deadline
+        self.nodes = 0
+        mover = self.piece if maximizingPlayer else self.opponent
+        other = self.opponent if maximizingPlayer else self.piece
+        value, col = self._negamax(mover, other, -math.inf, math.inf)
+        # The search scores future fours only; add the ones already on the board
+        current = count_fours(self.board.bits[self.piece]) - count_fours(self.board.bits[self.opponent])
+        return col, current + (value if maximizingPlayer else -value)
+
+    def _negamax(self, mover, other, alpha, beta):
+        """Best future (mover fours - other fours) and the move achieving it."""
+        self.nodes += 1
+        if self.deadline is not None:
+            self.deadline.check()
+        board = self.board
+        if len(board.moves) == ROW_COUNT * COLUMN_COUNT:
+            return 0, None
+
+        # Side to move is part of the key: the same cells score differently per mover
+        position, mirrored = canonical_position_key(board)
+        key = (position << 1) | (mover == AI_PIECE)
+        alpha_orig, beta_orig = alpha, beta
+        tt_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            _, flag, value, tt_move = entry
+            tt_move = oriented(tt_move, mirrored)
+            if flag == EXACT:
+                return value, tt_move
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value, tt_move
+
+        # Moves that complete fours first, then center-first
+        moves = []
+        for col in CENTER_ORDER:
+            row = board.heights[col]
+            if row < ROW_COUNT:
+                gain = fours_through(board.bits[mover] | cell_bit(row, col), row, col)
+                moves.append((col != tt_move, -gain, col, gain))
+        moves.sort()
+
+        best_val, best_move = -math.inf, None
+        for _, _, col, gain in moves:
+            board.play(col, mover)
+            score = gain - self._negamax(other, mover, gain - beta, gain - alpha)[0]
+            board.undo()
+            if score > best_val:
+                best_val, best_move = score, col
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        # The depth slot holds the empty-cell count, so deeper solves win the bucket
+        empties = ROW_COUNT * COLUMN_COUNT - len(board.moves)
+        self.tt.store(key, empties, bound_flag(best_val, alpha_orig, beta_orig), best_val,
+                      oriented(best_move, mirrored))
+        return best_val, best_move
+
+
+def solve(board, maximizingPlayer=True, piece=AI_PIECE, deadline=None):
+    """
+    Exact endgame search.
+    Signature: solve(board, True, AI_PIECE)
+    Returns (col, score, nodes); score is the final fours difference for ``piece``.
+    """
+    solver = EndgameSolver(piece)
+    col, score = solver.solve(board, maximizingPlayer, deadline)
+    return col, score, solver.nodes
+
+
+def should_solve(board, threshold=ENDGAME_THRESHOLD):
+    """True when ``board`` has at most ``threshold`` (but at least one) empty cells."""
+    return 0 < board.count(EMPTY) <= threshold
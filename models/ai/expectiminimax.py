@@ -1,43 +1,147 @@
 import math  # Import math module for mathematical functions
 import random  # Import random module for random choices
-import networkx as nx  # Import networkx for graph visualization support
-import hashlib  # Import hashlib for hashing functions (currently not used)
 
-# Cache for expectiminimax
-_trans_table_em = {}  # Initialize transposition table to cache computed results
-
-from models.board import get_valid_locations, get_next_open_row, drop_piece  # Import board helper functions
-from models.constants import PLAYER_PIECE, AI_PIECE  # Import constants representing player and AI pieces
+from models.bitboard import BitBoard, BOTTOM_MASK, board_api, canonical_position_key, cell_bit  # Board helpers for string boards and BitBoards
+from models.constants import PLAYER_PIECE, AI_PIECE, ROW_COUNT, COLUMN_COUNT  # Piece constants and board dimensions
+from models.zobrist import oriented  # Flips best moves between a board and its mirror image
+import models.heuristics as heuristics  # Score bounds for chance-node pruning
 from models.heuristics import evaluate_board  # Import board evaluation heuristic
+from models.batch_eval import evaluate_boards  # Vectorized heuristic for many leaves at once
+from models.ai.transposition import TranspositionTable, EXACT, LOWER, bound_flag  # Bounded cache with bound flags
+from models.ai.tree_recorder import TreeRecorder, MAX, MIN, MOVE, CHANCE  # Compact record of the searched tree
+
+# Cache for expectiminimax, keyed on the exact position (never a lossy hash) plus the search context;
+# a board and its mirror image share one entry
+_transposition_table_em = TranspositionTable()
+
+def chance_weights(col, valid_cols):  # Offsets and probabilities of the chance node for a move in 'col'
+    # Build chance‐node offsets (col, col-1, col+1)
+    offsets = [0]  # Start with no offset (direct drop)
+    if col - 1 in valid_cols: offsets.append(-1)  # Append left offset if valid
+    if col + 1 in valid_cols: offsets.append(1)  # Append right offset if valid
+    neighbors = len(offsets) - 1  # Determine the number of neighboring moves (excluding the direct one)
+    neigh_w = 0.2 if neighbors == 2 else 0.4 if neighbors == 1 else 0.0  # Assign weight for neighbor moves
+    return [(off, 0.6 if off == 0 else neigh_w) for off in offsets]  # List of offsets with corresponding weights
+
+def exact_key(board):  # Collision-free identity of a board
+    return board.position_key() if isinstance(board, BitBoard) else "".join(board)  # A string board is its own key
+
+def canonical_exact_key(board):  # (smaller exact key of the board and its mirror image, mirrored)
+    if isinstance(board, BitBoard):
+        return canonical_position_key(board)
+    key = "".join(board)
+    mirrored = "".join(key[r * COLUMN_COUNT:(r + 1) * COLUMN_COUNT][::-1] for r in range(ROW_COUNT))
+    return (mirrored, True) if mirrored < key else (key, False)
+
+def chance_outcomes(board, col, valid_cols, move_piece, api):  # Distinct (key, outcome, probability) a move in 'col' leads to
+    # An outcome is the board reached; on a BitBoard, searched in place, it is the (col, sub-column) pair to play
+    if isinstance(board, BitBoard):
+        merged = {}  # exact key -> [(col, sub-column), summed probability]
+        first = cell_bit(board.heights[col], col)  # The intended drop
+        for off, w in chance_weights(col, valid_cols):
+            # The second piece lands above the first or in a neighboring column
+            row = board.heights[col + off] + (1 if off == 0 else 0)
+            if row >= ROW_COUNT:  # The sub-column filled up with the intended drop
+                continue
+            cells = first | cell_bit(row, col + off)
+            key = outcome_key(board, cells, move_piece)
+            entry = merged.setdefault(key, [(col, col + off), 0.0])
+            entry[1] += w
+        return [(k, cols, w) for k, (cols, w) in merged.items()]
+    main_b = api.drop_piece(board, api.get_next_open_row(board, col), col, move_piece)  # The intended drop
+    merged = {}  # exact key -> [board, summed probability]
+    for off, w in chance_weights(col, valid_cols):  # Loop over each offset and its weight
+        r = api.get_next_open_row(main_b, col + off)  # Determine the next open row for the sub-column
+        if r is None:  # If no open row exists, skip this branch
+            continue
+        sb = api.drop_piece(main_b, r, col + off, move_piece)  # Drop the piece in the sub-column
+        entry = merged.setdefault(exact_key(sb), [sb, 0.0])  # Identical outcomes share one entry...
+        entry[1] += w  # ...and their probabilities add up
+    return [(k, sb, w) for k, (sb, w) in merged.items()]  # One entry per distinct outcome
+
+def outcome_key(board, cells, move_piece):  # BitBoard.position_key of 'board' with 'cells' added for move_piece
+    player = board.bits[PLAYER_PIECE] | cells if move_piece == PLAYER_PIECE else board.bits[PLAYER_PIECE]
+    return (board.mask + cells + BOTTOM_MASK) | player
+
+def enter_outcome(board, outcome, move_piece):  # The board of a chance outcome
+    if isinstance(board, BitBoard):  # Played in place: leave_outcome takes both pieces back
+        board.play(outcome[0], move_piece)
+        board.play(outcome[1], move_piece)
+        return board
+    return outcome
+
+def leave_outcome(board):  # Undo enter_outcome
+    if isinstance(board, BitBoard):
+        board.undo()
+        board.undo()
+
+def outcome_board(board, outcome, move_piece):  # A separate board of a chance outcome
+    if isinstance(board, BitBoard):
+        return enter_outcome(board.copy(), outcome, move_piece)
+    return outcome
 
 def expectiminimax(board, depth, alpha, beta, maximizing,
                    piece=AI_PIECE, visualize=False,
-                   graph=None, id_counter=None, node_id=None,
-                   strategy="combined", prune_threshold=0):  # Define expectiminimax function with parameters
+                   graph=None, node_id=None,
+                   strategy="combined", deadline=None, stats=None):  # Define expectiminimax function with parameters
+    """
+    Expectiminimax with alpha-beta at decision nodes and Star1 pruning at
+    chance nodes.  Each outcome is searched with a window derived from the
+    weighted total so far and the score bounds of the remaining probability
+    mass, and the chance node stops as soon as its expected value is known
+    to fall outside (alpha, beta).  The root value (full window) equals an
+    unpruned search to the same depth.
+    stats (models.ai.stats.SearchStats) collects node, cutoff and timing counts.
+    Returns (col, score, graph); graph is the models.ai.tree_recorder.TreeRecorder
+    of the search when visualizing, else None.
+    A BitBoard is searched in place with play/undo and is back in its
+    original position when the call returns (or raises).
+    """
+    if deadline is not None:  # Abort with SearchTimeout once the deadline passes or the search is stopped
+        deadline.check()
+    if stats is not None:  # Count the node when statistics are collected
+        stats.node(depth)
     # --- Visualization setup ---
-    if visualize:  # Check if visualizing the decision process
-        if graph is None:  # If no graph is provided, create a new directed graph
-            graph = nx.DiGraph()  # Initialize a new directed graph
-        if id_counter is None:  # If no ID counter is provided, initialize one
-            id_counter = {"next": 0}  # Set starting node ID to 0
-        if node_id is None:  # If no node ID is provided, use the first available ID from the counter
-            node_id = id_counter["next"]  # Assign current counter value to node_id
-            id_counter["next"] += 1  # Increment the counter for the next node
-        graph.add_node(node_id,
-                       label='MAX' if maximizing else 'MIN',
-                       node_type='decision')  # Add a node to the graph indicating a decision point (MAX or MIN)
+    root = visualize and node_id is None  # The root of the recorded tree (children are added by their parent)
+    if root:
+        if graph is None:  # If no recorder is provided, create one
+            graph = TreeRecorder()
+        node_id = graph.add(kind=MAX if maximizing else MIN)  # Decision point (MAX or MIN)
+        visualize = node_id is not None  # A full recorder records nothing more
 
     # --- Transposition lookup ---
-    key = (hash("".join(board)), depth, maximizing, piece, strategy)  # Generate a unique key for the current state
-    if not visualize and key in _trans_table_em:  # If not visualizing and state already computed
-        return (*_trans_table_em[key], graph)  # Return cached best move and value along with the graph
+    # Outcomes shared by sibling moves (e.g. col 2 then 3 vs col 3 then 2) are searched once and found here
+    state, mirrored = canonical_exact_key(board)  # Mirror images are looked up under the same state
+    key = (state, depth, maximizing, piece, strategy)  # Exact key for the current state
+    alpha_orig, beta_orig = alpha, beta  # Window the result will be stored against
+    entry = _transposition_table_em.probe(key)  # Look up an earlier search of this state
+    if stats is not None:
+        stats.probe(entry)
+    if entry is not None and not root:  # A recorded root is always expanded
+        _, flag, value, move = entry
+        move = oriented(move, mirrored)  # Stored moves are in the canonical orientation
+        if flag == EXACT:  # Exact values can be returned directly
+            if visualize:  # Recorded as a cached leaf
+                graph.mark_cached(node_id, value)
+            return move, value, graph
+        if flag == LOWER:  # Bounds only narrow the window
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:  # The bound alone decides this node
+            if visualize:
+                graph.mark_cached(node_id, value)
+            return move, value, graph
 
-    valid_cols = get_valid_locations(board)  # Get all valid columns where a move is possible
+    api = board_api(board)  # Pick the board engine matching the board type
+    valid_cols = api.get_valid_locations(board)  # Get all valid columns where a move is possible
     # Terminal node?
     if depth == 0 or not valid_cols:  # If maximum depth reached or no valid moves left
-        score = evaluate_board(board, piece, strategy)  # Evaluate the board state with a heuristic
-        if visualize:  # If visualizing, update the node's label with the score
-            graph.nodes[node_id]['label'] = str(score)  # Set node label to the evaluated score
+        score = evaluate_board(board, piece, strategy) if stats is None else \
+            stats.evaluate(board, piece, strategy)  # Evaluate the board state with a heuristic
+        if visualize:  # If visualizing, record the node's score
+            graph.set_score(node_id, score)
+        _transposition_table_em.store(key, depth, EXACT, score, None)  # Static scores are exact
         return None, score, graph  # Return terminal score with no move (None)
 
     # Determine who plays
@@ -47,74 +151,88 @@ def expectiminimax(board, depth, alpha, beta, maximizing,
     best_val = -math.inf if maximizing else math.inf  # Initialize best value (worst for max, best for min)
     best_col = random.choice(valid_cols)  # Initialize best column with a random valid move
 
-    # For each possible move
-    for col in valid_cols:  # Loop through each valid column
-        row = get_next_open_row(board, col)  # Find the next available row for the column
-        main_b = drop_piece(board, row, col, move_piece)  # Simulate dropping the piece into the board
-
-        # -- decision‐node child for playing in 'col' --
-        if visualize:  # Check if visualizing the decision nodes
-            dec = id_counter['next']  # Generate a new node ID for the decision node
-            id_counter['next'] += 1  # Increment the node ID counter
-            graph.add_node(dec, label=f"col={col}", node_type='decision')  # Add decision node representing move at col
-            graph.add_edge(node_id, dec)  # Create an edge from parent node to decision node
+    # Every move's distinct chance outcomes; sibling moves often reach the same board (col 2 then 3 = col 3 then 2)
+    movegen = stats.movegen_start() if stats is not None else None
+    moves = [(col, chance_outcomes(board, col, valid_cols, move_piece, api)) for col in valid_cols]
+    if stats is not None:
+        stats.movegen_end(movegen)
+    leaf_scores = None  # exact key -> static score, when every outcome is a leaf
+    if depth == 1:  # Children are leaves: score each distinct board once
+        unique = {}
+        for _, outcomes in moves:
+            for k, outcome, _ in outcomes:
+                unique.setdefault(k, outcome)
+        if isinstance(board, BitBoard):  # Scored natively in place, one outcome at a time
+            scores = []
+            for outcome in unique.values():
+                sb = enter_outcome(board, outcome, move_piece)
+                scores.append(evaluate_board(sb, piece, strategy) if stats is None else
+                              stats.evaluate(sb, piece, strategy))
+                leave_outcome(board)
+        elif stats is not None:  # Same scores, timed and counted
+            scores = (stats.evaluate_many(unique.values(), piece) if strategy == "combined"
+                      else [stats.evaluate(sb, piece, strategy) for sb in unique.values()])
+        elif strategy == "combined":
+            scores = evaluate_boards(unique.values(), piece)  # One batched call for the whole last ply
         else:
-            dec = None  # If not visualizing, set decision node identifier to None
+            scores = [evaluate_board(sb, piece, strategy) for sb in unique.values()]
+        leaf_scores = dict(zip(unique, scores))
 
-        # Build chance‐node offsets (col, col-1, col+1)
-        offsets = [0]  # Start with no offset (direct drop)
-        if col - 1 in valid_cols: offsets.append(-1)  # Append left offset if valid
-        if col + 1 in valid_cols: offsets.append(1)  # Append right offset if valid
-        neighbors = len(offsets) - 1  # Determine the number of neighboring moves (excluding the direct one)
-        neigh_w = 0.2 if neighbors == 2 else 0.4 if neighbors == 1 else 0.0  # Assign weight for neighbor moves
-        weights = [(off, 0.6 if off == 0 else neigh_w) for off in offsets]  # Create a list of offsets with corresponding weights
+    # Star1 needs bounds on any child value; other strategies fall back to no chance pruning
+    lo, hi = heuristics.score_bounds() if strategy == "combined" else (-math.inf, math.inf)
+
+    # For each possible move
+    for i, (col, outcomes) in enumerate(moves):  # Loop through each valid column
+        # -- decision‐node child for playing in 'col' --
+        dec = graph.add(node_id, MOVE, col) if visualize else None  # Decision node for the move at col
 
         total = 0.0  # Initialize total score for the current column move
-        for off, w in weights:  # Loop over each offset and its weight
-            sub_col = col + off  # Calculate the actual sub-column by adding the offset
-            if sub_col not in valid_cols:  # If the computed sub-column is invalid, skip this variation
-                continue  # Continue to next offset
-            r = get_next_open_row(main_b, sub_col)  # Determine the next open row for the sub-column
-            if r is None:  # If no open row exists, skip this branch
-                continue  # Continue to next offset
-            sb = drop_piece(main_b, r, sub_col, move_piece)  # Drop the piece in the sub-column to get a new board
-
-            # Heuristic‐based pruning
-            if prune_threshold > 0:  # If a prune threshold is specified
-                approx = evaluate_board(sb, piece, strategy)  # Approximate board score using heuristic
-                if maximizing and approx < alpha - prune_threshold:  # For maximizing, prune if score is too low
-                    continue  # Skip further evaluation in this branch
-                if not maximizing and approx > beta + prune_threshold:  # For minimizing, prune if score is too high
-                    continue  # Skip further evaluation in this branch
-
-            if visualize:  # If visualization is on, create a chance node
-                # -- chance‐node --
-                ch = id_counter['next']  # Generate new node ID for the chance node
-                id_counter['next'] += 1  # Increment node ID counter
-                graph.add_node(ch, label=f"P={w:.2f}", node_type='chance')  # Add chance node with probability label
-                graph.add_edge(dec, ch)  # Connect decision node to chance node
-
-                # Reserve an ID for the child of this chance node
-                nxt = id_counter['next']  # Generate a new ID for the recursive child
-                id_counter['next'] += 1  # Increment node ID counter
-
-                # **Add the missing edge** from chance to its recursive child
-                graph.add_edge(ch, nxt)  # Link chance node to its recursive child node
-            else:
-                ch = None  # If not visualizing, set chance node to None
-                nxt = None  # Set recursive child node to None
-
-            # Recurse under the chance node
-            _, score, graph = expectiminimax(
-                sb, depth - 1, alpha, beta, not maximizing,
-                piece, visualize, graph, id_counter, nxt,
-                strategy, prune_threshold
-            )  # Recursively evaluate the new board state with decreased depth and alternate perspective
+        remaining = [sum(w for _, _, w in outcomes[i + 1:]) for i in range(len(outcomes))]  # Mass after each outcome
+        for (k, outcome, w), rest in zip(outcomes, remaining):  # Distinct outcomes with merged probabilities
+            # Best and worst the unsearched outcomes can still add (0 when none are left)
+            rest_hi = hi * rest if rest else 0.0
+            rest_lo = lo * rest if rest else 0.0
+
+            # -- chance‐node and the decision node below it (None once the recorder is full) --
+            ch = graph.add(dec, CHANCE, weight=w) if dec is not None else None
+            nxt = graph.add(ch, MIN if maximizing else MAX) if ch is not None else None
+
+            if leaf_scores is not None:  # Already scored in the batch above
+                score = leaf_scores[k]
+                if nxt is not None:
+                    graph.set_score(nxt, score)
+            else:  # Recurse under the chance node
+                # Star1 window: the child values that keep this chance node's total inside (alpha, beta)
+                child_alpha = (alpha - total - rest_hi) / w
+                child_beta = (beta - total - rest_lo) / w
+                sb = enter_outcome(board, outcome, move_piece)
+                try:
+                    _, score, graph = expectiminimax(
+                        sb, depth - 1, child_alpha, child_beta, not maximizing,
+                        piece, nxt is not None, graph, nxt,
+                        strategy, deadline, stats
+                    )  # Recursively evaluate the new board state with decreased depth and alternate perspective
+                finally:
+                    leave_outcome(board)
             total += w * score  # Accumulate the weighted score from this branch
 
-            if visualize:  # If visualization is active
-                # Update chance‐node label to show weight & resulting score
-                graph.nodes[ch]['label'] = f"{w:.2f}\n{score:.2f}"  # Modify chance node label with weight and evaluated score
+            if ch is not None:  # Record the outcome's score on its chance node
+                graph.set_score(ch, score)
+
+            # Stop once even the best (worst) case for the rest cannot reach back into the window
+            if total + rest_hi <= alpha:
+                total += rest_hi  # Upper bound on the expected value
+                if stats is not None:
+                    stats.chance_cutoffs += 1
+                break
+            if total + rest_lo >= beta:
+                total += rest_lo  # Lower bound on the expected value
+                if stats is not None:
+                    stats.chance_cutoffs += 1
+                break
+
+        if dec is not None:  # Expected value of the move (a bound when the chance node was cut off)
+            graph.set_score(dec, total)
 
         # Alpha‐beta updates
         if maximizing:  # If evaluating a maximizing node
@@ -126,9 +244,13 @@ def expectiminimax(board, depth, alpha, beta, maximizing,
                 best_val, best_col = total, col  # Update best value and best column for minimizing player
             beta = min(beta, best_val)  # Refresh beta with the minimum of its current value and best value found
         if alpha >= beta:  # Check if pruning condition is met
+            if stats is not None:
+                stats.cutoff(i)  # Index of the move that caused the cutoff
             break  # Terminate further exploration if alpha-beta condition holds
 
-    if not visualize:  # If not in visualization mode
-        _trans_table_em[key] = (best_col, best_val)  # Cache the computed result in the transposition table
+    if visualize:  # Record the node's value
+        graph.set_score(node_id, best_val)
+    flag = bound_flag(best_val, alpha_orig, beta_orig)  # Bound the value holds for the original window
+    _transposition_table_em.store(key, depth, flag, best_val, oriented(best_col, mirrored))  # Cache the computed result
 
     return best_col, best_val, graph  # Return the best move column, its evaluated value, and the graph structure
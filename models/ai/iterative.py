@@ -0,0 +1,80 @@
+import math
+import time
+
+from models.ai.minimax import minimax
+from models.ai.negamax import PVSSearch
+from models.constants import AI_PIECE, EMPTY
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its deadline passes or it is stopped."""
+
+
+class Deadline:
+    """Wall-clock budget for a search, optionally tied to a stop event.
+
+    Search functions call ``check()`` once per node; it raises
+    SearchTimeout when the budget is spent or ``stop_event`` is set.
+    """
+
+    def __init__(self, time_limit_ms=None, stop_event=None):
+        self.end = None if time_limit_ms is None else time.perf_counter() + time_limit_ms / 1000
+        self.stop_event = stop_event
+
+    def expired(self):
+        if self.end is not None and time.perf_counter() >= self.end:
+            return True
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def check(self):
+        if self.expired():
+            raise SearchTimeout()
+
+
+def search(board, time_limit_ms=1000, max_depth=None,
+           piece=AI_PIECE, strategy="combined", stop_event=None, engine="minimax", tactics=False, stats=None):
+    """
+    Iterative-deepening search under a wall-clock budget.
+    engine is "minimax" (alpha-beta) or "negamax" (PVS); tactics is passed on to it.
+    Searches depth 1, 2, ... until the budget runs out, max_depth is reached
+    or the board would be filled.  Each iteration leaves its results in the
+    transposition table, so the next one tries the previous best moves first.
+    stats (models.ai.stats.SearchStats) sums every iteration's counts and
+    records the time of each completed depth.
+    Returns (col, score, depth) from the deepest completed iteration.
+    """
+    empties = board.count(EMPTY)
+    max_depth = empties if max_depth is None else min(max_depth, empties)
+    if max_depth < 1:
+        return None, None, 0
+
+    if engine == "minimax":
+        def run(depth, deadline):
+            col, score, _ = minimax(board, depth, -math.inf, math.inf, True, piece,
+                                    strategy=strategy, deadline=deadline, tactics=tactics, stats=stats)
+            return col, score
+    elif engine == "negamax":
+        # The history table carries over between iterations
+        searcher = PVSSearch(piece, strategy, tactics=tactics, stats=stats)
+
+        def run(depth, deadline):
+            return searcher.search(board, depth, True, deadline)
+    else:
+        raise ValueError(f"Unknown engine: {engine}")
+
+    deadline = Deadline(time_limit_ms, stop_event)
+    # Depth 1 always completes so there is a legal answer even for tiny budgets
+    start = time.perf_counter()
+    best = (*run(1, None), 1)
+    if stats is not None:
+        stats.iteration(1, time.perf_counter() - start)
+    for depth in range(2, max_depth + 1):
+        start = time.perf_counter()
+        try:
+            col, score = run(depth, deadline)
+        except SearchTimeout:
+            break
+        if stats is not None:
+            stats.iteration(depth, time.perf_counter() - start)
+        best = (col, score, depth)
+    return best
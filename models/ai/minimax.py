@@ -1,93 +1,187 @@
 import math
 import random
-import networkx as nx
 
-from models.board import get_valid_locations, get_next_open_row, drop_piece
+from models.bitboard import BitBoard, board_api
 from models.constants import PLAYER_PIECE, AI_PIECE, EMPTY, ROW_COUNT, COLUMN_COUNT
 from models.heuristics import evaluate_board  # relative path: models/heuristics.py
+from models.batch_eval import evaluate_boards
+from models.tactics import tactical_moves
+from models.zobrist import (ZOBRIST, MIRROR_INDEX, SIDE_KEY, zobrist_hash, mirror_hash,
+                            canonical_key, oriented, context_key)
+from models.ai.transposition import TranspositionTable, EXACT, LOWER, bound_flag
+from models.ai.tree_recorder import TreeRecorder, MAX, MIN
 
-# Transposition table to cache evaluations for alpha-beta: {(board_key, depth, maximizing, strategy): (col, score)}
-_transposition_table_ab = {}
+# Bounded transposition table for alpha-beta, keyed on Zobrist hash ^ side to move ^ (piece, strategy);
+# a position and its mirror image share one canonical entry
+_transposition_table_ab = TranspositionTable()
 
 def minimax(board, depth, alpha, beta, maximizingPlayer,
             piece=AI_PIECE,
             visualize=False,
             strategy="combined",
             graph=None,
-            id_counter=None,
-            node_id=None):
+            node_id=None,
+            zobrist_key=None,
+            deadline=None,
+            batch=False,
+            tactics=False,
+            mirror_key=None,
+            stats=None):
     """
     Depth-limited Minimax with alpha-beta pruning,
     heuristic move-ordering and caching.
     Signature: minimax(board, depth, -inf, inf, True, AI_PIECE, visualize)
-    Returns (col, score, graph).
+    Returns (col, score, graph); graph is the models.ai.tree_recorder.TreeRecorder
+    of the search when visualizing (pass one in to cap its size), else None.
+    zobrist_key / mirror_key are the Zobrist hashes of the board and its
+    mirror image, passed down so children update them with one XOR instead
+    of rehashing the board.
+    deadline (models.ai.iterative.Deadline) aborts the search with
+    SearchTimeout once its time budget is spent.
+    batch scores all children of a node with one evaluate_boards call, and
+    one ply above the leaves uses those scores instead of recursing.
+    tactics limits interior nodes to the moves models.tactics.tactical_moves
+    keeps (fours, forced blocks, then safe moves).
+    stats (models.ai.stats.SearchStats) collects node, cutoff and timing counts.
+    A BitBoard is searched in place with play/undo and is back in its
+    original position when the call returns (or raises).
     """
-    # Visualization setup
-    if visualize and graph is None:
-        graph = nx.DiGraph()
-    if visualize and id_counter is None:
-        id_counter = {"next": 0}
-    if visualize and node_id is None:
-        node_id = id_counter["next"]
-        id_counter["next"] += 1
-        graph.add_node(node_id, label="")  # initialize placeholder label
-
-    # Transposition key excludes alpha/beta bounds
-    key = (tuple(board), depth, maximizingPlayer, strategy)
-    if not visualize and key in _transposition_table_ab:
-        col, score = _transposition_table_ab[key]
-        return col, score, graph
-
-    valid_cols = get_valid_locations(board)
+    if deadline is not None:
+        deadline.check()
+    if stats is not None:
+        stats.node(depth)
+
+    # Visualization setup: the root of the recorded tree, which is always expanded
+    root = visualize and node_id is None
+    if root:
+        if graph is None:
+            graph = TreeRecorder()
+        node_id = graph.add(kind=MAX if maximizingPlayer else MIN)
+        visualize = node_id is not None  # a full recorder records nothing more
+
+    # Transposition lookup: entries carry the bound they were searched with
+    if zobrist_key is None:
+        zobrist_key = zobrist_hash(board)
+    if mirror_key is None:
+        mirror_key = mirror_hash(board)
+    context = context_key(piece, strategy, tactics)
+    if maximizingPlayer:
+        context ^= SIDE_KEY
+    key, mirrored = canonical_key(zobrist_key ^ context, mirror_key ^ context)
+    alpha_orig, beta_orig = alpha, beta
+    tt_move = None
+    entry = _transposition_table_ab.probe(key, depth)
+    if stats is not None:
+        stats.probe(entry)
+    if entry is not None:
+        tt_move = oriented(entry[3], mirrored)  # best move of an earlier (possibly shallower) search
+    if entry is not None and entry[0] >= depth and not root:
+        _, flag, value, _ = entry
+        move = tt_move
+        if flag == EXACT:
+            if visualize:
+                graph.mark_cached(node_id, value)
+            return move, value, graph
+        if flag == LOWER:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            if visualize:
+                graph.mark_cached(node_id, value)
+            return move, value, graph
+
+    api = board_api(board)  # string board or BitBoard
+    valid_cols = api.get_valid_locations(board)
     terminal = (depth == 0) or (not valid_cols)
 
     # Terminal evaluation
     if terminal:
-        score = evaluate_board(board, piece, strategy=strategy)
+        score = evaluate_board(board, piece, strategy=strategy) if stats is None else \
+            stats.evaluate(board, piece, strategy)
         if visualize:
-            graph.nodes[node_id]['label'] = str(score)
+            graph.set_score(node_id, score)
         result_col, result_score = None, score
+        flag = EXACT  # a static evaluation does not depend on the window
     else:
         opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
         # Prepare children with heuristic values
+        mover = piece if maximizingPlayer else opponent
+        if tactics:
+            valid_cols = tactical_moves(board, mover)
+        batched = batch and strategy == "combined"
+        # Children are leaves: their batched scores are their values
+        leaf_scores = batched and depth == 1
+        movegen = stats.movegen_start() if stats is not None else None
+        in_place = isinstance(board, BitBoard)  # children are played and undone on the board itself
         children = []
         for col in valid_cols:
-            row = get_next_open_row(board, col)
-            new_board = drop_piece(
-                board, row, col,
-                piece if maximizingPlayer else opponent
-            )
-            h_val = evaluate_board(new_board, piece, strategy=strategy)
-            children.append((col, new_board, h_val))
-
-        # Sort by heuristic
-        children.sort(key=lambda x: x[2], reverse=maximizingPlayer)
+            if in_place:
+                row = board.play(col, mover)
+                new_board = board
+            else:
+                row = api.get_next_open_row(board, col)
+                new_board = api.drop_piece(board, row, col, mover)
+            if batched and not in_place:
+                h_val = None
+            elif stats is None:
+                h_val = evaluate_board(new_board, piece, strategy=strategy)
+            else:
+                h_val = stats.evaluate(new_board, piece, strategy, leaf=leaf_scores)
+            if in_place:
+                board.undo()
+            idx = row * COLUMN_COUNT + col
+            child_keys = (zobrist_key ^ ZOBRIST[mover][idx], mirror_key ^ ZOBRIST[mover][MIRROR_INDEX[idx]])
+            children.append((col, None if in_place else new_board, h_val, child_keys))
+        if batched and not in_place:  # a BitBoard child is scored natively above
+            boards = [c[1] for c in children]
+            h_vals = evaluate_boards(boards, piece) if stats is None else \
+                stats.evaluate_many(boards, piece, leaf=leaf_scores)
+            children = [(col, b, h, k) for (col, b, _, k), h in zip(children, h_vals)]
+
+        # Sort by heuristic, trying the cached best move first
+        children.sort(key=lambda x: (x[0] != tt_move, -x[2] if maximizingPlayer else x[2]))
+        if stats is not None:
+            stats.movegen_end(movegen)
 
         # Initialize bests and bounds
         best_val = -math.inf if maximizingPlayer else math.inf
-        result_col = random.choice([c for c, _, _ in children])
+        result_col = random.choice([c for c, _, _, _ in children])
 
         # Recurse with pruning
-        for col, child_board, _ in children:
-            child_id = None
-            if visualize:
-                child_id = id_counter['next']
-                id_counter['next'] += 1
-                graph.add_node(child_id, label="")  # placeholder
-
-            _, child_score, graph = minimax(
-                child_board,
-                depth - 1,
-                alpha,
-                beta,
-                not maximizingPlayer,
-                piece,
-                visualize,
-                strategy,
-                graph,
-                id_counter,
-                child_id
-            )
+        for i, (col, child_board, h_val, (child_key, child_mirror_key)) in enumerate(children):
+            child_id = graph.add(node_id, MIN if maximizingPlayer else MAX, col) if visualize else None
+
+            if leaf_scores:
+                child_score = h_val
+                if child_id is not None:
+                    graph.set_score(child_id, child_score)
+            else:
+                if in_place:
+                    board.play(col, mover)
+                    child_board = board
+                try:
+                    _, child_score, graph = minimax(
+                        child_board,
+                        depth - 1,
+                        alpha,
+                        beta,
+                        not maximizingPlayer,
+                        piece,
+                        child_id is not None,
+                        strategy,
+                        graph,
+                        child_id,
+                        child_key,
+                        deadline,
+                        batch,
+                        tactics,
+                        child_mirror_key,
+                        stats
+                    )
+                finally:
+                    if in_place:
+                        board.undo()
 
             # Update best_val and bounds
             if maximizingPlayer:
@@ -101,20 +195,19 @@ def minimax(board, depth, alpha, beta, maximizingPlayer,
                     result_col = col
                 beta = min(beta, best_val)
 
-            # Draw after updating real value
-            if visualize:
-                graph.nodes[node_id]['label'] = f"{best_val:.1f}"
-                graph.add_edge(node_id, child_id)
-
             # Alpha-beta cutoff
             if beta <= alpha:
+                if stats is not None:
+                    stats.cutoff(i)
                 break
 
         result_score = best_val
+        flag = bound_flag(result_score, alpha_orig, beta_orig)
+        if visualize:
+            graph.set_score(node_id, result_score)
 
-    # Cache result
-    if not visualize:
-        _transposition_table_ab[key] = (result_col, result_score)
+    # Cache result with the bound it holds for the original window
+    _transposition_table_ab.store(key, depth, flag, result_score, oriented(result_col, mirrored))
 
     return result_col, result_score, graph
 
@@ -1,93 +1,136 @@
 import math
 import random
-import networkx as nx
 
-from models.board import get_valid_locations, get_next_open_row, drop_piece
+from models.bitboard import BitBoard, board_api
 from models.constants import PLAYER_PIECE, AI_PIECE, EMPTY, ROW_COUNT, COLUMN_COUNT
 from models.heuristics import evaluate_board  # relative path: models/heuristics.py
+from models.zobrist import (ZOBRIST, MIRROR_INDEX, SIDE_KEY, zobrist_hash, mirror_hash,
+                            canonical_key, oriented, context_key)
+from models.ai.transposition import TranspositionTable, EXACT
+from models.ai.tree_recorder import TreeRecorder, MAX, MIN
 
-# Transposition table to cache evaluations: {(board_key, depth, maximizing, strategy): (col, score)}
-_transposition_table = {}
+# Bounded transposition table, keyed on Zobrist hash ^ side to move ^ (piece, strategy),
+# shared by a position and its mirror image.  Without pruning every stored value is exact.
+_transposition_table = TranspositionTable()
 
 def minimax_noprune(board, depth, maximizingPlayer,
                     piece=AI_PIECE,
                     visualize=False,
                     strategy="combined",
                     graph=None,
-                    id_counter=None,
-                    node_id=None):
+                    node_id=None,
+                    zobrist_key=None,
+                    deadline=None,
+                    mirror_key=None,
+                    stats=None):
     """
     Depth-limited Minimax without alpha-beta pruning,
     but with heuristic move-ordering and caching.
     Signature matches: minimax_noprune(board, depth, True, AI_PIECE, visualize)
+    Returns (col, score, graph); graph is the models.ai.tree_recorder.TreeRecorder
+    of the search when visualizing, else None.
+    deadline (models.ai.iterative.Deadline) aborts the search with SearchTimeout.
+    stats (models.ai.stats.SearchStats) collects node and timing counts.
+    A BitBoard is searched in place with play/undo and is back in its
+    original position when the call returns (or raises).
     """
-    # Visualization setup
-    if visualize and graph is None:
-        graph = nx.DiGraph()
-    if visualize and id_counter is None:
-        id_counter = {"next": 0}
-    if visualize and node_id is None:
-        node_id = id_counter["next"]
-        id_counter["next"] += 1
-
-    # Transposition key includes heuristic strategy
-    key = (tuple(board), depth, maximizingPlayer, strategy)
-    if not visualize and key in _transposition_table:
-        col, score = _transposition_table[key]
-        return col, score, graph
-
-    valid_cols = get_valid_locations(board)
+    if deadline is not None:
+        deadline.check()
+    if stats is not None:
+        stats.node(depth)
+    # Visualization setup: the root of the recorded tree, which is always expanded
+    root = visualize and node_id is None
+    if root:
+        if graph is None:
+            graph = TreeRecorder()
+        node_id = graph.add(kind=MAX if maximizingPlayer else MIN)
+        visualize = node_id is not None  # a full recorder records nothing more
+
+    # Transposition key includes piece, heuristic strategy and side to move
+    if zobrist_key is None:
+        zobrist_key = zobrist_hash(board)
+    if mirror_key is None:
+        mirror_key = mirror_hash(board)
+    context = context_key(piece, strategy)
+    if maximizingPlayer:
+        context ^= SIDE_KEY
+    key, mirrored = canonical_key(zobrist_key ^ context, mirror_key ^ context)
+    entry = _transposition_table.probe(key)
+    if stats is not None:
+        stats.probe(entry)
+    if entry is not None and entry[0] >= depth and not root:
+        if visualize:
+            graph.mark_cached(node_id, entry[2])
+        return oriented(entry[3], mirrored), entry[2], graph
+
+    api = board_api(board)  # string board or BitBoard
+    valid_cols = api.get_valid_locations(board)
     terminal = (depth == 0) or (not valid_cols)
 
     # Terminal evaluation
     if terminal:
-        score = evaluate_board(board, piece, strategy=strategy)
+        score = evaluate_board(board, piece, strategy=strategy) if stats is None else \
+            stats.evaluate(board, piece, strategy)
         if visualize:
-            graph.add_node(node_id, label=str(score))
+            graph.set_score(node_id, score)
         result = (None, score, graph)
     else:
         # Prepare children with heuristic values for ordering
         opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+        mover = piece if maximizingPlayer else opponent
+        movegen = stats.movegen_start() if stats is not None else None
+        in_place = isinstance(board, BitBoard)  # children are played and undone on the board itself
         children = []
         for col in valid_cols:
-            row = get_next_open_row(board, col)
-            new_board = drop_piece(
-                board, row, col,
-                piece if maximizingPlayer else opponent
-            )
+            if in_place:
+                row = board.play(col, mover)
+                new_board = board
+            else:
+                row = api.get_next_open_row(board, col)
+                new_board = api.drop_piece(board, row, col, mover)
             # Heuristic evaluation at 1-ply for ordering
-            h_val = evaluate_board(new_board, piece, strategy=strategy)
-            children.append((col, new_board, h_val))
+            h_val = evaluate_board(new_board, piece, strategy=strategy) if stats is None else \
+                stats.evaluate(new_board, piece, strategy, leaf=False)
+            if in_place:
+                board.undo()
+            idx = row * COLUMN_COUNT + col
+            child_keys = (zobrist_key ^ ZOBRIST[mover][idx], mirror_key ^ ZOBRIST[mover][MIRROR_INDEX[idx]])
+            children.append((col, None if in_place else new_board, h_val, child_keys))
 
         # Sort by heuristic: high->low for maximize, low->high for minimize
         children.sort(key=lambda x: x[2], reverse=maximizingPlayer)
+        if stats is not None:
+            stats.movegen_end(movegen)
 
-        best_col = random.choice([c for c, _, _ in children])
+        best_col = random.choice([c for c, _, _, _ in children])
         best_val = -math.inf if maximizingPlayer else math.inf
 
         # Recurse through all ordered children (no pruning)
-        for col, child_board, _ in children:
+        for col, child_board, _, (child_key, child_mirror_key) in children:
             # Visualization nodes
-            child_id = None
-            if visualize:
-                child_id = id_counter["next"]
-                id_counter["next"] += 1
-
-            _, child_score, graph = minimax_noprune(
-                child_board,
-                depth - 1,
-                not maximizingPlayer,
-                piece,
-                visualize,
-                strategy,
-                graph,
-                id_counter,
-                child_id
-            )
-
-            if visualize:
-                graph.add_node(node_id, label=f"{best_val:.1f}")
-                graph.add_edge(node_id, child_id)
+            child_id = graph.add(node_id, MIN if maximizingPlayer else MAX, col) if visualize else None
+
+            if in_place:
+                board.play(col, mover)
+                child_board = board
+            try:
+                _, child_score, graph = minimax_noprune(
+                    child_board,
+                    depth - 1,
+                    not maximizingPlayer,
+                    piece,
+                    child_id is not None,
+                    strategy,
+                    graph,
+                    child_id,
+                    child_key,
+                    deadline,
+                    child_mirror_key,
+                    stats
+                )
+            finally:
+                if in_place:
+                    board.undo()
 
             if maximizingPlayer:
                 if child_score > best_val:
@@ -98,11 +141,11 @@ def minimax_noprune(board, depth, maximizingPlayer,
                     best_val = child_score
                     best_col = col
 
+        if visualize:
+            graph.set_score(node_id, best_val)
         result = (best_col, best_val, graph)
 
-    # Cache result when not visualizing
-    if not visualize:
-        _transposition_table[key] = result[:2]
+    _transposition_table.store(key, depth, EXACT, result[1], oriented(result[0], mirrored))
 
     return result
 
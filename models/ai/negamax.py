@@ -0,0 +1,187 @@
+import math
+
+from models.bitboard import BitBoard
+from models.constants import PLAYER_PIECE, AI_PIECE, ROW_COUNT, COLUMN_COUNT
+from models.heuristics import evaluate_board
+from models.incremental import IncrementalEvaluator
+from models.tactics import tactical_moves
+from models.zobrist import SIDE_KEY, canonical_key, oriented, context_key
+from models.ai.transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+# Transposition table for the PVS engine; values are stored from the side to move's view,
+# under the canonical (mirror-folded) key
+_transposition_table_pvs = TranspositionTable()
+
+# Static fallback ordering: center columns first
+CENTER_ORDER = sorted(range(COLUMN_COUNT), key=lambda c: abs(c - COLUMN_COUNT // 2))
+CENTER_RANK = {col: rank for rank, col in enumerate(CENTER_ORDER)}
+
+KILLER_SLOTS = 2
+
+
+class PVSSearch:
+    """
+    Negamax principal-variation search on a BitBoard.
+
+    Moves are ordered by the transposition-table move, then the killer
+    moves of the ply, then the history table; the child's incremental
+    static score and center-first break the remaining ties.  With
+    ``tactics`` only the moves kept by models.tactics.tactical_moves are
+    searched.  After
+    the first move every sibling is searched with a null window and only
+    re-searched with the full window when it fails high.
+
+    Scores use the same scale as minimax: ``search`` returns the value from
+    ``piece``'s point of view, so it can be compared with minimax and
+    minimax_noprune at the same depth.  ``nodes`` counts visited nodes;
+    a ``stats`` SearchStats (models/ai/stats.py) collects the details.
+    """
+
+    def __init__(self, piece=AI_PIECE, strategy="combined", tt=None, tactics=False, stats=None):
+        self.piece = piece
+        self.opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+        self.strategy = strategy
+        self.tactics = tactics
+        self.tt = _transposition_table_pvs if tt is None else tt
+        self.context = context_key("pvs", piece, strategy, tactics)
+        self.history = {p: [0] * (ROW_COUNT * COLUMN_COUNT) for p in (PLAYER_PIECE, AI_PIECE)}
+        self.nodes = 0
+        self.stats = stats
+
+    def search(self, board, depth, maximizingPlayer=True, deadline=None):
+        """Return (col, score) for ``board`` searched to ``depth`` plies."""
+        self.board = board.copy() if isinstance(board, BitBoard) else BitBoard.from_string(board)
+        self.evaluator = IncrementalEvaluator(self.board, self.piece) if self.strategy == "combined" else None
+        self.deadline = deadline
+        self.killers = [[None] * KILLER_SLOTS for _ in range(depth + 1)]
+        self.nodes = 0
+        color = 1 if maximizingPlayer else -1
+        score, col = self._pvs(depth, -math.inf, math.inf, color, 0)
+        return col, color * score
+
+    def _evaluate(self):
+        if self.evaluator is not None:
+            if self.stats is not None:
+                self.stats.leaf_evals += 1  # the incremental score is already up to date
+            return self.evaluator.score
+        if self.stats is not None:
+            return self.stats.evaluate(self.board, self.piece, self.strategy)
+        return evaluate_board(self.board, self.piece, self.strategy)
+
+    def _order(self, tt_move, ply, mover, color):
+        board = self.board
+        killers = self.killers[ply]
+        history = self.history[mover]
+        evaluator = self.evaluator
+
+        def rank(col):
+            if col == tt_move:
+                return (0, 0, 0, 0, 0)
+            static = 0
+            if evaluator is not None:
+                # One incremental update per child: cheap enough to order by
+                evaluator.drop(col, mover)
+                static = color * evaluator.score
+                evaluator.undo()
+            killer = killers.index(col) if col in killers else KILLER_SLOTS
+            return (1, killer, -history[board.heights[col] * COLUMN_COUNT + col], -static, CENTER_RANK[col])
+
+        if self.tactics:
+            return sorted(tactical_moves(board, mover), key=rank)
+        return sorted((c for c in CENTER_ORDER if board.heights[c] < ROW_COUNT), key=rank)
+
+    def _play(self, col, mover):
+        self.board.play(col, mover)
+        if self.evaluator is not None:
+            self.evaluator.drop(col, mover)
+
+    def _undo(self):
+        self.board.undo()
+        if self.evaluator is not None:
+            self.evaluator.undo()
+
+    def _pvs(self, depth, alpha, beta, color, ply):
+        """Negamax value (side to move's view) and best move of the current board."""
+        self.nodes += 1
+        stats = self.stats
+        if stats is not None:
+            stats.node(depth)
+        if self.deadline is not None:
+            self.deadline.check()
+        board = self.board
+        if depth == 0 or len(board.moves) == ROW_COUNT * COLUMN_COUNT:
+            return color * self._evaluate(), None
+
+        context = self.context ^ SIDE_KEY if color == 1 else self.context
+        key, mirrored = canonical_key(board.key ^ context, board.mirror_key ^ context)
+        alpha_orig, beta_orig = alpha, beta
+        tt_move = None
+        entry = self.tt.probe(key, depth)
+        if stats is not None:
+            stats.probe(entry)
+        if entry is not None:
+            tt_move = oriented(entry[3], mirrored)
+            if entry[0] >= depth:
+                _, flag, value, _ = entry
+                if flag == EXACT:
+                    return value, tt_move
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value, tt_move
+
+        mover = self.piece if color == 1 else self.opponent
+        best_val, best_move = -math.inf, None
+        if stats is None:
+            order = self._order(tt_move, ply, mover, color)
+        else:
+            movegen = stats.movegen_start()
+            order = self._order(tt_move, ply, mover, color)
+            stats.movegen_end(movegen)
+        for i, col in enumerate(order):
+            cell = board.heights[col] * COLUMN_COUNT + col
+            self._play(col, mover)
+            if i == 0 or alpha == -math.inf:
+                score = -self._pvs(depth - 1, -beta, -alpha, -color, ply + 1)[0]
+            else:
+                # Null-window probe; re-search only if the move beats alpha
+                score = -self._pvs(depth - 1, -alpha - 1, -alpha, -color, ply + 1)[0]
+                if alpha < score < beta:
+                    score = -self._pvs(depth - 1, -beta, -score, -color, ply + 1)[0]
+            self._undo()
+
+            if score > best_val:
+                best_val, best_move = score, col
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                if stats is not None:
+                    stats.cutoff(i)
+                killers = self.killers[ply]
+                if col not in killers:
+                    killers.insert(0, col)
+                    killers.pop()
+                self.history[mover][cell] += depth * depth
+                break
+
+        if best_val <= alpha_orig:
+            flag = UPPER
+        elif best_val >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, flag, best_val, oriented(best_move, mirrored))
+        return best_val, best_move
+
+
+def negamax(board, depth, maximizingPlayer=True, piece=AI_PIECE, strategy="combined", deadline=None,
+            tactics=False, stats=None):
+    """
+    Fixed-depth PVS search.
+    Signature: negamax(board, depth, True, AI_PIECE)
+    Returns (col, score, nodes).
+    """
+    searcher = PVSSearch(piece, strategy, tactics=tactics, stats=stats)
+    col, score = searcher.search(board, depth, maximizingPlayer, deadline)
+    return col, score, searcher.nodes
@@ -0,0 +1,137 @@
+"""
+Root-splitting parallel search.
+
+The root position is split into independent jobs that run on a persistent
+process pool: one job per root column for minimax, and one job per
+distinct chance outcome for expectiminimax (an outcome reached from
+several columns is searched once).  Each worker keeps its own
+module-level transposition tables, and they stay warm between moves
+because the pool lives for the whole game.
+
+Every job is searched with a full window, so the root value is the same
+as a sequential search to the same depth.
+"""
+import math
+import os
+import signal
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from models.bitboard import board_api
+from models.constants import AI_PIECE, COLUMN_COUNT
+from models.heuristics import evaluate_board
+from models.ai.minimax import minimax
+from models.ai.expectiminimax import expectiminimax, chance_outcomes, outcome_board
+from models.ai.iterative import SearchTimeout
+
+
+def _report_pid(pids):
+    """Pool initializer: tell the parent which process to end on close()."""
+    pids.put(os.getpid())
+
+
+def _minimax_job(board, depth, piece, strategy):
+    _, score, _ = minimax(board, depth, -math.inf, math.inf, False, piece, strategy=strategy)
+    return score
+
+
+def _expectiminimax_job(board, depth, piece, strategy):
+    _, score, _ = expectiminimax(board, depth, -math.inf, math.inf, False, piece, strategy=strategy)
+    return score
+
+
+class ParallelRootSearch:
+    """Process pool created once per game and reused for every AI move."""
+
+    def __init__(self, workers=None):
+        self.workers = workers or min(COLUMN_COUNT, os.cpu_count() or 1)
+        context = multiprocessing.get_context("spawn")
+        self.pid_queue = context.SimpleQueue()  # each worker reports its pid once started
+        self.pids = set()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                            initializer=_report_pid, initargs=(self.pid_queue,))
+
+    def worker_pids(self):
+        """Pids of the worker processes started so far."""
+        while not self.pid_queue.empty():
+            self.pids.add(self.pid_queue.get())
+        return set(self.pids)
+
+    def close(self):
+        """Stop at once: queued jobs are cancelled and running ones end with their worker processes."""
+        # shutdown alone lets running jobs finish, and the interpreter waits for them at exit.
+        # Ending the workers breaks the pool, so the executor's manager ends any other worker and exits.
+        for pid in self.worker_pids():
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:  # already gone
+                pass
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.pid_queue.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _wait(self, futures, deadline):
+        """Block until every future is done, polling ``deadline`` so the wait can be stopped."""
+        if deadline is None:
+            return
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.05)
+            if pending and deadline.expired():
+                for future in pending:
+                    future.cancel()
+                raise SearchTimeout()
+
+    def minimax(self, board, depth, piece=AI_PIECE, strategy="combined", deadline=None):
+        """Parallel equivalent of minimax(board, depth, -inf, inf, True, piece). Returns (col, score, graph)."""
+        api = board_api(board)
+        valid_cols = api.get_valid_locations(board)
+        if depth == 0 or not valid_cols:
+            return None, evaluate_board(board, piece, strategy), None
+
+        # Submit children in the same heuristic order minimax uses, so ties resolve alike
+        children = []
+        for col in valid_cols:
+            child = api.drop_piece(board, api.get_next_open_row(board, col), col, piece)
+            children.append((col, child, evaluate_board(child, piece, strategy)))
+        children.sort(key=lambda x: x[2], reverse=True)
+
+        futures = [(col, self.executor.submit(_minimax_job, child, depth - 1, piece, strategy))
+                   for col, child, _ in children]
+        self._wait([f for _, f in futures], deadline)
+        best_col, best_val = None, -math.inf
+        for col, future in futures:
+            score = future.result()
+            if score > best_val:
+                best_col, best_val = col, score
+        return best_col, best_val, None
+
+    def expectiminimax(self, board, depth, piece=AI_PIECE, strategy="combined", deadline=None):
+        """Parallel equivalent of expectiminimax(board, depth, -inf, inf, True, piece). Returns (col, score, graph)."""
+        api = board_api(board)
+        valid_cols = api.get_valid_locations(board)
+        if depth == 0 or not valid_cols:
+            return None, evaluate_board(board, piece, strategy), None
+
+        jobs = {}     # exact key -> future, shared by every column reaching that board
+        moves = {}
+        for col in valid_cols:
+            outcomes = chance_outcomes(board, col, valid_cols, piece, api)
+            for key, outcome, _ in outcomes:
+                if key not in jobs:
+                    jobs[key] = self.executor.submit(_expectiminimax_job, outcome_board(board, outcome, piece),
+                                                     depth - 1, piece, strategy)
+            moves[col] = [(w, jobs[key]) for key, _, w in outcomes]
+
+        self._wait(list(jobs.values()), deadline)
+        best_col, best_val = None, -math.inf
+        for col, outcomes in moves.items():
+            total = sum(w * future.result() for w, future in outcomes)
+            if total > best_val:
+                best_col, best_val = col, total
+        return best_col, best_val, None
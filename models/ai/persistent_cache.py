@@ -0,0 +1,138 @@
+"""
+Persistent transposition cache shared across games and processes.
+
+Deep search results (remaining depth >= ``min_depth``) are kept in an
+SQLite database next to the assets.  A TranspositionTable with a
+``backing`` cache consults it when a deep probe misses in memory, so a
+position is read from disk only the first time it is needed in a process.
+New deep results are collected in memory and written in one transaction
+by ``flush`` at the end of each AI turn; an entry only replaces a stored
+one of the same or lower depth.
+
+The database runs in WAL mode, so any number of games can read it while
+one of them writes.  Keys are the engines' 64-bit transposition keys,
+which are stable across processes (fixed Zobrist seed, hashed contexts).
+Results depend on the heuristic weights, so the database remembers a
+signature of WEIGHTS and empties itself when they change.
+"""
+import os
+import sqlite3
+import threading
+
+from models.heuristics import WEIGHTS
+from models.zobrist import context_key
+
+FORMAT_VERSION = 1
+DEFAULT_CACHE_PATH = os.path.join("assests", "search_cache.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key   INTEGER PRIMARY KEY,
+    depth INTEGER NOT NULL,
+    flag  INTEGER NOT NULL,
+    value,
+    move  INTEGER
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER);
+"""
+
+UPSERT = """
+INSERT INTO entries (key, depth, flag, value, move) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET
+    depth = excluded.depth, flag = excluded.flag, value = excluded.value, move = excluded.move
+WHERE excluded.depth >= entries.depth
+"""
+
+
+def _signed(key):
+    """SQLite integers are signed 64-bit; fold the unsigned key into that range."""
+    return key - (1 << 64) if key >= 1 << 63 else key
+
+
+def weights_signature():
+    return _signed(context_key("cache", FORMAT_VERSION, tuple(sorted(WEIGHTS.items()))))
+
+
+class PersistentCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, min_depth=4):
+        self.path = path
+        self.min_depth = min_depth
+        self.conn = None
+        self.pending = {}
+        self.lock = threading.Lock()  # the search thread probes while the game loop flushes
+        self.reads = self.hits = self.writes = 0
+
+    def _connect(self):
+        """Open the database on first use (lazy: games that never search deep never touch it)."""
+        if self.conn is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.executescript(SCHEMA)
+                row = conn.execute("SELECT value FROM meta WHERE name = 'weights'").fetchone()
+                signature = weights_signature()
+                if row is None or row[0] != signature:
+                    conn.execute("DELETE FROM entries")
+                    conn.execute("INSERT OR REPLACE INTO meta VALUES ('weights', ?)", (signature,))
+            self.conn = conn
+        return self.conn
+
+    def probe(self, key):
+        """Return ``(depth, flag, value, move)`` stored for ``key`` or None."""
+        with self.lock:
+            entry = self.pending.get(key)
+            if entry is not None:
+                return entry
+            self.reads += 1
+            row = self._connect().execute(
+                "SELECT depth, flag, value, move FROM entries WHERE key = ?", (_signed(key),)).fetchone()
+        if row is None:
+            return None
+        self.hits += 1
+        return row
+
+    def record(self, key, depth, flag, value, move):
+        """Queue a result for the next flush, keeping the deepest one per key."""
+        if depth < self.min_depth:
+            return
+        with self.lock:
+            queued = self.pending.get(key)
+            if queued is None or depth >= queued[0]:
+                self.pending[key] = (depth, flag, value, move)
+
+    def flush(self):
+        """Write every queued result in one transaction; returns how many were written."""
+        with self.lock:
+            if not self.pending:
+                return 0
+            rows = [(_signed(key), *entry) for key, entry in self.pending.items()]
+            self.pending = {}
+            conn = self._connect()
+            with conn:
+                conn.executemany(UPSERT, rows)
+        self.writes += len(rows)
+        return len(rows)
+
+    def __len__(self):
+        with self.lock:
+            return self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def stats(self):
+        return {"reads": self.reads, "hits": self.hits, "writes": self.writes, "pending": len(self.pending)}
+
+
+def attach(cache, tables):
+    """Back every TranspositionTable in ``tables`` with ``cache`` (None detaches)."""
+    for table in tables:
+        table.backing = cache
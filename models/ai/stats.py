@@ -0,0 +1,129 @@
+"""
+Opt-in search statistics.
+
+The engines take ``stats=None``.  Pass a SearchStats and they count into
+it: nodes per remaining depth, leaf and move-ordering evaluations, cutoffs
+and the index of the move that caused each one, transposition probes and
+hits, and the time spent evaluating versus generating and ordering moves.
+Iterative deepening also records the time of each completed depth.  When
+``stats`` is None the only cost is one ``is not None`` test per node.
+
+The object is filled in place, so the caller keeps it next to the move it
+asked for; ``log_line`` turns it into one JSON log line per turn.
+"""
+import json
+import time
+from collections import Counter
+
+from models.batch_eval import evaluate_boards
+from models.heuristics import evaluate_board
+
+
+class SearchStats:
+    def __init__(self):
+        self.nodes_by_depth = Counter()  # remaining depth -> nodes visited
+        self.leaf_evals = 0
+        self.order_evals = 0             # evaluations used only to order moves
+        self.cutoffs = 0
+        self.cutoff_index = Counter()    # position of the cutting move in the ordered list -> count
+        self.chance_cutoffs = 0          # Star1 cutoffs at expectiminimax chance nodes
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.eval_seconds = 0.0
+        self.movegen_seconds = 0.0
+        self.iterations = {}             # iterative deepening: depth -> seconds of that iteration
+        self.started = time.perf_counter()
+        self.seconds = None
+
+    # --- hooks called by the engines ---
+
+    def node(self, depth):
+        self.nodes_by_depth[depth] += 1
+
+    def probe(self, entry):
+        self.tt_probes += 1
+        if entry is not None:
+            self.tt_hits += 1
+
+    def cutoff(self, index):
+        self.cutoffs += 1
+        self.cutoff_index[index] += 1
+
+    def evaluate(self, board, piece, strategy="combined", leaf=True):
+        """evaluate_board, timed and counted."""
+        start = time.perf_counter()
+        score = evaluate_board(board, piece, strategy)
+        self.eval_seconds += time.perf_counter() - start
+        if leaf:
+            self.leaf_evals += 1
+        else:
+            self.order_evals += 1
+        return score
+
+    def evaluate_many(self, boards, piece, leaf=True):
+        """evaluate_boards, timed and counted."""
+        start = time.perf_counter()
+        scores = evaluate_boards(boards, piece)
+        self.eval_seconds += time.perf_counter() - start
+        if leaf:
+            self.leaf_evals += len(scores)
+        else:
+            self.order_evals += len(scores)
+        return scores
+
+    def movegen_start(self):
+        return time.perf_counter(), self.eval_seconds
+
+    def movegen_end(self, token):
+        """Add the time since ``movegen_start`` minus the evaluations made meanwhile."""
+        start, eval_before = token
+        self.movegen_seconds += time.perf_counter() - start - (self.eval_seconds - eval_before)
+
+    def iteration(self, depth, seconds):
+        self.iterations[depth] = seconds
+
+    # --- results ---
+
+    def finish(self):
+        """Stop the clock; returns self."""
+        self.seconds = time.perf_counter() - self.started
+        return self
+
+    @property
+    def nodes(self):
+        return sum(self.nodes_by_depth.values())
+
+    def branching_factor(self):
+        """Effective branching factor: growth per ply from the root level to the deepest one."""
+        if len(self.nodes_by_depth) < 2:
+            return None
+        root, deepest = max(self.nodes_by_depth), min(self.nodes_by_depth)
+        ratio = self.nodes_by_depth[deepest] / self.nodes_by_depth[root]
+        return ratio ** (1 / (root - deepest))
+
+    def as_dict(self):
+        seconds = self.seconds if self.seconds is not None else time.perf_counter() - self.started
+        ebf = self.branching_factor()
+        return {
+            "seconds": round(seconds, 4),
+            "nodes": self.nodes,
+            "nps": round(self.nodes / seconds) if seconds else None,
+            "nodes_by_depth": {d: self.nodes_by_depth[d] for d in sorted(self.nodes_by_depth, reverse=True)},
+            "branching_factor": round(ebf, 3) if ebf is not None else None,
+            "leaf_evals": self.leaf_evals,
+            "order_evals": self.order_evals,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": round(self.cutoff_index[0] / self.cutoffs, 3) if self.cutoffs else None,
+            "cutoff_index": dict(sorted(self.cutoff_index.items())),
+            "chance_cutoffs": self.chance_cutoffs,
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "tt_hit_rate": round(self.tt_hits / self.tt_probes, 3) if self.tt_probes else None,
+            "eval_seconds": round(self.eval_seconds, 4),
+            "movegen_seconds": round(self.movegen_seconds, 4),
+            "iterations": {d: round(s, 4) for d, s in self.iterations.items()},
+        }
+
+    def log_line(self, **context):
+        """``search_stats {...}``: one JSON object with ``context`` fields first."""
+        return "search_stats " + json.dumps({**context, **self.as_dict()})
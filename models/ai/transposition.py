@@ -0,0 +1,114 @@
+"""
+Bounded transposition table shared by the search engines.
+
+Entries live in buckets of two slots: a depth-preferred slot that is only
+overwritten by an equal or deeper search, and an always-replace slot that
+takes everything else.  Storage is a set of preallocated parallel lists, so
+the memory use is fixed when the table is created and never grows.
+
+Each entry records the bound type of its value:
+    EXACT  - the true minimax value
+    LOWER  - the search failed high (value >= stored)
+    UPPER  - the search failed low (value <= stored)
+
+A table may have a ``backing`` store (models/ai/persistent_cache.py): deep
+probes that miss in memory fall through to it, and deep stores are queued
+for it.  Callers pass the remaining depth to ``probe`` for that filter.
+"""
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Rough cost of one slot: five list pointers plus the boxed key/value objects
+ENTRY_BYTES = 96
+
+
+class TranspositionTable:
+    def __init__(self, size_mb=16):
+        slots = max(2, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        buckets = 1
+        while buckets * 2 * 2 <= slots:
+            buckets *= 2
+        self.bucket_mask = buckets - 1
+        self.size = buckets * 2
+        self.backing = None
+        self.clear()
+
+    def clear(self):
+        self.keys = [None] * self.size
+        self.depths = [0] * self.size
+        self.flags = [EXACT] * self.size
+        self.values = [0] * self.size
+        self.moves = [None] * self.size
+        self.hits = self.misses = self.collisions = self.stores = 0
+
+    def _slot(self, key):
+        return (hash(key) & self.bucket_mask) << 1
+
+    def probe(self, key, depth=0):
+        """Return ``(depth, flag, value, move)`` for ``key`` or None.
+
+        ``depth`` is the remaining depth of the caller; a miss at or above the
+        backing store's ``min_depth`` is looked up there and copied in.
+        """
+        i = self._slot(key)
+        keys = self.keys
+        if keys[i] == key:
+            self.hits += 1
+            return self.depths[i], self.flags[i], self.values[i], self.moves[i]
+        if keys[i + 1] == key:
+            self.hits += 1
+            return self.depths[i + 1], self.flags[i + 1], self.values[i + 1], self.moves[i + 1]
+        self.misses += 1
+        if keys[i] is not None or keys[i + 1] is not None:
+            self.collisions += 1
+        backing = self.backing
+        if backing is not None and depth >= backing.min_depth:
+            entry = backing.probe(key)
+            if entry is not None:
+                self._put(key, *entry)
+                return entry
+        return None
+
+    def store(self, key, depth, flag, value, move):
+        self._put(key, depth, flag, value, move)
+        if self.backing is not None:
+            self.backing.record(key, depth, flag, value, move)
+
+    def _put(self, key, depth, flag, value, move):
+        i = self._slot(key)
+        keys = self.keys
+        if keys[i] is None or keys[i] == key or depth >= self.depths[i]:
+            slot = i  # depth-preferred tier
+        else:
+            slot = i + 1  # always-replace tier
+        if slot == i and keys[i + 1] == key:
+            keys[i + 1] = None  # promoted; drop the stale shallow copy
+        keys[slot] = key
+        self.depths[slot] = depth
+        self.flags[slot] = flag
+        self.values[slot] = value
+        self.moves[slot] = move
+        self.stores += 1
+
+    def __len__(self):
+        return sum(k is not None for k in self.keys)
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            "size": self.size,
+            "used": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "hit_rate": self.hits / probes if probes else 0.0,
+        }
+
+
+def bound_flag(value, alpha, beta):
+    """Bound type of a result searched with window (alpha, beta)."""
+    if value <= alpha:
+        return UPPER
+    if value >= beta:
+        return LOWER
+    return EXACT
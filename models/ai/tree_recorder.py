@@ -0,0 +1,102 @@
+"""
+Compact search-tree recorder for the visualizer.
+
+The engines record the tree they search when called with
+``visualize=True``.  Nodes live in parallel arrays instead of per-node
+dicts: parent, first child and next sibling links, kind, the
+move that leads to the node, the probability of a chance node and the
+node's score.  Node 0 is the root.  Children are linked newest first and
+reported in the order they were added.
+
+The transposition table stays on while recording: a node answered from it
+is recorded with its score and the CACHED flag, without children.  With
+``max_nodes`` the recorder stops taking nodes once full; ``add`` then
+returns None and the engines search that subtree without recording it.
+
+``to_networkx`` builds the DiGraph utils/tree_visualizer.py draws, only
+when the tree is actually shown.
+"""
+import math
+from array import array
+
+MAX, MIN, MOVE, CHANCE = 0, 1, 2, 3  # MOVE: an expectiminimax move before its chance outcomes
+CACHED = 4                           # flag: value came from the transposition table
+NO_NODE = -1
+
+
+class TreeRecorder:
+    def __init__(self, max_nodes=None):
+        self.max_nodes = max_nodes
+        self.parent = array("i")
+        self.first_child = array("i")
+        self.next_sibling = array("i")
+        self.kind = array("b")
+        self.move = array("b")           # column played into the node, -1 for none
+        self.weight = array("f")         # probability of a chance node
+        self.score = array("d")          # NaN until the node is scored
+        self.dropped = 0                 # nodes refused because the recorder was full
+
+    def add(self, parent=NO_NODE, kind=MAX, move=None, weight=1.0):
+        """Append a child of ``parent`` (NO_NODE for the root); returns its index, or None when full."""
+        node = len(self.parent)
+        if self.max_nodes is not None and node >= self.max_nodes:
+            self.dropped += 1
+            return None
+        self.parent.append(parent)
+        self.first_child.append(NO_NODE)
+        self.next_sibling.append(NO_NODE if parent == NO_NODE else self.first_child[parent])
+        self.kind.append(kind)
+        self.move.append(-1 if move is None else move)
+        self.weight.append(weight)
+        self.score.append(math.nan)
+        if parent != NO_NODE:
+            self.first_child[parent] = node
+        return node
+
+    def set_score(self, node, score):
+        self.score[node] = score
+
+    def mark_cached(self, node, score):
+        self.kind[node] |= CACHED
+        self.score[node] = score
+
+    def __len__(self):
+        return len(self.parent)
+
+    def children(self, node):
+        out = []
+        child = self.first_child[node]
+        while child != NO_NODE:
+            out.append(child)
+            child = self.next_sibling[child]
+        out.reverse()
+        return out
+
+    def node_type(self, node):
+        kind = self.kind[node]
+        if kind & CACHED:
+            return "cached"
+        return "chance" if kind == CHANCE else "decision"
+
+    def label(self, node):
+        kind, score = self.kind[node], self.score[node]
+        lines = []
+        if kind == CHANCE:
+            lines.append(f"P={self.weight[node]:.2f}")
+        elif self.move[node] >= 0:
+            lines.append(f"col={self.move[node]}")
+        if not math.isnan(score):
+            lines.append(str(int(score)) if score.is_integer() else f"{score:.1f}")
+        if kind & CACHED:
+            lines.append("TT")
+        return "\n".join(lines)
+
+    def to_networkx(self):
+        """The recorded tree as a networkx.DiGraph with 'label' and 'node_type' node attributes."""
+        import networkx as nx  # only needed when a tree is drawn
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from((n, {"label": self.label(n), "node_type": self.node_type(n)})
+                             for n in range(len(self)))
+        graph.add_edges_from((p, n) for n, p in enumerate(self.parent) if p != NO_NODE)
+        return graph
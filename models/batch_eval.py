@@ -0,0 +1,113 @@
+"""
+Vectorized combined heuristic for many boards at once.
+
+``evaluate_boards`` packs N boards into an (N, 42) int8 array (BitBoards
+straight from their bitmasks) and scores every 4-cell window of every
+board with one fancy-index gather over the precomputed WINDOWS index
+array.  Window scores come from the same
+WINDOW_TERMS table as ``combined_heuristic`` (rebuilt when WEIGHTS
+changes), including the playable-cell rule, so the batch and the
+per-board path can be mixed freely.
+
+NumPy is optional: without it ``evaluate_boards`` falls back to calling
+``evaluate_board`` once per board.
+"""
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+from models.bitboard import BitBoard, H1
+from models.board import WINDOWS
+from models.constants import ROW_COUNT, COLUMN_COUNT, PLAYER_PIECE, AI_PIECE
+import models.heuristics as heuristics
+from models.heuristics import WEIGHTS, CELL_NEIGHBORS, evaluate_board
+
+HAVE_NUMPY = np is not None
+
+# Cell codes in the packed array, relative to the piece being scored
+MINE, THEIRS = 1, 2
+
+if HAVE_NUMPY:
+    WINDOW_INDEX = np.array(WINDOWS, dtype=np.intp)                     # (69, 4)
+    CENTER_INDEX = np.arange(ROW_COUNT) * COLUMN_COUNT + COLUMN_COUNT // 2
+    # Cells that can be isolated (see CELL_NEIGHBORS) and their four neighbors
+    ISOLATION_CELLS = np.array([i for i, n in enumerate(CELL_NEIGHBORS) if n is not None], dtype=np.intp)
+    ISOLATION_NEIGHBORS = np.array([n for n in CELL_NEIGHBORS if n is not None], dtype=np.intp)
+    BELOW_INDEX = np.arange(COLUMN_COUNT, ROW_COUNT * COLUMN_COUNT) - COLUMN_COUNT
+    # Bit of each string-board cell in a BitBoard mask
+    CELL_BITS = np.array([(idx % COLUMN_COUNT) * H1 + idx // COLUMN_COUNT
+                          for idx in range(ROW_COUNT * COLUMN_COUNT)], dtype=np.int64)
+
+
+def pack_boards(boards, piece):
+    """(N, 42) int8 array: 0 empty, MINE for ``piece``, THEIRS for the opponent."""
+    opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+    if all(isinstance(b, BitBoard) for b in boards):
+        masks = np.array([(b.bits[piece], b.bits[opponent]) for b in boards], dtype=np.int64)
+        cells = ((masks[:, :, None] >> CELL_BITS) & 1).astype(np.int8)  # (N, 2, 42)
+        return cells[:, 0] * MINE + cells[:, 1] * THEIRS
+    flat = "".join(b.to_string() if isinstance(b, BitBoard) else "".join(b) for b in boards)
+    raw = np.frombuffer(flat.encode("ascii"), dtype=np.uint8).reshape(len(boards), ROW_COUNT * COLUMN_COUNT)
+    packed = np.zeros(raw.shape, dtype=np.int8)
+    packed[raw == ord(piece)] = MINE
+    packed[raw == ord(opponent)] = THEIRS
+    return packed
+
+
+def _playable(packed):
+    """Boolean (N, 42) mask of the cell each column's next piece would land on."""
+    empty = packed == 0
+    playable = empty.copy()
+    playable[:, COLUMN_COUNT:] &= ~empty[:, BELOW_INDEX]
+    return playable
+
+
+# (TABLES_VERSION, base, threat): heuristics.WINDOW_TERMS as two (5, 5) arrays indexed [yours, theirs]
+_window_terms = (None, None, None)
+
+
+def window_term_arrays():
+    """WINDOW_TERMS as NumPy lookup arrays, rebuilt whenever the heuristic tables are."""
+    global _window_terms
+    heuristics.refresh_pattern_tables()
+    if _window_terms[0] != heuristics.TABLES_VERSION:
+        base = np.zeros((5, 5), dtype=np.int64)
+        threat = np.zeros((5, 5), dtype=np.int64)
+        for (yours, theirs), (b, t) in heuristics.WINDOW_TERMS.items():
+            base[yours, theirs], threat[yours, theirs] = b, t
+        _window_terms = (heuristics.TABLES_VERSION, base, threat)
+    return _window_terms[1:]
+
+
+def score_packed(packed):
+    """combined_heuristic of every row of a packed array, as an int64 array."""
+    base, threat = window_term_arrays()
+    cells = packed[:, WINDOW_INDEX]                                   # (N, 69, 4)
+    yours = (cells == MINE).sum(axis=2)
+    theirs = (cells == THEIRS).sum(axis=2)
+    # A window's threat term needs its single empty cell playable, i.e. any of its cells
+    open_cell = _playable(packed)[:, WINDOW_INDEX].any(axis=2)
+
+    score = (packed[:, CENTER_INDEX] == MINE).sum(axis=1).astype(np.int64) * heuristics.CENTER_WEIGHT
+    window = base[yours, theirs] + threat[yours, theirs] * open_cell
+    score += window.sum(axis=1, dtype=np.int64)
+
+    mine = packed == MINE
+    isolated = mine[:, ISOLATION_CELLS] & ~mine[:, ISOLATION_NEIGHBORS].any(axis=2)
+    score -= isolated.sum(axis=1) * WEIGHTS["isolation_penalty"]
+    return score
+
+
+def evaluate_boards(boards, piece):
+    """
+    Combined heuristic of every board in ``boards`` for ``piece``.
+    Boards may be strings, lists or BitBoards.  Returns a list of ints in
+    the same order, equal to [evaluate_board(b, piece) for b in boards].
+    """
+    boards = list(boards)
+    if not boards:
+        return []
+    if not HAVE_NUMPY:
+        return [evaluate_board(b, piece) for b in boards]
+    return score_packed(pack_boards(boards, piece)).tolist()
@@ -0,0 +1,269 @@
+"""
+Bitboard engine with the same function names as models/board.py.
+
+Each column owns ROW_COUNT + 1 bits (one sentinel bit on top), so the cell
+(row, col) lives at bit ``col * (ROW_COUNT + 1) + row``.  The sentinel row
+keeps the shift-based line detection from wrapping across columns.
+
+A BitBoard is also a read-only sequence of cell characters indexed exactly
+like the string board (``board[row * COLUMN_COUNT + col]``), so heuristics
+and views written for strings keep working on it.
+"""
+import sys
+
+import models.board as string_board
+from models.constants import ROW_COUNT, COLUMN_COUNT, EMPTY, PLAYER_PIECE, AI_PIECE
+from models.zobrist import ZOBRIST, MIRROR_INDEX
+
+H1 = ROW_COUNT + 1  # bits per column including the sentinel
+
+BOTTOM_MASK = sum(1 << (c * H1) for c in range(COLUMN_COUNT))
+BOARD_MASK = BOTTOM_MASK * ((1 << ROW_COUNT) - 1)
+TOP_MASK = BOTTOM_MASK << (ROW_COUNT - 1)
+
+# Shifts for horizontal, vertical, "/" diagonal and "\" diagonal lines
+DIRECTIONS = (H1, 1, H1 + 1, H1 - 1)
+
+
+def cell_bit(row, col):
+    return 1 << (col * H1 + row)
+
+
+def column_mask(col):
+    return ((1 << ROW_COUNT) - 1) << (col * H1)
+
+
+def has_four(bits):
+    """True if ``bits`` contains four aligned pieces in any direction."""
+    for shift in DIRECTIONS:
+        m = bits & (bits >> shift)
+        if m & (m >> (2 * shift)):
+            return True
+    return False
+
+
+def mirror_bits(bits):
+    """Reflect a bitmask left/right (column c <-> column COLUMN_COUNT - 1 - c)."""
+    column = (1 << H1) - 1
+    mirrored = 0
+    for col in range(COLUMN_COUNT):
+        mirrored |= ((bits >> (col * H1)) & column) << ((COLUMN_COUNT - 1 - col) * H1)
+    return mirrored
+
+
+def count_fours(bits):
+    """Number of fully owned 4-cell windows (same count as check_winner)."""
+    total = 0
+    for shift in DIRECTIONS:
+        m = bits & (bits >> shift)
+        total += bin(m & (m >> (2 * shift))).count("1")
+    return total
+
+
+class BitBoard:
+    """Two piece bitmasks plus per-column heights, with O(1) play/undo.
+
+    ``key`` is the position's Zobrist hash and ``mirror_key`` the hash of
+    its left/right mirror image, both updated on every play/undo.
+    """
+
+    __slots__ = ("bits", "heights", "moves", "key", "mirror_key")
+
+    def __init__(self):
+        self.bits = {PLAYER_PIECE: 0, AI_PIECE: 0}
+        self.heights = [0] * COLUMN_COUNT
+        self.moves = []
+        self.key = 0
+        self.mirror_key = 0
+
+    @classmethod
+    def from_string(cls, board_str):
+        """Build a BitBoard from a string (or list) board.
+
+        Pieces are replayed column by column from the bottom up, which is
+        only meaningful for boards that respect gravity - every board the
+        game can produce does.
+        """
+        bb = cls()
+        for col in range(COLUMN_COUNT):
+            for row in range(ROW_COUNT):
+                cell = board_str[row * COLUMN_COUNT + col]
+                if cell == EMPTY:
+                    break
+                bb.play(col, cell)
+        return bb
+
+    def copy(self):
+        bb = BitBoard.__new__(BitBoard)
+        bb.bits = dict(self.bits)
+        bb.heights = self.heights[:]
+        bb.moves = self.moves[:]
+        bb.key = self.key
+        bb.mirror_key = self.mirror_key
+        return bb
+
+    # --- O(1) move making ---
+    def play(self, col, piece):
+        row = self.heights[col]
+        self.bits[piece] |= 1 << (col * H1 + row)
+        self.heights[col] = row + 1
+        self.moves.append((col, piece))
+        idx = row * COLUMN_COUNT + col
+        self.key ^= ZOBRIST[piece][idx]
+        self.mirror_key ^= ZOBRIST[piece][MIRROR_INDEX[idx]]
+        return row
+
+    def undo(self):
+        col, piece = self.moves.pop()
+        row = self.heights[col] - 1
+        self.heights[col] = row
+        self.bits[piece] ^= 1 << (col * H1 + row)
+        idx = row * COLUMN_COUNT + col
+        self.key ^= ZOBRIST[piece][idx]
+        self.mirror_key ^= ZOBRIST[piece][MIRROR_INDEX[idx]]
+        return col, piece
+
+    # --- Queries ---
+    @property
+    def mask(self):
+        return self.bits[PLAYER_PIECE] | self.bits[AI_PIECE]
+
+    def move_mask(self):
+        """Bitmask of the cells where a piece can be dropped right now."""
+        return (self.mask + BOTTOM_MASK) & BOARD_MASK
+
+    def can_play(self, col):
+        return self.heights[col] < ROW_COUNT
+
+    def is_winning_move(self, col, piece):
+        """True if dropping ``piece`` in ``col`` completes a four."""
+        return has_four(self.bits[piece] | cell_bit(self.heights[col], col))
+
+    def piece_count(self):
+        return len(self.moves)
+
+    def position_key(self):
+        """Exact 49-bit key: one sentinel bit above each column's top piece, plus PLAYER_PIECE's cells."""
+        return (self.mask + BOTTOM_MASK) | self.bits[PLAYER_PIECE]
+
+    def to_string(self):
+        return "".join(self[i] for i in range(ROW_COUNT * COLUMN_COUNT))
+
+    # --- Sequence protocol, indexed like the string board ---
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += ROW_COUNT * COLUMN_COUNT
+        row, col = divmod(idx, COLUMN_COUNT)
+        bit = 1 << (col * H1 + row)
+        if self.bits[PLAYER_PIECE] & bit:
+            return PLAYER_PIECE
+        if self.bits[AI_PIECE] & bit:
+            return AI_PIECE
+        return EMPTY
+
+    def __len__(self):
+        return ROW_COUNT * COLUMN_COUNT
+
+    def __iter__(self):
+        return (self[i] for i in range(ROW_COUNT * COLUMN_COUNT))
+
+    def __contains__(self, cell):
+        if cell == EMPTY:
+            return len(self.moves) < ROW_COUNT * COLUMN_COUNT
+        return bool(self.bits.get(cell, 0))
+
+    def count(self, cell):
+        if cell == EMPTY:
+            return ROW_COUNT * COLUMN_COUNT - len(self.moves)
+        return bin(self.bits.get(cell, 0)).count("1")
+
+    def __eq__(self, other):
+        if isinstance(other, BitBoard):
+            return self.bits == other.bits
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.bits[PLAYER_PIECE], self.bits[AI_PIECE]))
+
+    def __str__(self):
+        return self.to_string()
+
+    def __repr__(self):
+        return f"BitBoard({self.to_string()!r})"
+
+
+# --- Same API as models/board.py ---
+
+def create_board():
+    return BitBoard()
+
+
+def drop_piece(board, row, col, piece):
+    """Return a copy of ``board`` with ``piece`` dropped in ``col``.
+
+    ``row`` is accepted for signature compatibility; on a bitboard the piece
+    always lands on the column height.  Search code that owns its board
+    should use ``board.play`` / ``board.undo`` instead of copying.
+    """
+    new_board = board.copy()
+    new_board.play(col, piece)
+    return new_board
+
+
+def is_valid_location(board, col):
+    return board.heights[col] < ROW_COUNT
+
+
+def get_next_open_row(board, col):
+    row = board.heights[col]
+    return row if row < ROW_COUNT else None
+
+
+def get_valid_locations(board):
+    return [col for col in range(COLUMN_COUNT) if board.heights[col] < ROW_COUNT]
+
+
+def is_board_full(board):
+    return len(board.moves) == ROW_COUNT * COLUMN_COUNT
+
+
+def is_terminal_node(board):
+    return is_board_full(board)
+
+
+def winning_move(board, piece):
+    return has_four(board.bits[piece])
+
+
+def check_winner(board):
+    return {PLAYER_PIECE: count_fours(board.bits[PLAYER_PIECE]),
+            AI_PIECE: count_fours(board.bits[AI_PIECE])}
+
+
+def is_playable(board, idx):
+    row, col = divmod(idx, COLUMN_COUNT)
+    return board.heights[col] == row
+
+
+def position_key(board):
+    """Collision-free key of a string board or BitBoard (see BitBoard.position_key)."""
+    if isinstance(board, BitBoard):
+        return board.position_key()
+    return BitBoard.from_string(board).position_key()
+
+
+def canonical_position_key(board):
+    """Return (key, mirrored): the smaller position key of ``board`` and its mirror image."""
+    key = position_key(board)
+    mirrored = mirror_bits(key)  # columns are independent 7-bit fields of the key
+    if mirrored < key:
+        return mirrored, True
+    return key, False
+
+
+def board_api(board):
+    """Return the module implementing the board functions for ``board``.
+
+    Lets the AI engines accept either a string board or a BitBoard.
+    """
+    return sys.modules[__name__] if isinstance(board, BitBoard) else string_board
@@ -15,6 +15,12 @@ for r in range(3, ROW_COUNT):
     for c in range(COLUMN_COUNT - 3):
         WINDOWS.append([(r - i) * COLUMN_COUNT + (c + i) for i in range(4)])
 
+# Index of the windows each cell belongs to (at most 16 per cell)
+CELL_WINDOWS = [[] for _ in range(ROW_COUNT * COLUMN_COUNT)]
+for w, window in enumerate(WINDOWS):
+    for i in window:
+        CELL_WINDOWS[i].append(w)
+
 def create_board():
     return EMPTY * (ROW_COUNT * COLUMN_COUNT)
 
@@ -47,7 +53,8 @@ def winning_move(board, piece):
             return True
     return False
 
-def evaluate_window(window_str, piece):
+def count_window_score(window_str, piece):
+    """Score one window by counting its pieces; used to fill WINDOW_SCORE_TABLE."""
     score = 0
     opp_piece = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
 
@@ -69,15 +76,32 @@ def evaluate_window(window_str, piece):
 
     return score
 
+# Every 4-cell window content as a string of cell characters (3^4 = 81 base-3 codes)
+WINDOW_PATTERNS = [a + b + c + d
+                   for a in (EMPTY, PLAYER_PIECE, AI_PIECE) for b in (EMPTY, PLAYER_PIECE, AI_PIECE)
+                   for c in (EMPTY, PLAYER_PIECE, AI_PIECE) for d in (EMPTY, PLAYER_PIECE, AI_PIECE)]
+
+# piece -> window string -> evaluate_window score, so scoring a window is one dict lookup
+WINDOW_SCORE_TABLE = {
+    piece: {pattern: count_window_score(pattern, piece) for pattern in WINDOW_PATTERNS}
+    for piece in (PLAYER_PIECE, AI_PIECE)
+}
+
+def evaluate_window(window_str, piece):
+    try:
+        return WINDOW_SCORE_TABLE[piece][window_str]
+    except (KeyError, TypeError):  # not one of the 81 cell strings (a list, another piece): count it
+        return count_window_score(window_str, piece)
+
 def score_position(board, piece):
     score = 0
     center_col = COLUMN_COUNT // 2
     center_count = sum(board[r * COLUMN_COUNT + center_col] == piece for r in range(ROW_COUNT))
     score += center_count * 3
 
-    for window in WINDOWS:
-        window_str = ''.join(board[i] for i in window)
-        score += evaluate_window(window_str, piece)
+    table = WINDOW_SCORE_TABLE[piece]
+    for a, b, c, d in WINDOWS:
+        score += table[board[a] + board[b] + board[c] + board[d]]
 
     return score
 
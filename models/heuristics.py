@@ -1,5 +1,6 @@
 # Import necessary functions and constants from related modules
-from models.board import score_position, generate_windows, is_playable  # Functions for board analysis and move legality
+from models.board import WINDOW_PATTERNS, WINDOW_SCORE_TABLE, generate_windows, is_playable  # Window tables and move legality
+from models.bitboard import BitBoard, BOARD_MASK, DIRECTIONS, H1, column_mask  # Bitboard engine, scored on its bitmasks
 from models.constants import ROW_COUNT, COLUMN_COUNT, PLAYER_PIECE, AI_PIECE, EMPTY  # Game constants
 
 # Precompute all 4-cell windows (possible winning alignments on the board)
@@ -21,70 +22,197 @@ WEIGHTS = {
 # Define neighbor index deltas to check for isolation (adjacent indices horizontally and vertically)
 NEIGHBOR_DELTAS = [-1, 1, -COLUMN_COUNT, COLUMN_COUNT]  # Left, Right, Above, Below
 
-def combined_heuristic(board, piece):
-    # Determine the opponent's piece based on the current player's piece
-    opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE  # Choose opponent's piece
-    score = score_position(board, piece)  # Initialize score with base position evaluation
+# Precompute the neighbor indices of every cell for the isolation check;
+# a cell with any neighbor off the board (an edge row or edge column) maps to None and is never isolated.
+# Edge columns count as off the board too, so -1/+1 never wrap into another row and the
+# heuristic scores a position and its left/right mirror the same.
+CELL_NEIGHBORS = [
+    [idx + delta for delta in NEIGHBOR_DELTAS]
+    if 0 < idx // COLUMN_COUNT < ROW_COUNT - 1 and 0 < idx % COLUMN_COUNT < COLUMN_COUNT - 1 else None
+    for idx in range(ROW_COUNT * COLUMN_COUNT)
+]
+
+def window_terms(yours, theirs):
+    """Score of a window holding ``yours`` own and ``theirs`` opponent pieces, split into
+    (unconditional score, bonus that only applies when the window's single empty cell is playable)."""
+    empties = 4 - yours - theirs  # Remaining cells are empty
+    base = threat = 0
+
+    # score_position's evaluate_window terms (fixed weights in models/board.py)
+    base += WINDOW_SCORE_TABLE[AI_PIECE][AI_PIECE * yours + PLAYER_PIECE * theirs + EMPTY * empties]
+
+    # --- Offensive Rewards ---
+    if yours == 4:
+        base += WEIGHTS["reward_4"]  # Add large reward if the player has a winning move
+    elif yours == 3 and empties == 1:
+        threat += WEIGHTS["reward_3"] + WEIGHTS["trap_bonus"]  # Reward if the move is playable and creates a trap
+    elif yours == 2 and empties == 2:
+        base += WEIGHTS["reward_2"]  # Reward for a 2-piece alignment with potential to expand
+    elif yours == 1 and empties == 3:
+        base += WEIGHTS["reward_1"]  # Minimal reward for a single piece in a window
+
+    # --- Defensive Penalties ---
+    if theirs == 3 and empties == 1:
+        threat -= WEIGHTS["block_3"]  # Deduct heavy penalty if opponent is close to winning
+    elif theirs == 2 and empties == 2:
+        base -= WEIGHTS["block_2"]  # Deduct penalty for opponent's potential threat
+    return base, threat
+
+# (yours, theirs) -> (score, playable-threat bonus); rebuilt from WEIGHTS by rebuild_pattern_tables
+WINDOW_TERMS = {}
+# piece -> window string -> (score, playable-threat bonus, offset of the empty cell or None)
+PATTERN_TABLE = {}
+# (yours, theirs, score, playable-threat bonus) of the WINDOW_TERMS entries that score anything
+BIT_TERMS = []
+# Center column weight: score_position counts it with weight 3, combined_heuristic adds its own
+CENTER_WEIGHT = 0
+# (lowest, highest) score combined_heuristic can return on any board; read it through score_bounds()
+SCORE_BOUNDS = (0, 0)
+# Copy of WEIGHTS the tables were built from
+_table_weights = None
+# Incremented on every rebuild, so derived tables (models/batch_eval.py) know when to follow
+TABLES_VERSION = 0
+
+def rebuild_pattern_tables():
+    """Recompute the lookup tables from WEIGHTS."""
+    global CENTER_WEIGHT, SCORE_BOUNDS, _table_weights, TABLES_VERSION
+    _table_weights = dict(WEIGHTS)
+    TABLES_VERSION += 1
+    CENTER_WEIGHT = 3 + WEIGHTS["center_control"]
+    WINDOW_TERMS.clear()
+    for yours in range(5):
+        for theirs in range(5 - yours):
+            WINDOW_TERMS[yours, theirs] = window_terms(yours, theirs)
+    BIT_TERMS[:] = [(y, t, base, threat) for (y, t), (base, threat) in WINDOW_TERMS.items() if base or threat]
+
+    # Every window scores within its table extremes; center and isolation terms only push one way
+    lowest = min(base + min(threat, 0) for base, threat in WINDOW_TERMS.values())
+    highest = max(base + max(threat, 0) for base, threat in WINDOW_TERMS.values())
+    max_pieces = (ROW_COUNT * COLUMN_COUNT + 1) // 2  # The first player ends with 21 pieces
+    SCORE_BOUNDS = (len(WINDOWS) * lowest - max_pieces * WEIGHTS["isolation_penalty"],
+                    len(WINDOWS) * highest + ROW_COUNT * CENTER_WEIGHT)
+    PATTERN_TABLE.clear()
+    for piece in (PLAYER_PIECE, AI_PIECE):
+        opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+        PATTERN_TABLE[piece] = {
+            pattern: WINDOW_TERMS[pattern.count(piece), pattern.count(opponent)]
+                     + (pattern.index(EMPTY) if EMPTY in pattern else None,)
+            for pattern in WINDOW_PATTERNS
+        }
+
+rebuild_pattern_tables()
+
+def refresh_pattern_tables():
+    """Rebuild the tables if WEIGHTS was changed since they were built (one dict comparison otherwise)."""
+    if WEIGHTS != _table_weights:
+        rebuild_pattern_tables()
+
+def score_bounds():
+    """SCORE_BOUNDS for the current WEIGHTS."""
+    refresh_pattern_tables()
+    return SCORE_BOUNDS
 
-    # Add bonus for controlling the center column
+def combined_heuristic(board, piece):
+    refresh_pattern_tables()  # WEIGHTS may have been tuned since the tables were built
+    # Add bonus for controlling the center column (score_position's weight plus center_control)
     center_idx = COLUMN_COUNT // 2  # Compute index of the center column
-    score += sum(
+    score = sum(
         1 for r in range(ROW_COUNT) if board[r * COLUMN_COUNT + center_idx] == piece  # Count how many pieces are in the center column
-    ) * WEIGHTS["center_control"]  # Multiply count by the center control weight
-
-    # Loop through each precomputed 4-cell window (potential winning sequences)
-    for window in WINDOWS:  
-        # Retrieve the board cells corresponding to the indices in the current window
-        cells = [board[i] for i in window]  
-        yours = theirs = empties = 0  # Initialize counts for player's pieces, opponent's pieces, and empty cells
-
-        # Count the occurrences of the player's piece, opponent's piece, and empties in the current window
-        for c in cells:
-            if c == piece:
-                yours += 1  # Increment player's piece count
-            elif c == opponent:
-                theirs += 1  # Increment opponent's piece count
-            elif c == EMPTY:
-                empties += 1  # Increment empty cell count
-
-        # --- Offensive Rewards ---
-        if yours == 4:
-            score += WEIGHTS["reward_4"]  # Add large reward if the player has a winning move
-        elif yours == 3 and empties == 1:
-            empty_idx = window[cells.index(EMPTY)]  # Identify the index of the empty cell in a potential win
-            if is_playable(board, empty_idx):
-                score += WEIGHTS["reward_3"] + WEIGHTS["trap_bonus"]  # Reward if the move is playable and creates a trap
-        elif yours == 2 and empties == 2:
-            score += WEIGHTS["reward_2"]  # Reward for a 2-piece alignment with potential to expand
-        elif yours == 1 and empties == 3:
-            score += WEIGHTS["reward_1"]  # Minimal reward for a single piece in a window
-
-        # --- Defensive Penalties ---
-        if theirs == 3 and empties == 1:
-            empty_idx = window[cells.index(EMPTY)]  # Identify the critical empty cell for opponent's potential win
-            if is_playable(board, empty_idx):
-                score -= WEIGHTS["block_3"]  # Deduct heavy penalty if opponent is close to winning
-        elif theirs == 2 and empties == 2:
-            score -= WEIGHTS["block_2"]  # Deduct penalty for opponent's potential threat
+    ) * CENTER_WEIGHT
+
+    # Score each precomputed 4-cell window with one pattern table lookup
+    table = PATTERN_TABLE[piece]
+    for window in WINDOWS:
+        a, b, c, d = window
+        base, threat, empty_pos = table[board[a] + board[b] + board[c] + board[d]]
+        score += base
+        # Three-in-a-window terms only count when the missing cell can be played next
+        if threat and is_playable(board, window[empty_pos]):
+            score += threat
 
     # --- Isolation penalty ---
     # Loop over each cell in the board to check for isolated pieces
     for idx, cell in enumerate(board):
         if cell == piece:  # Only consider cells occupied by the player's piece
-            if all(
-                0 <= idx + delta < ROW_COUNT * COLUMN_COUNT and board[idx + delta] != piece  # Check neighbors are within bounds and not the player's piece
-                for delta in NEIGHBOR_DELTAS
-            ):
+            neighbors = CELL_NEIGHBORS[idx]  # Precomputed neighbor indices (None on the top/bottom rows)
+            if neighbors is not None and all(board[n] != piece for n in neighbors):  # Check no neighbor holds the player's piece
                 score -= WEIGHTS["isolation_penalty"]  # Deduct penalty if piece is isolated (no friendly neighbors)
 
     return score  # Return the final heuristic score for the board
 
+# --- Bitboard form of combined_heuristic ---
+# The windows of each direction are evaluated together: lane d (64 bits from bit 64 * d) holds the
+# windows along DIRECTIONS[d], each at the bit of its first cell.  WINDOW_STARTS marks the 69 windows.
+LANE = 64
+WINDOW_STARTS = 0
+for _lane, _shift in enumerate(DIRECTIONS):
+    WINDOW_STARTS |= (BOARD_MASK & (BOARD_MASK >> _shift) & (BOARD_MASK >> 2 * _shift)
+                      & (BOARD_MASK >> 3 * _shift)) << (LANE * _lane)
+CENTER_MASK = column_mask(COLUMN_COUNT // 2)
+# Cells that can be isolated (the cells CELL_NEIGHBORS does not map to None)
+ISOLATION_MASK = sum(1 << (col * H1 + row) for row in range(1, ROW_COUNT - 1) for col in range(1, COLUMN_COUNT - 1))
+
+# Lane-stacked shifts that bring the k-th cell of every window onto the window's first cell
+CELL_SHIFTS = [[(k * shift, LANE * lane) for lane, shift in enumerate(DIRECTIONS)] for k in range(1, 4)]
+
+def window_cells(bits):
+    """The k-th cell (k = 0..3) of every window as four lane-stacked bitmasks."""
+    first = bits | (bits << LANE) | (bits << 2 * LANE) | (bits << 3 * LANE)
+    return [first] + [(bits >> s0) << l0 | (bits >> s1) << l1 | (bits >> s2) << l2 | (bits >> s3) << l3
+                      for (s0, l0), (s1, l1), (s2, l2), (s3, l3) in CELL_SHIFTS]
+
+def window_counts(bits):
+    """Masks of the windows holding exactly 0, 1, 2, 3 and 4 of the cells set in ``bits``."""
+    a, b, c, d = window_cells(bits)
+    # Bit-sliced addition of the four cells: count = ones + 2 * twos + 4 * fours
+    low, high = a ^ b, c ^ d
+    ones = low ^ high
+    c1, c2, c3 = a & b, c & d, low & high  # At most two of these carries are set in any window
+    twos = c1 ^ c2 ^ c3
+    fours = (c1 & c2) | (c1 & c3) | (c2 & c3)
+    return (WINDOW_STARTS & ~(ones | twos | fours), WINDOW_STARTS & ones & ~twos,
+            WINDOW_STARTS & twos & ~ones, WINDOW_STARTS & twos & ones, WINDOW_STARTS & fours)
+
+def combined_heuristic_bits(board, piece):
+    """combined_heuristic of a BitBoard, computed on its bitmasks (same score as on the string form)."""
+    refresh_pattern_tables()
+    own = board.bits[piece]
+    opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+    score = bin(own & CENTER_MASK).count("1") * CENTER_WEIGHT
+
+    yours, theirs = window_counts(own), window_counts(board.bits[opponent])
+    # A window with one empty cell holds a playable cell exactly when that empty cell is playable
+    playable = 0
+    for cells in window_cells(board.move_mask()):
+        playable |= cells
+    for y, t, base, threat in BIT_TERMS:
+        windows = yours[y] & theirs[t]
+        if windows:
+            score += base * bin(windows).count("1")
+            if threat:
+                score += threat * bin(windows & playable).count("1")
+
+    # Pieces on isolation cells without an own piece to the left, right, above or below
+    neighbors = (own << H1) | (own >> H1) | (own << 1) | (own >> 1)
+    score -= bin(own & ISOLATION_MASK & ~neighbors).count("1") * WEIGHTS["isolation_penalty"]
+    return score
+
 # Map heuristic strategies to their functions (currently only "combined" strategy is implemented)
 HEURISTICS = {
     "combined": combined_heuristic,  # Associate the combined heuristic function with the key "combined"
 }
 
+# Strategies with a bitboard implementation; the others score a BitBoard's string form
+BITBOARD_HEURISTICS = {
+    "combined": combined_heuristic_bits,
+}
+
 def evaluate_board(board, piece, strategy="combined"):
+    if isinstance(board, BitBoard):
+        heuristic = BITBOARD_HEURISTICS.get(strategy)
+        if heuristic is not None:
+            return heuristic(board, piece)
+        board = board.to_string()  # Heuristics index cells directly, so score the flat string form
     try:
         return HEURISTICS[strategy](board, piece)  # Evaluate board using the selected heuristic strategy
     except KeyError:
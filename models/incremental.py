@@ -0,0 +1,132 @@
+"""
+Incremental version of the "combined" heuristic.
+
+The evaluator keeps per-window piece counts and a running score for one
+perspective (``piece``).  Dropping or removing a piece only re-scores the
+windows that contain the changed cell (at most 16) plus the windows around
+the column's next open cell, whose playability feeds the trap/block terms,
+and the isolation status of the cell and its neighbors.
+
+``IncrementalEvaluator(board, piece).score`` always equals
+``evaluate_board(board, piece, "combined")``.
+"""
+from models.board import WINDOWS, CELL_WINDOWS
+from models.constants import ROW_COUNT, COLUMN_COUNT, EMPTY, PLAYER_PIECE, AI_PIECE
+import models.heuristics as heuristics
+from models.heuristics import WEIGHTS, CELL_NEIGHBORS, WINDOW_TERMS
+
+CENTER_COL = COLUMN_COUNT // 2
+
+# Cells whose isolation status depends on a given cell (the cell itself and the cells it neighbors)
+ISOLATION_DEPENDENTS = [
+    [idx] + [n for n in range(ROW_COUNT * COLUMN_COUNT)
+             if CELL_NEIGHBORS[n] is not None and idx in CELL_NEIGHBORS[n]]
+    for idx in range(ROW_COUNT * COLUMN_COUNT)
+]
+
+
+class IncrementalEvaluator:
+    def __init__(self, board, piece):
+        heuristics.refresh_pattern_tables()
+        self.piece = piece
+        self.opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+        self.cells = list(board)
+        self.next_open = [self._lowest_empty(col) for col in range(COLUMN_COUNT)]
+        self.yours = [0] * len(WINDOWS)
+        self.theirs = [0] * len(WINDOWS)
+        for w, window in enumerate(WINDOWS):
+            for i in window:
+                if self.cells[i] == piece:
+                    self.yours[w] += 1
+                elif self.cells[i] == self.opponent:
+                    self.theirs[w] += 1
+        self.window_scores = [self._window_score(w) for w in range(len(WINDOWS))]
+        self.isolation = [self._isolation(idx) for idx in range(ROW_COUNT * COLUMN_COUNT)]
+        center = sum(self.cells[r * COLUMN_COUNT + CENTER_COL] == piece for r in range(ROW_COUNT))
+        self.score = (center * heuristics.CENTER_WEIGHT + sum(self.window_scores) + sum(self.isolation))
+        self.history = []
+
+    def _lowest_empty(self, col):
+        for r in range(ROW_COUNT):
+            if self.cells[r * COLUMN_COUNT + col] == EMPTY:
+                return r
+        return None
+
+    def _is_playable(self, idx):
+        row, col = divmod(idx, COLUMN_COUNT)
+        return self.next_open[col] == row
+
+    def _empty_cell(self, w):
+        for i in WINDOWS[w]:
+            if self.cells[i] == EMPTY:
+                return i
+        return None
+
+    def _window_score(self, w):
+        # Same (yours, theirs) table as combined_heuristic's pattern lookups
+        score, threat = WINDOW_TERMS[self.yours[w], self.theirs[w]]
+        if threat and self._is_playable(self._empty_cell(w)):
+            score += threat
+        return score
+
+    def _isolation(self, idx):
+        if self.cells[idx] != self.piece:
+            return 0
+        neighbors = CELL_NEIGHBORS[idx]
+        if neighbors is not None and all(self.cells[n] != self.piece for n in neighbors):
+            return -WEIGHTS["isolation_penalty"]
+        return 0
+
+    def _rescore_windows(self, windows):
+        for w in windows:
+            new = self._window_score(w)
+            self.score += new - self.window_scores[w]
+            self.window_scores[w] = new
+
+    def set_cell(self, idx, value):
+        """Change one cell and update the running score."""
+        old = self.cells[idx]
+        if old == value:
+            return
+        self.cells[idx] = value
+        row, col = divmod(idx, COLUMN_COUNT)
+
+        for w in CELL_WINDOWS[idx]:
+            if old == self.piece:
+                self.yours[w] -= 1
+            elif old == self.opponent:
+                self.theirs[w] -= 1
+            if value == self.piece:
+                self.yours[w] += 1
+            elif value == self.opponent:
+                self.theirs[w] += 1
+
+        if col == CENTER_COL:
+            self.score += heuristics.CENTER_WEIGHT * ((value == self.piece) - (old == self.piece))
+
+        # Windows around the old and new next open cell change playability
+        old_open = self.next_open[col]
+        self.next_open[col] = self._lowest_empty(col)
+        self._rescore_windows(CELL_WINDOWS[idx])
+        if self.next_open[col] != old_open:
+            for r in (old_open, self.next_open[col]):
+                if r is not None and r != row:
+                    self._rescore_windows(CELL_WINDOWS[r * COLUMN_COUNT + col])
+
+        for n in ISOLATION_DEPENDENTS[idx]:
+            new = self._isolation(n)
+            self.score += new - self.isolation[n]
+            self.isolation[n] = new
+
+    def drop(self, col, piece):
+        """Drop ``piece`` into ``col`` and return the row it landed on."""
+        row = self.next_open[col]
+        idx = row * COLUMN_COUNT + col
+        self.set_cell(idx, piece)
+        self.history.append(idx)
+        return row
+
+    def undo(self):
+        """Take back the last ``drop``."""
+        self.set_cell(self.history.pop(), EMPTY)
+
@@ -0,0 +1,72 @@
+"""
+Tactical pre-pass: immediate fours, forced blocks and safe moves.
+
+Works on the bitboard layout of models/bitboard.py.  ``winning_cells``
+finds every empty cell that would complete a four for one side with a
+handful of shifts; masking it with the board's move mask gives the
+playable ones, i.e. the windows of models/board.py holding three pieces
+and a cell that ``is_playable``.
+
+The game is scored by counting fours on the full board, so completing a
+four never ends the game.  The pre-pass therefore treats as urgent the
+moves that complete a four for the mover or take away the opponent's
+playable four, and otherwise avoids moves that make an opponent four
+playable (the cell right above is their four-completing cell).
+"""
+from models.bitboard import BitBoard, BOARD_MASK, H1, column_mask
+from models.constants import PLAYER_PIECE, AI_PIECE, COLUMN_COUNT
+
+
+def winning_cells(bits, mask):
+    """Bitmask of the empty cells that would complete a four for ``bits``."""
+    # Vertical: three stacked pieces below the cell
+    r = (bits << 1) & (bits << 2) & (bits << 3)
+    for shift in (H1, H1 - 1, H1 + 1):  # horizontal, "\" and "/" diagonals
+        p = (bits << shift) & (bits << 2 * shift)
+        r |= p & (bits << 3 * shift)
+        r |= p & (bits >> shift)
+        p = (bits >> shift) & (bits >> 2 * shift)
+        r |= p & (bits << shift)
+        r |= p & (bits >> 3 * shift)
+    return r & (BOARD_MASK ^ mask)
+
+
+def _columns(cells):
+    return [col for col in range(COLUMN_COUNT) if cells & column_mask(col)]
+
+
+def _as_bitboard(board):
+    return board if isinstance(board, BitBoard) else BitBoard.from_string(board)
+
+
+def tactical_moves(board, mover):
+    """
+    Columns worth searching for ``mover`` on ``board``:
+    the moves that complete a four or block the opponent's playable four
+    when there are any, otherwise the moves that do not hand the opponent
+    a four.  Never empty while a move is possible.
+    """
+    board = _as_bitboard(board)
+    opponent = PLAYER_PIECE if mover == AI_PIECE else AI_PIECE
+    mask = board.mask
+    playable = board.move_mask()
+    own = winning_cells(board.bits[mover], mask)
+    theirs = winning_cells(board.bits[opponent], mask)
+
+    urgent = (own | theirs) & playable
+    if urgent:
+        return _columns(urgent)
+    # A move directly below an opponent four-completing cell makes it playable
+    safe = playable & ~(theirs >> 1)
+    return _columns(safe or playable)
+
+
+def forced_move(board, mover):
+    """The single urgent column for ``mover`` if there is exactly one, else None."""
+    board = _as_bitboard(board)
+    opponent = PLAYER_PIECE if mover == AI_PIECE else AI_PIECE
+    playable = board.move_mask()
+    urgent = (winning_cells(board.bits[mover], board.mask)
+              | winning_cells(board.bits[opponent], board.mask)) & playable
+    columns = _columns(urgent)
+    return columns[0] if len(columns) == 1 else None
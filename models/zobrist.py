@@ -0,0 +1,79 @@
+"""
+Zobrist hashing for Connect 4 positions.
+
+Every (piece, cell) pair gets a fixed random 64-bit number; a position's key
+is the XOR of the numbers of its occupied cells, so playing or undoing a
+move updates the key with a single XOR.
+
+Positions are left/right symmetric, so the caches store each position and
+its mirror image under one canonical key (the smaller of the two) and flip
+the stored best move back when the mirror image is looked up.
+"""
+import hashlib
+import random
+from functools import lru_cache
+
+from models.constants import ROW_COUNT, COLUMN_COUNT, PLAYER_PIECE, AI_PIECE
+
+_rng = random.Random(0x5EED)  # fixed seed: keys are stable across runs and processes
+
+ZOBRIST = {
+    piece: [_rng.getrandbits(64) for _ in range(ROW_COUNT * COLUMN_COUNT)]
+    for piece in (PLAYER_PIECE, AI_PIECE)
+}
+
+# XORed in when the maximizing side is to move
+SIDE_KEY = _rng.getrandbits(64)
+
+# Cell index -> index of the same cell in the left/right mirror image
+MIRROR_INDEX = [(idx // COLUMN_COUNT) * COLUMN_COUNT + COLUMN_COUNT - 1 - idx % COLUMN_COUNT
+                for idx in range(ROW_COUNT * COLUMN_COUNT)]
+
+
+def zobrist_hash(board):
+    """Full Zobrist key of a string/list board (BitBoards carry theirs)."""
+    key = getattr(board, "key", None)
+    if key is not None:
+        return key
+    key = 0
+    for idx, cell in enumerate(board):
+        table = ZOBRIST.get(cell)
+        if table is not None:
+            key ^= table[idx]
+    return key
+
+
+def mirror_hash(board):
+    """Zobrist key of the mirror image of ``board`` (BitBoards carry theirs)."""
+    key = getattr(board, "mirror_key", None)
+    if key is not None:
+        return key
+    key = 0
+    for idx, cell in enumerate(board):
+        table = ZOBRIST.get(cell)
+        if table is not None:
+            key ^= table[MIRROR_INDEX[idx]]
+    return key
+
+
+def mirror_column(col):
+    return None if col is None else COLUMN_COUNT - 1 - col
+
+
+def canonical_key(key, mirror_key):
+    """Return (canonical key, mirrored): moves stored under a mirrored key are mirrored columns."""
+    if mirror_key < key:
+        return mirror_key, True
+    return key, False
+
+
+def oriented(col, mirrored):
+    """Translate a best move between a position and its canonical orientation (both ways)."""
+    return mirror_column(col) if mirrored else col
+
+
+@lru_cache(maxsize=None)
+def context_key(*parts):
+    """Stable 64-bit key for search settings (piece, strategy, ...) sharing one table."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
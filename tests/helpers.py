@@ -0,0 +1,17 @@
+# File: tests/helpers.py
+"""Positions shared by the engine tests."""
+from models.board import create_board, drop_piece, get_next_open_row, get_valid_locations
+from models.constants import AI_PIECE, PLAYER_PIECE
+
+
+def random_board(rng, plies):
+    """String board after up to ``plies`` random moves (fewer if it fills up), PLAYER_PIECE first."""
+    board, piece = create_board(), PLAYER_PIECE
+    for _ in range(plies):
+        valid = get_valid_locations(board)
+        if not valid:
+            break
+        col = rng.choice(valid)
+        board = drop_piece(board, get_next_open_row(board, col), col, piece)
+        piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+    return board
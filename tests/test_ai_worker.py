@@ -0,0 +1,58 @@
+# File: tests/test_ai_worker.py
+import time
+from argparse import Namespace
+
+from controllers.ai_worker import AIWorker, compute_move
+from models.board import create_board, drop_piece, get_next_open_row
+from models.constants import PLAYER_PIECE
+
+
+def wait_for(worker, timeout=30):
+    end = time.time() + timeout
+    while time.time() < end:
+        result = worker.poll()
+        if result is not None:
+            return result
+        time.sleep(0.01)
+    raise AssertionError("worker did not finish")
+
+
+def test_worker_runs_search_in_background():
+    board = create_board()
+    board = drop_piece(board, get_next_open_row(board, 3), 3, PLAYER_PIECE)
+    worker = AIWorker()
+    worker.start(compute_move, Namespace(mode=1, depth=2, visualize=0, time_ms=100), board)
+    assert worker.busy()
+    col, score, graph = wait_for(worker)
+    assert col in range(7)
+    assert not worker.busy()
+    worker.close()
+
+
+def test_worker_cancel_stops_deep_search():
+    worker = AIWorker()
+    future = worker.start(compute_move, Namespace(mode=2, depth=9, visualize=0, time_ms=100), create_board())
+    time.sleep(0.05)
+    start = time.time()
+    worker.cancel()
+    while not future.done():
+        time.sleep(0.01)
+    assert time.time() - start < 2
+    assert worker.poll() is None
+    worker.close()
+
+
+def test_ponder_fills_answers_for_player_replies():
+    from controllers.ai_worker import ponder
+    args = Namespace(mode=1, depth=2, visualize=0, time_ms=100)
+    board = create_board()
+    board = drop_piece(board, get_next_open_row(board, 3), 3, PLAYER_PIECE)
+    results = {}
+    worker = AIWorker()
+    worker.start(ponder, args, board, results)
+    wait_for(worker)
+    assert len(results) == 7
+    reply = drop_piece(board, get_next_open_row(board, 3), 3, PLAYER_PIECE)
+    col, score, _ = results[reply]
+    assert score == compute_move(args, reply)[1]
+    worker.close()
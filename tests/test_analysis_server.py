@@ -0,0 +1,122 @@
+# File: tests/test_analysis_server.py
+import asyncio
+import json
+import multiprocessing
+import random
+
+from controllers.analysis_server import AnalysisServer
+from models.board import create_board, drop_piece
+from models.constants import PLAYER_PIECE, EMPTY
+from utils.load_generator import random_position, run_load
+
+
+async def request(reader, writer, message):
+    writer.write((json.dumps(message) + "\n").encode())
+    await writer.drain()
+
+
+async def answers(reader, count):
+    return {m.get("id"): m for m in [json.loads(await reader.readline()) for _ in range(count)]}
+
+
+def test_coalescing_cancellation_and_metrics():
+    board = drop_piece(create_board(), 0, 3, PLAYER_PIECE)
+    other = drop_piece(create_board(), 0, 0, PLAYER_PIECE)
+
+    async def scenario():
+        server = AnalysisServer(workers=1, default_time_ms=50)
+        listener = await server.serve(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            # Two identical requests share one search; the third waits for the only worker
+            await request(reader, writer, {"id": 1, "board": board, "time_ms": 300})
+            await request(reader, writer, {"id": 2, "board": board, "time_ms": 300})
+            await request(reader, writer, {"id": 3, "board": other, "time_ms": 300})
+            await request(reader, writer, {"id": 4, "board": "123"})
+            await asyncio.sleep(0.1)
+            await request(reader, writer, {"op": "cancel", "id": 3})
+            got = await answers(reader, 4)
+            assert got[1]["col"] == got[2]["col"] and got[1]["score"] == got[2]["score"]
+            assert [got[1]["coalesced"], got[2]["coalesced"]] == [False, True]
+            assert got[3]["error"] == "cancelled"
+            assert "board" in got[4]["error"]
+
+            await request(reader, writer, {"op": "metrics"})
+            metrics = json.loads(await reader.readline())
+            assert metrics["completed"] == 2 and metrics["coalesced"] == 1
+            assert metrics["cancelled"] == 1 and metrics["errors"] == 1
+            assert metrics["queue_depth"] == 0 and metrics["latency_ms"]["p95"] is not None
+            writer.close()
+        finally:
+            listener.close()
+            server.close()
+
+    asyncio.run(scenario())
+
+
+def test_load_generator_round_trip():
+    async def scenario():
+        server = AnalysisServer(workers=2, default_time_ms=20)
+        listener = await server.serve(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            summary = await run_load(port=port, clients=3, requests=6, concurrency=2, time_ms=20)
+        finally:
+            listener.close()
+            server.close()
+        return summary
+
+    summary = asyncio.run(scenario())
+    assert summary["requests"] == 18 and summary["errors"] == 0
+    assert summary["server"]["completed"] == 18
+
+
+def test_failed_search_is_answered_and_the_pool_replaced():
+    board = drop_piece(create_board(), 0, 3, PLAYER_PIECE)
+
+    async def scenario():
+        server = AnalysisServer(workers=1, default_time_ms=50)
+        listener = await server.serve(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            await request(reader, writer, {"id": 1, "board": board, "time_ms": 3000})
+            await asyncio.sleep(0.2)
+            broken = server.executor
+            for process in multiprocessing.active_children():  # a worker dies mid-search
+                process.kill()
+            got = await answers(reader, 1)
+            assert "BrokenProcessPool" in got[1]["error"]
+            assert server.executor is not broken
+
+            await request(reader, writer, {"id": 2, "board": board, "time_ms": 50})
+            got = await answers(reader, 1)
+            assert got[2]["col"] in range(7)
+
+            await request(reader, writer, {"op": "metrics"})
+            metrics = json.loads(await reader.readline())
+            assert metrics["failed"] == 1 and metrics["errors"] == 1 and metrics["running"] == 0
+            writer.close()
+        finally:
+            listener.close()
+            server.close()
+
+    asyncio.run(scenario())
+
+
+def test_random_positions_have_the_ai_to_move():
+    rng = random.Random(1)
+    for plies in range(0, 44):
+        board = random_position(rng, plies)
+        assert (42 - board.count(EMPTY)) % 2 == 1
+
+
+def test_a_broken_pool_is_replaced_once():
+    server = AnalysisServer(workers=1)
+    broken = server.executor
+    server._replace_broken_pool(broken)
+    fresh = server.executor
+    server._replace_broken_pool(broken)  # a second search failing on the same pool
+    assert fresh is not broken and server.executor is fresh
+    server.close()
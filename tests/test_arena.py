@@ -0,0 +1,52 @@
+# File: tests/test_arena.py
+import json
+
+import pytest
+
+from models.ai import minimax_noprune as noprune_module
+from models.board import create_board
+from models.constants import AI_PIECE
+from utils.arena import parse_engine, opening_suite, play_game, elo_difference, run_arena, choose_move, clear_tables
+
+
+def test_parse_engine_fills_defaults_and_rejects_typos():
+    config = parse_engine("pvs:depth=6,tactics=1")
+    assert (config["name"], config["depth"], config["tactics"], config["strategy"]) == ("pvs", 6, True, "combined")
+    with pytest.raises(ValueError):
+        parse_engine("pvs:deepth=6")
+    with pytest.raises(ValueError):
+        parse_engine("alphazero")
+
+
+def test_clear_tables_resets_every_engine_table():
+    choose_move(parse_engine("noprune:depth=2"), create_board(), AI_PIECE)
+    assert len(noprune_module._transposition_table) > 0
+    clear_tables()
+    assert len(noprune_module._transposition_table) == 0
+
+
+def test_opening_suite_folds_mirror_images():
+    assert opening_suite(1) == [[0], [1], [2], [3]]
+    assert len(opening_suite(2)) == 25  # 49 two-move openings, only 3-3 is its own mirror image
+
+
+def test_game_record_and_elo():
+    a, b = parse_engine("minimax:depth=2"), parse_engine("noprune:depth=1")
+    record = play_game(0, a, b, False, [3])
+    assert record["moves"][0] == 3 and len(record["moves"]) == 42
+    assert len(record["move_ms"]["a"]) == 21 and len(record["move_ms"]["b"]) == 20
+    fours = record["fours"]
+    assert record["winner"] == ("a" if fours["a"] > fours["b"] else "b" if fours["b"] > fours["a"] else None)
+    assert elo_difference(0.5) == 0
+    assert elo_difference(0.75) == pytest.approx(190.8, abs=0.1)
+
+
+def test_arena_streams_games(tmp_path):
+    out = tmp_path / "games.jsonl"
+    a, b = parse_engine("minimax:depth=1"), parse_engine("pvs:depth=1")
+    summary = run_arena(a, b, games=4, workers=2, openings="book", opening_plies=1, out=str(out))
+    lines = [json.loads(line) for line in out.read_text().splitlines()]
+    assert sorted(r["game"] for r in lines) == [0, 1, 2, 3]
+    assert [r["a_first"] for r in sorted(lines, key=lambda r: r["game"])] == [True, False, True, False]
+    assert summary["wins"] + summary["draws"] + summary["losses"] == 4
+    assert summary["latency"]["a"]["moves"] + summary["latency"]["b"]["moves"] == 4 * 41
@@ -0,0 +1,52 @@
+# File: tests/test_batch_eval.py
+import math
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from models.ai import minimax as minimax_module
+from models.batch_eval import evaluate_boards
+from models.bitboard import BitBoard
+from models.constants import AI_PIECE, PLAYER_PIECE
+from models import heuristics
+from models.heuristics import combined_heuristic
+from tests.helpers import random_board
+
+
+def test_batch_matches_combined_heuristic():
+    rng = random.Random(11)
+    boards = [random_board(rng, rng.randint(0, 42)) for _ in range(300)]
+    for piece in (AI_PIECE, PLAYER_PIECE):
+        assert evaluate_boards(boards, piece) == [combined_heuristic(b, piece) for b in boards]
+    # BitBoards and list boards are packed the same way
+    bit_boards = [BitBoard.from_string(b) for b in boards[:20]]
+    assert evaluate_boards(bit_boards, AI_PIECE) == evaluate_boards([list(b) for b in boards[:20]], AI_PIECE)
+    assert evaluate_boards([], AI_PIECE) == []
+
+
+def test_batch_follows_every_weight():
+    rng = random.Random(13)
+    boards = [random_board(rng, rng.randint(0, 42)) for _ in range(100)]
+    old = dict(heuristics.WEIGHTS)
+    try:
+        for i, name in enumerate(sorted(old)):
+            heuristics.WEIGHTS[name] += 7 + i
+        assert evaluate_boards(boards, AI_PIECE) == [combined_heuristic(b, AI_PIECE) for b in boards]
+    finally:
+        heuristics.WEIGHTS.update(old)
+    assert evaluate_boards(boards, AI_PIECE) == [combined_heuristic(b, AI_PIECE) for b in boards]
+
+
+def test_batched_minimax_matches_sequential():
+    rng = random.Random(12)
+    for _ in range(6):
+        board = random_board(rng, rng.randint(0, 20))
+        depth = rng.randint(1, 3)
+        minimax_module._transposition_table_ab.clear()
+        random.seed(0)
+        expected = minimax_module.minimax(board, depth, -math.inf, math.inf, True, AI_PIECE)[:2]
+        minimax_module._transposition_table_ab.clear()
+        random.seed(0)
+        assert minimax_module.minimax(board, depth, -math.inf, math.inf, True, AI_PIECE, batch=True)[:2] == expected
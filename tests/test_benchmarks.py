@@ -0,0 +1,41 @@
+# File: tests/test_benchmarks.py
+import copy
+
+from benchmarks.run import load_corpus, run_benchmarks, compare
+
+
+def small_run(board_type="string"):
+    corpus = load_corpus()[::4]
+    return run_benchmarks(corpus, ["minimax", "expectiminimax"], {"minimax": (2, 3), "expectiminimax": (1,)},
+                          repeat=1, memory=False, eval_rounds=2, verbose=False, board_type=board_type)
+
+
+def test_corpus_covers_every_phase():
+    corpus = load_corpus()
+    assert {p["phase"] for p in corpus} == {"opening", "middlegame", "endgame"}
+    for p in corpus:
+        assert len(p["board"]) == 42 and p["board"].count("1") == p["board"].count("2") + 1
+
+
+def test_node_counts_are_reproducible_and_compare_flags_regressions():
+    first, second = small_run(), small_run()
+    assert set(first["results"]) == {"minimax/d2", "minimax/d3", "expectiminimax/d1", "evaluate_board"}
+    for key, result in first["results"].items():
+        assert result.get("nodes") == second["results"][key].get("nodes")
+    assert first["results"]["minimax/d3"]["nodes"] > first["results"]["minimax/d2"]["nodes"]
+
+    slower = copy.deepcopy(first)
+    slower["results"]["minimax/d3"]["nps"] = first["results"]["minimax/d3"]["nps"] // 2
+    slower["results"]["minimax/d2"]["nodes"] += 1
+    problems = compare(first, slower, threshold=0.10)
+    assert len(problems) == 2
+    assert any("minimax/d3: nps" in p for p in problems)
+    assert any("minimax/d2: nodes changed" in p for p in problems)
+    assert compare(first, first) == []
+
+
+def test_bitboard_run_searches_the_same_trees():
+    strings, bits = small_run(), small_run("bitboard")
+    assert bits["meta"]["board"] == "bitboard"
+    for key, result in strings["results"].items():
+        assert bits["results"][key].get("nodes") == result.get("nodes")
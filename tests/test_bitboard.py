@@ -0,0 +1,133 @@
+# File: tests/test_bitboard.py
+import math
+import random
+
+import pytest
+
+import models.board as sb
+import models.bitboard as bb
+from models.ai.iterative import Deadline, SearchTimeout
+from utils.arena import clear_tables
+from models.ai.minimax import minimax
+from models.ai.minimax_noprune import minimax_noprune
+from models.ai.expectiminimax import expectiminimax
+from models.constants import PLAYER_PIECE, AI_PIECE, ROW_COUNT, COLUMN_COUNT
+from models.heuristics import combined_heuristic, evaluate_board
+
+
+def random_game(seed, plies):
+    rng = random.Random(seed)
+    board, bit = sb.create_board(), bb.create_board()
+    piece = PLAYER_PIECE
+    for _ in range(plies):
+        valid = sb.get_valid_locations(board)
+        if not valid:
+            break
+        col = rng.choice(valid)
+        board = sb.drop_piece(board, sb.get_next_open_row(board, col), col, piece)
+        bit.play(col, piece)
+        piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+    return board, bit
+
+
+def test_bitboard_matches_string_board():
+    for seed in range(30):
+        board, bit = random_game(seed, seed + 5)
+        assert bit.to_string() == board
+        assert bb.BitBoard.from_string(board) == bit
+        assert bb.get_valid_locations(bit) == sb.get_valid_locations(board)
+        for col in range(COLUMN_COUNT):
+            assert bb.get_next_open_row(bit, col) == sb.get_next_open_row(board, col)
+        for piece in (PLAYER_PIECE, AI_PIECE):
+            assert bb.winning_move(bit, piece) == sb.winning_move(board, piece)
+        assert bb.check_winner(bit) == sb.check_winner(board)
+        assert bb.is_board_full(bit) == sb.is_board_full(board)
+
+
+def test_play_undo_roundtrip():
+    _, bit = random_game(7, 20)
+    before = bit.copy()
+    col = bb.get_valid_locations(bit)[0]
+    bit.play(col, AI_PIECE)
+    assert bit != before
+    bit.undo()
+    assert bit == before
+    assert bit.heights == before.heights
+
+
+def test_move_mask_marks_next_open_cells():
+    _, bit = random_game(3, 12)
+    expected = 0
+    for col in range(COLUMN_COUNT):
+        if bit.can_play(col):
+            expected |= bb.cell_bit(bit.heights[col], col)
+    assert bit.move_mask() == expected
+
+
+def test_full_board_check_winner():
+    board, bit = random_game(11, ROW_COUNT * COLUMN_COUNT)
+    assert bb.is_board_full(bit)
+    assert bb.check_winner(bit) == sb.check_winner(board)
+
+
+def test_engines_accept_bitboard():
+    board, bit = random_game(5, 8)
+    _, score_str, _ = minimax(board, 2, -math.inf, math.inf, True, AI_PIECE)
+    _, score_bit, _ = minimax(bit, 2, -math.inf, math.inf, True, AI_PIECE)
+    assert score_str == score_bit
+    _, em_str, _ = expectiminimax(board, 2, -math.inf, math.inf, True, AI_PIECE)
+    _, em_bit, _ = expectiminimax(bit, 2, -math.inf, math.inf, True, AI_PIECE)
+    assert em_str == em_bit
+
+
+def test_zobrist_key_is_incremental():
+    from models.zobrist import zobrist_hash
+    board, bit = random_game(9, 15)
+    assert bit.key == zobrist_hash(board)
+    bit.undo()
+    assert bit.key == zobrist_hash(bit.to_string())
+
+
+def test_bitboards_are_scored_natively():
+    for seed in range(60):
+        board, bit = random_game(seed, seed % 40)
+        for piece in (PLAYER_PIECE, AI_PIECE):
+            assert evaluate_board(bit, piece) == combined_heuristic(board, piece)
+
+
+class CountdownDeadline(Deadline):
+    """Raises SearchTimeout on the n-th check."""
+
+    def __init__(self, checks):
+        super().__init__()
+        self.checks = checks
+
+    def check(self):
+        self.checks -= 1
+        if self.checks < 0:
+            raise SearchTimeout()
+
+
+def test_engines_search_bitboards_in_place():
+    board, bit = random_game(4, 9)
+    before = bit.copy()
+    searches = [
+        lambda b, d=None: minimax(b, 3, -math.inf, math.inf, True, AI_PIECE, deadline=d),
+        lambda b, d=None: minimax(b, 3, -math.inf, math.inf, True, AI_PIECE, deadline=d, batch=True),
+        lambda b, d=None: minimax_noprune(b, 2, True, AI_PIECE, deadline=d),
+        lambda b, d=None: expectiminimax(b, 2, -math.inf, math.inf, True, AI_PIECE, deadline=d),
+    ]
+    for search in searches:
+        clear_tables()
+        random.seed(1)
+        expected = search(board)[:2]
+        clear_tables()
+        random.seed(1)
+        assert search(bit)[:2] == expected
+        assert bit == before and bit.moves == before.moves and bit.key == before.key
+
+        # A search aborted deep in the tree still hands the board back unchanged
+        clear_tables()
+        with pytest.raises(SearchTimeout):
+            search(bit, CountdownDeadline(5))
+        assert bit == before and bit.moves == before.moves and bit.key == before.key
@@ -0,0 +1,55 @@
+# File: tests/test_endgame.py
+import random
+from argparse import Namespace
+
+from controllers.ai_worker import compute_move
+from models.ai import endgame
+from models.bitboard import BitBoard, check_winner
+from models.constants import AI_PIECE, PLAYER_PIECE
+
+
+def random_endgame(rng, empties):
+    board, piece = BitBoard(), PLAYER_PIECE
+    while 42 - len(board.moves) > empties:
+        board.play(rng.choice([c for c in range(7) if board.can_play(c)]), piece)
+        piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+    return board
+
+
+def brute_force(board, mover, piece):
+    """Plain minimax over every ordering, scored with check_winner at the full board."""
+    if len(board.moves) == 42:
+        fours = check_winner(board)
+        return fours[piece] - sum(v for p, v in fours.items() if p != piece)
+    other = PLAYER_PIECE if mover == AI_PIECE else AI_PIECE
+    values = []
+    for col in range(7):
+        if board.can_play(col):
+            board.play(col, mover)
+            values.append(brute_force(board, other, piece))
+            board.undo()
+    return max(values) if mover == piece else min(values)
+
+
+def test_solver_matches_brute_force():
+    rng = random.Random(5)
+    for _ in range(10):
+        board = random_endgame(rng, rng.randint(1, 7))
+        endgame._solved_table.clear()
+        col, score, nodes = endgame.solve(board, True, AI_PIECE)
+        assert score == brute_force(board, AI_PIECE, AI_PIECE)
+        assert board.can_play(col)
+        _, score, _ = endgame.solve(board.to_string(), False, AI_PIECE)
+        assert score == brute_force(board, PLAYER_PIECE, AI_PIECE)
+
+
+def test_compute_move_switches_to_solver():
+    board = random_endgame(random.Random(8), 8)
+    endgame._solved_table.clear()
+    expected = endgame.solve(board, True, AI_PIECE)[:2]
+    args = Namespace(mode=1, depth=2, visualize=0, time_ms=100, book="", endgame_cells=10)
+    assert compute_move(args, board.to_string(), verbose=False) == (*expected, None)
+    # A visualized search shows the chosen engine's tree instead
+    args.visualize = 1
+    assert compute_move(args, board.to_string(), verbose=False)[2] is not None
+    assert not endgame.should_solve(board, 6)
@@ -0,0 +1,121 @@
+# File: tests/test_engine_service.py
+import math
+import threading
+import time
+
+import pytest
+
+from controllers import engine_service
+from controllers.engine_client import EngineClient, EngineError
+from controllers.engine_service import EngineService, serve_socket
+from models.ai.minimax import minimax
+from models.board import create_board, drop_piece
+from models.constants import AI_PIECE, PLAYER_PIECE
+
+
+def wait_for_line(lines, prefix, timeout=30):
+    end = time.time() + timeout
+    while time.time() < end:
+        for line in lines:
+            if line.startswith(prefix):
+                lines.remove(line)
+                return line
+        time.sleep(0.01)
+    raise AssertionError(f"no {prefix!r} line")
+
+
+def make_service():
+    lines = []
+    service = EngineService(lines.append)
+    service.handle("setoption book ")
+    service.handle("setoption endgame_cells 0")
+    return service, lines
+
+
+def test_go_answers_like_a_direct_search():
+    service, lines = make_service()
+    service.handle("isready")
+    assert lines.pop() == "readyok"
+    service.handle("position startpos moves 3")
+    service.handle("go depth 3 mode 1")
+    words = wait_for_line(lines, "bestmove").split()
+
+    board = drop_piece(create_board(), 0, 3, PLAYER_PIECE)
+    col, score, _ = minimax(board, 3, -math.inf, math.inf, True, AI_PIECE)
+    assert (int(words[1]), float(words[3])) == (col, score)
+    service.close()
+
+
+def test_stop_ends_a_deep_search():
+    service, lines = make_service()
+    service.handle("position startpos")
+    service.handle("go depth 9 mode 2")
+    time.sleep(0.05)
+    service.handle("stop")
+    assert wait_for_line(lines, "bestmove", timeout=2) == "bestmove none"
+    assert service.handle("stats")
+    assert wait_for_line(lines, "stats").startswith("stats searches=1 ")
+    service.close()
+
+
+def test_bad_commands_report_errors():
+    service, lines = make_service()
+    service.handle("position startpos moves 9")
+    service.handle("setoption colour red")
+    service.handle("dance")
+    assert [line.split()[0] for line in lines] == ["error"] * 3
+    assert not service.handle("quit")
+    service.close()
+
+
+def test_failed_search_answers_with_an_error(monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("engine exploded")
+    monkeypatch.setattr(engine_service, "compute_move", broken)
+    service, lines = make_service()
+    service.handle("position startpos")
+    service.handle("go depth 3")
+    assert wait_for_line(lines, "error", timeout=5) == "error go: RuntimeError: engine exploded"
+    service.close()
+
+    with pytest.raises(EngineError, match="engine exploded"):
+        EngineClient._parse("error go: RuntimeError: engine exploded")
+
+
+def test_closed_connection_ends_a_pending_search():
+    import io
+
+    client = EngineClient(io.StringIO("bestmove 3 score 1\n"), io.StringIO())  # the service then hangs up
+    client.thread.join(timeout=5)
+    client.go(create_board())  # drops the stale bestmove, keeps the closed-connection marker
+    with pytest.raises(EngineError, match="closed the connection"):
+        client.poll()
+    client.pending = True
+    with pytest.raises(EngineError, match="closed the connection"):
+        client.wait(timeout=1)
+    assert client.closed
+
+
+@pytest.mark.skipif(not hasattr(__import__("socket"), "AF_UNIX"), reason="needs Unix sockets")
+def test_client_over_unix_socket(tmp_path):
+    from controllers.engine_client import EngineClient
+
+    path = str(tmp_path / "engine.sock")
+    service, _ = make_service()
+    server = threading.Thread(target=serve_socket, args=(service, path), daemon=True)
+    server.start()
+
+    board = drop_piece(create_board(), 0, 3, PLAYER_PIECE)
+    for _ in range(2):  # the second game reuses the same service and its tables
+        client = EngineClient.connect(path)
+        client.ready()
+        client.go(board, depth=2, mode=5)
+        col, score, _ = client.wait(timeout=30)
+        assert col in range(7)
+        client.close()
+    client = EngineClient.connect(path)
+    assert client.stats()["searches"] == 2
+    client.close(quit=True)
+    server.join(timeout=5)
+    assert not server.is_alive()
+    service.close()
@@ -0,0 +1,89 @@
+# File: tests/test_expectiminimax.py
+import math
+import random
+
+import models.heuristics as heuristics
+from models.ai import expectiminimax as em
+import models.bitboard as bit_board
+import models.board as string_board
+from models.bitboard import BitBoard
+from models.board import create_board, drop_piece, get_next_open_row, get_valid_locations
+from models.constants import AI_PIECE, PLAYER_PIECE
+from models.heuristics import evaluate_board
+from tests.helpers import random_board
+
+
+def test_chance_outcomes_are_distinct_and_shared_between_moves():
+    board = create_board()
+    valid = get_valid_locations(board)
+    outcomes = {col: em.chance_outcomes(board, col, valid, AI_PIECE, string_board) for col in valid}
+    for col, moves in outcomes.items():
+        assert math.isclose(sum(w for _, _, w in moves), 1.0)
+        assert len({k for k, _, _ in moves}) == len(moves)
+    # Column 2 drifting right and column 3 drifting left fill the same two cells
+    assert {k for k, _, _ in outcomes[2]} & {k for k, _, _ in outcomes[3]}
+    # BitBoards are keyed by their exact position key
+    bit_keys = {k for k, _, _ in em.chance_outcomes(BitBoard(), 3, valid, AI_PIECE, bit_board)}
+    assert all(isinstance(k, int) for k in bit_keys)
+
+
+def test_depth_one_is_the_expected_score():
+    board = create_board()
+    for col in (3, 3, 4):
+        board = drop_piece(board, get_next_open_row(board, col), col, PLAYER_PIECE)
+    valid = get_valid_locations(board)
+    expected = {
+        col: sum(w * evaluate_board(sb, AI_PIECE) for _, sb, w in em.chance_outcomes(board, col, valid, AI_PIECE, string_board))
+        for col in valid
+    }
+    em._transposition_table_em.clear()
+    col, score, _ = em.expectiminimax(board, 1, -math.inf, math.inf, True, AI_PIECE)
+    assert math.isclose(score, max(expected.values()))
+    assert math.isclose(expected[col], score)
+
+
+def reference_expectiminimax(board, depth, maximizing, piece=AI_PIECE):
+    """Plain expectiminimax: no pruning, no cache."""
+    valid = get_valid_locations(board)
+    if depth == 0 or not valid:
+        return evaluate_board(board, piece)
+    mover = piece if maximizing else (PLAYER_PIECE if piece == AI_PIECE else AI_PIECE)
+    values = [
+        sum(w * reference_expectiminimax(sb, depth - 1, not maximizing, piece)
+            for _, sb, w in em.chance_outcomes(board, col, valid, mover, string_board))
+        for col in valid
+    ]
+    return max(values) if maximizing else min(values)
+
+
+def count_nodes(monkeypatch, board, depth):
+    calls = {"n": 0}
+    search = em.expectiminimax
+
+    def counting(*args, **kwargs):
+        calls["n"] += 1
+        return search(*args, **kwargs)
+
+    em._transposition_table_em.clear()
+    with monkeypatch.context() as m:
+        m.setattr(em, "expectiminimax", counting)
+        _, score, _ = counting(board, depth, -math.inf, math.inf, True, AI_PIECE)
+    return score, calls["n"]
+
+
+def test_star1_matches_unpruned_search(monkeypatch):
+    rng = random.Random(6)
+    pruned = unpruned = 0
+    for _ in range(5):
+        board = random_board(rng, rng.randint(0, 20))
+        depth = rng.randint(2, 3)
+        score, nodes = count_nodes(monkeypatch, board, depth)
+        assert math.isclose(score, reference_expectiminimax(board, depth, True), rel_tol=1e-9)
+        pruned += nodes
+        # Unbounded scores turn chance-node pruning off
+        monkeypatch.setattr(heuristics, "SCORE_BOUNDS", (-math.inf, math.inf))
+        unbounded_score, nodes = count_nodes(monkeypatch, board, depth)
+        monkeypatch.undo()
+        assert math.isclose(unbounded_score, score, rel_tol=1e-9)
+        unpruned += nodes
+    assert pruned < unpruned
@@ -41,3 +41,80 @@ def test_trap_and_isolation_terms():
     board[r * COLUMN_COUNT + (center_col+1)] = AI_PIECE
     trap_score = combined_heuristic(board, AI_PIECE)
     assert trap_score > base_score
+
+
+def test_incremental_evaluator_matches_combined():
+    import random
+    from models.board import create_board, drop_piece, get_next_open_row, get_valid_locations
+    from models.incremental import IncrementalEvaluator
+
+    rng = random.Random(0)
+    for _ in range(20):
+        board = create_board()
+        evals = {p: IncrementalEvaluator(board, p) for p in (PLAYER_PIECE, AI_PIECE)}
+        history, piece = [], PLAYER_PIECE
+        for _ in range(50):
+            valid = get_valid_locations(board)
+            if valid and (not history or rng.random() < 0.7):
+                col = rng.choice(valid)
+                history.append(board)
+                board = drop_piece(board, get_next_open_row(board, col), col, piece)
+                for ev in evals.values():
+                    ev.drop(col, piece)
+            else:
+                board = history.pop()
+                for ev in evals.values():
+                    ev.undo()
+            piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+            for p, ev in evals.items():
+                assert ev.score == evaluate_board(board, p, "combined")
+
+
+def test_pattern_tables_follow_weights():
+    from models.board import WINDOW_PATTERNS, count_window_score, evaluate_window
+    from models.heuristics import WEIGHTS, rebuild_pattern_tables
+
+    for pattern in WINDOW_PATTERNS:
+        for piece in (PLAYER_PIECE, AI_PIECE):
+            assert evaluate_window(pattern, piece) == count_window_score(pattern, piece)
+
+    board = make_empty_board()
+    for c in [0, 1]:
+        board[c] = AI_PIECE
+    before = combined_heuristic(board, AI_PIECE)
+    old = WEIGHTS["reward_2"]
+    try:
+        WEIGHTS["reward_2"] = old + 5
+        rebuild_pattern_tables()
+        # Only the bottom-row window over columns 0-3 holds both pieces and two empties
+        assert combined_heuristic(board, AI_PIECE) == before + 5
+    finally:
+        WEIGHTS["reward_2"] = old
+        rebuild_pattern_tables()
+    assert combined_heuristic(board, AI_PIECE) == before
+
+
+def test_weight_changes_apply_without_a_rebuild():
+    from models.batch_eval import evaluate_boards
+    from models.board import evaluate_window
+    from models import heuristics
+
+    board = make_empty_board()
+    for c in [0, 1]:
+        board[c] = AI_PIECE
+    before = combined_heuristic(board, AI_PIECE)
+    bounds = heuristics.score_bounds()
+    old = dict(heuristics.WEIGHTS)
+    try:
+        heuristics.WEIGHTS["reward_2"] += 5
+        heuristics.WEIGHTS["reward_4"] += 5  # raises the best window score, so the upper bound
+        assert combined_heuristic(board, AI_PIECE) == before + 5
+        assert evaluate_boards([board], AI_PIECE) == [before + 5]
+        assert heuristics.score_bounds()[1] > bounds[1]
+    finally:
+        heuristics.WEIGHTS.update(old)
+    assert combined_heuristic(board, AI_PIECE) == before
+    assert heuristics.score_bounds() == bounds
+
+    # Windows that are not table patterns are still scored
+    assert evaluate_window([AI_PIECE] * 4, AI_PIECE) == 50
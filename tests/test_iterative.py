@@ -0,0 +1,40 @@
+# File: tests/test_iterative.py
+import math
+import time
+
+import pytest
+
+from models.ai import minimax as minimax_module
+from models.ai.iterative import search, Deadline, SearchTimeout
+from models.board import create_board, drop_piece, get_next_open_row
+from models.constants import AI_PIECE, PLAYER_PIECE
+
+
+def test_search_respects_max_depth_and_matches_fixed_depth():
+    board = create_board()
+    board = drop_piece(board, get_next_open_row(board, 3), 3, PLAYER_PIECE)
+    col, score, depth = search(board, time_limit_ms=60000, max_depth=3)
+    assert depth == 3
+    minimax_module._transposition_table_ab.clear()
+    _, fixed, _ = minimax_module.minimax(board, 3, -math.inf, math.inf, True, AI_PIECE)
+    assert score == fixed
+
+
+def test_search_stops_on_time_budget():
+    board = create_board()
+    start = time.perf_counter()
+    col, score, depth = search(board, time_limit_ms=150)
+    elapsed = time.perf_counter() - start
+    assert col in range(7)
+    assert 1 <= depth < 42
+    assert elapsed < 1.0
+
+
+def test_deadline_raises_when_stopped():
+    import threading
+    stop = threading.Event()
+    deadline = Deadline(stop_event=stop)
+    deadline.check()
+    stop.set()
+    with pytest.raises(SearchTimeout):
+        deadline.check()
@@ -0,0 +1,64 @@
+# File: tests/test_negamax.py
+import math
+import random
+
+from models.ai import minimax as minimax_module
+from models.ai import minimax_noprune as noprune_module
+from models.ai import negamax as negamax_module
+from models.ai.iterative import search
+from models.board import create_board, drop_piece, get_next_open_row, get_valid_locations
+from models.constants import AI_PIECE, PLAYER_PIECE
+from tests.helpers import random_board
+from utils.arena import clear_tables
+
+
+def test_negamax_matches_minimax_values():
+    rng = random.Random(2)
+    for _ in range(8):
+        board = random_board(rng, rng.randint(1, 15))
+        depth = rng.randint(1, 3)
+        clear_tables()
+        _, full, _ = noprune_module.minimax_noprune(board, depth, True, AI_PIECE)
+        col, score, nodes = negamax_module.negamax(board, depth, True, AI_PIECE)
+        assert score == full
+        assert col in get_valid_locations(board)
+        assert nodes > 0
+
+
+def test_negamax_searches_fewer_nodes_than_minimax(monkeypatch):
+    calls = {"n": 0}
+    original = minimax_module.minimax
+
+    def counting(*args, **kwargs):
+        calls["n"] += 1
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(minimax_module, "minimax", counting)
+    rng = random.Random(0)
+    pvs_nodes = 0
+    for _ in range(6):
+        board = random_board(rng, rng.randint(1, 16))
+        clear_tables()
+        _, mm_score, _ = minimax_module.minimax(board, 4, -math.inf, math.inf, True, AI_PIECE)
+        _, pvs_score, nodes = negamax_module.negamax(board, 4, True, AI_PIECE)
+        assert mm_score == pvs_score
+        pvs_nodes += nodes
+    minimax_nodes = calls["n"]
+    assert pvs_nodes < minimax_nodes
+
+
+def test_negamax_blocks_three_in_row():
+    board = create_board()
+    for c in [0, 1, 2]:
+        board = drop_piece(board, get_next_open_row(board, c), c, PLAYER_PIECE)
+    clear_tables()
+    col, _, _ = negamax_module.negamax(board, 2, True, AI_PIECE)
+    assert col == 3
+
+
+def test_iterative_search_with_negamax_engine():
+    board = create_board()
+    col, score, depth = search(board, time_limit_ms=60000, max_depth=3, engine="negamax")
+    clear_tables()
+    _, fixed, _ = negamax_module.negamax(board, 3, True, AI_PIECE)
+    assert depth == 3 and score == fixed
@@ -0,0 +1,61 @@
+# File: tests/test_opening_book.py
+from argparse import Namespace
+
+from controllers.ai_worker import compute_move
+from models.ai import negamax as negamax_module
+from models.bitboard import BitBoard
+from models.board import create_board, drop_piece, get_next_open_row
+from models.constants import AI_PIECE, PLAYER_PIECE
+from utils.opening_book import OpeningBook, ai_positions, build_opening_book, load_book
+
+
+def test_position_key_is_unique_for_early_positions():
+    positions = ai_positions(3)
+    keys = {board.position_key() for board in positions}
+    assert len(keys) == len(positions)
+    assert len({board.to_string() for board in positions}) == len(positions)
+
+
+def test_book_lookup_matches_search(tmp_path):
+    path = str(tmp_path / "book.bin")
+    count = build_opening_book(path, max_ply=3, depth=2, verbose=False)
+    book = OpeningBook(path)
+    assert len(book) == count
+
+    board = create_board()
+    for col, piece in [(3, PLAYER_PIECE), (2, AI_PIECE), (4, PLAYER_PIECE)]:
+        board = drop_piece(board, get_next_open_row(board, col), col, piece)
+    col, value = book.lookup(board)
+    negamax_module._transposition_table_pvs.clear()
+    _, expected = negamax_module.PVSSearch(AI_PIECE).search(BitBoard.from_string(board), 2)
+    assert value == expected
+    assert col in range(7)
+
+    # Positions with the player to move are not in the book
+    assert book.lookup(create_board()) is None
+    book.close()
+
+
+def test_compute_move_uses_book(tmp_path):
+    path = str(tmp_path / "book.bin")
+    build_opening_book(path, max_ply=1, depth=1, verbose=False)
+    board = drop_piece(create_board(), 0, 3, PLAYER_PIECE)
+    col, value = load_book(path).lookup(board)
+    args = Namespace(mode=1, depth=4, visualize=0, time_ms=100, book=path)
+    assert compute_move(args, board, verbose=False) == (col, value, None)
+    # The chosen engine still searches when its tree is shown, and for expectiminimax
+    for mode, visualize in ((1, 1), (3, 0)):
+        args = Namespace(mode=mode, depth=1, visualize=visualize, time_ms=100, book=path, endgame_cells=0)
+        assert compute_move(args, board, verbose=False) != (col, value, None)
+
+
+def test_mirror_positions_share_a_record(tmp_path):
+    path = str(tmp_path / "book.bin")
+    count = build_opening_book(path, max_ply=1, depth=1, verbose=False)
+    assert count == 4  # first moves in columns 0-3; 4-6 are their mirror images
+    book = OpeningBook(path)
+    left = drop_piece(create_board(), 0, 1, PLAYER_PIECE)
+    right = drop_piece(create_board(), 0, 5, PLAYER_PIECE)
+    col, value = book.lookup(left)
+    assert book.lookup(right) == (6 - col, value)
+    book.close()
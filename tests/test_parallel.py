@@ -0,0 +1,49 @@
+# File: tests/test_parallel.py
+import math
+import os
+import time
+
+import pytest
+
+from models.ai import minimax as minimax_module
+from models.ai.expectiminimax import expectiminimax
+from models.ai.parallel import ParallelRootSearch, _minimax_job
+from models.board import create_board, drop_piece, get_next_open_row
+from models.constants import AI_PIECE, PLAYER_PIECE
+
+
+def opening_board():
+    board = create_board()
+    for col, piece in [(3, PLAYER_PIECE), (3, AI_PIECE), (2, PLAYER_PIECE)]:
+        board = drop_piece(board, get_next_open_row(board, col), col, piece)
+    return board
+
+
+def test_parallel_root_search_matches_sequential():
+    board = opening_board()
+    minimax_module._transposition_table_ab.clear()
+    _, seq_score, _ = minimax_module.minimax(board, 3, -math.inf, math.inf, True, AI_PIECE)
+    _, em_score, _ = expectiminimax(board, 1, -math.inf, math.inf, True, AI_PIECE)
+    with ParallelRootSearch(workers=2) as pool:
+        col, score, graph = pool.minimax(board, 3, AI_PIECE)
+        assert score == seq_score
+        assert graph is None
+        # Same pool serves a second search without being recreated
+        em_col, em_par, _ = pool.expectiminimax(board, 1, AI_PIECE)
+        assert math.isclose(em_par, em_score)
+        assert em_col in range(7)
+
+
+def test_close_ends_a_running_deep_search():
+    pool = ParallelRootSearch(workers=1)
+    future = pool.executor.submit(_minimax_job, create_board(), 9, AI_PIECE, "combined")
+    time.sleep(1.0)  # the worker is started and searching
+    assert not future.done()
+    pids = pool.worker_pids()
+    assert len(pids) == 1
+    start = time.perf_counter()
+    pool.close()
+    assert time.perf_counter() - start < 1.0
+    for pid in pids:  # ended and reaped
+        with pytest.raises(ProcessLookupError):
+            os.kill(pid, 0)
@@ -0,0 +1,91 @@
+# File: tests/test_persistent_cache.py
+import math
+
+from models.ai.persistent_cache import PersistentCache
+from models.ai.transposition import TranspositionTable, EXACT, LOWER
+from models.heuristics import WEIGHTS
+
+
+def test_entries_survive_between_caches(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = PersistentCache(path, min_depth=4)
+    cache.record(2**64 - 5, 6, EXACT, 120, 3)  # keys above 2**63 are stored too
+    cache.record(11, 2, EXACT, 7, 1)            # too shallow to keep
+    assert cache.flush() == 1
+    cache.close()
+
+    other = PersistentCache(path, min_depth=4)
+    assert other.conn is None  # nothing is opened until the first lookup
+    assert other.probe(2**64 - 5) == (6, EXACT, 120, 3)
+    assert other.probe(11) is None
+    assert len(other) == 1
+    other.close()
+
+
+def test_deeper_entries_win(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = PersistentCache(path)
+    cache.record(1, 6, EXACT, 10, 2)
+    cache.flush()
+    cache.record(1, 5, LOWER, 99, 4)
+    cache.flush()
+    assert cache.probe(1) == (6, EXACT, 10, 2)
+    cache.record(1, 8, LOWER, 30, 5)
+    cache.flush()
+    assert cache.probe(1) == (8, LOWER, 30, 5)
+    cache.close()
+
+
+def test_weight_change_empties_the_cache(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = PersistentCache(path)
+    cache.record(1, 6, EXACT, 10, 2)
+    cache.close()
+    old = WEIGHTS["reward_2"]
+    try:
+        WEIGHTS["reward_2"] = old + 1
+        assert PersistentCache(path).probe(1) is None
+    finally:
+        WEIGHTS["reward_2"] = old
+
+
+def test_table_falls_through_to_cache_for_deep_probes(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    tt = TranspositionTable(64)
+    tt.backing = PersistentCache(path, min_depth=4)
+    tt.store(42, 5, EXACT, 17, 3)
+    tt.store(43, 1, EXACT, 18, 2)
+    tt.backing.close()
+
+    fresh = TranspositionTable(64)
+    fresh.backing = PersistentCache(path, min_depth=4)
+    assert fresh.probe(42, 2) is None  # shallow probes stay in memory
+    assert fresh.probe(42, 4) == (5, EXACT, 17, 3)
+    assert fresh.backing.reads == 1
+    assert fresh.probe(42) == (5, EXACT, 17, 3)  # now held in memory
+    assert fresh.probe(43, 4) is None
+    fresh.backing.close()
+
+
+def test_minimax_reuses_cached_results(tmp_path):
+    from models.ai.minimax import minimax, _transposition_table_ab
+    from models.board import create_board, drop_piece
+    from models.constants import AI_PIECE, PLAYER_PIECE
+
+    board = drop_piece(create_board(), 0, 3, PLAYER_PIECE)
+    path = str(tmp_path / "cache.sqlite")
+    try:
+        _transposition_table_ab.clear()
+        _transposition_table_ab.backing = PersistentCache(path, min_depth=4)
+        col, score, _ = minimax(board, 4, -math.inf, math.inf, True, AI_PIECE)
+        _transposition_table_ab.backing.close()
+
+        # A new game: empty table, same database
+        _transposition_table_ab.clear()
+        _transposition_table_ab.backing = PersistentCache(path, min_depth=4)
+        assert minimax(board, 4, -math.inf, math.inf, True, AI_PIECE)[:2] == (col, score)
+        assert _transposition_table_ab.backing.hits == 1
+        _transposition_table_ab.backing.close()
+    finally:
+        _transposition_table_ab.backing = None
+        _transposition_table_ab.clear()
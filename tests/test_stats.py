@@ -0,0 +1,64 @@
+# File: tests/test_stats.py
+import json
+import math
+import random
+
+from models.ai import minimax as minimax_module
+from models.ai.expectiminimax import expectiminimax, _transposition_table_em
+from models.ai.iterative import search
+from models.ai.negamax import PVSSearch, _transposition_table_pvs
+from models.ai.stats import SearchStats
+from models.board import create_board, drop_piece, get_next_open_row
+from models.constants import AI_PIECE, PLAYER_PIECE
+
+
+def opening_board():
+    board = create_board()
+    for col, piece in [(3, PLAYER_PIECE), (3, AI_PIECE), (2, PLAYER_PIECE)]:
+        board = drop_piece(board, get_next_open_row(board, col), col, piece)
+    return board
+
+
+def run_minimax(board, depth, stats=None):
+    minimax_module._transposition_table_ab.clear()
+    random.seed(7)
+    return minimax_module.minimax(board, depth, -math.inf, math.inf, True, AI_PIECE, stats=stats)[:2]
+
+
+def test_minimax_counts_without_changing_the_result():
+    board = opening_board()
+    stats = SearchStats()
+    assert run_minimax(board, 4, stats) == run_minimax(board, 4)
+    table = minimax_module._transposition_table_ab
+    # One probe per node, and the TT saw exactly what the collector saw
+    assert stats.nodes == stats.tt_probes == table.hits + table.misses
+    assert stats.nodes_by_depth[4] == 1
+    assert stats.cutoffs == sum(stats.cutoff_index.values()) > 0
+    assert stats.leaf_evals > 0 and stats.order_evals > 0
+    assert 1 < stats.branching_factor() < 7
+
+
+def test_pvs_and_expectiminimax_fill_stats():
+    board = opening_board()
+    _transposition_table_pvs.clear()
+    stats = SearchStats()
+    searcher = PVSSearch(AI_PIECE, stats=stats)
+    searcher.search(board, 5)
+    assert stats.nodes == searcher.nodes
+    assert stats.cutoff_index[0] > 0
+
+    _transposition_table_em.clear()
+    stats = SearchStats()
+    expectiminimax(board, 2, -math.inf, math.inf, True, AI_PIECE, stats=stats)
+    assert stats.nodes > 0 and stats.leaf_evals > 0 and stats.tt_probes == stats.nodes
+
+
+def test_iterative_records_depth_times_and_log_line():
+    stats = SearchStats()
+    col, score, reached = search(opening_board(), time_limit_ms=5000, max_depth=3, engine="negamax", stats=stats)
+    assert sorted(stats.iterations) == [1, 2, 3] and reached == 3
+    line = stats.finish().log_line(turn=1, col=col)
+    assert line.startswith("search_stats ")
+    record = json.loads(line[len("search_stats "):])
+    assert record["turn"] == 1 and record["col"] == col
+    assert record["nodes"] == stats.nodes and set(record["iterations"]) == {"1", "2", "3"}
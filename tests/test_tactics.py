@@ -0,0 +1,68 @@
+# File: tests/test_tactics.py
+import math
+import random
+
+import models.board as sb
+from models.ai.minimax import minimax
+from models.ai.negamax import negamax
+from models.bitboard import BitBoard, cell_bit
+from models.board import create_board, drop_piece, get_next_open_row, get_valid_locations
+from models.constants import AI_PIECE, PLAYER_PIECE, EMPTY, COLUMN_COUNT
+from models.tactics import winning_cells, tactical_moves, forced_move
+
+
+def play(moves):
+    board = create_board()
+    for col, piece in moves:
+        board = drop_piece(board, get_next_open_row(board, col), col, piece)
+    return board
+
+
+def test_winning_cells_match_three_piece_windows():
+    rng = random.Random(4)
+    for n in range(60):
+        board, piece = create_board(), PLAYER_PIECE
+        for _ in range(n % 35):
+            col = rng.choice(get_valid_locations(board))
+            board = drop_piece(board, get_next_open_row(board, col), col, piece)
+            piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+        bit = BitBoard.from_string(board)
+        for piece in (PLAYER_PIECE, AI_PIECE):
+            expected = 0
+            for window in sb.WINDOWS:
+                cells = [board[i] for i in window]
+                if cells.count(piece) == 3 and cells.count(EMPTY) == 1:
+                    row, col = divmod(window[cells.index(EMPTY)], COLUMN_COUNT)
+                    expected |= cell_bit(row, col)
+            assert winning_cells(bit.bits[piece], bit.mask) == expected
+
+
+def test_forced_block_and_four():
+    # Player threatens the bottom row at column 3
+    board = play([(0, PLAYER_PIECE), (6, AI_PIECE), (1, PLAYER_PIECE), (6, AI_PIECE), (2, PLAYER_PIECE)])
+    assert forced_move(board, AI_PIECE) == 3
+    assert tactical_moves(board, AI_PIECE) == [3]
+    # AI completing column 6 and blocking column 3 are both urgent
+    board = drop_piece(board, get_next_open_row(board, 6), 6, AI_PIECE)
+    assert tactical_moves(BitBoard.from_string(board), AI_PIECE) == [3, 6]
+    assert forced_move(board, AI_PIECE) is None
+
+
+def test_safe_moves_avoid_giving_a_four():
+    # The player's row-1 three waits on (1, 3), which sits above an empty cell
+    board = play([(0, AI_PIECE), (1, PLAYER_PIECE), (2, AI_PIECE),
+                  (0, PLAYER_PIECE), (1, PLAYER_PIECE), (2, PLAYER_PIECE)])
+    assert forced_move(board, AI_PIECE) is None
+    # Playing column 3 would let the player complete the four
+    assert tactical_moves(board, AI_PIECE) == [0, 1, 2, 4, 5, 6]
+    assert tactical_moves(board, PLAYER_PIECE) == list(range(COLUMN_COUNT))
+
+
+def test_engines_with_tactics_block_the_threat():
+    board = play([(0, PLAYER_PIECE), (6, AI_PIECE), (1, PLAYER_PIECE), (6, AI_PIECE), (2, PLAYER_PIECE)])
+    col, _, _ = minimax(board, 3, -math.inf, math.inf, True, AI_PIECE, tactics=True)
+    assert col == 3
+    col, _, nodes = negamax(board, 4, True, AI_PIECE, tactics=True)
+    _, _, full_nodes = negamax(board, 4, True, AI_PIECE)
+    assert col == 3
+    assert nodes < full_nodes
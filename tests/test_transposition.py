@@ -0,0 +1,99 @@
+# File: tests/test_transposition.py
+import math
+import random
+
+from models.ai import minimax as minimax_module
+from models.ai import minimax_noprune as noprune_module
+from models.ai.transposition import TranspositionTable, EXACT, LOWER, UPPER, bound_flag
+from models.board import create_board, drop_piece, get_next_open_row, get_valid_locations
+from models.constants import PLAYER_PIECE, AI_PIECE
+
+
+def test_bound_flags():
+    assert bound_flag(5, 5, 10) == UPPER
+    assert bound_flag(10, 5, 10) == LOWER
+    assert bound_flag(7, 5, 10) == EXACT
+
+
+def test_depth_preferred_and_always_replace_slots():
+    tt = TranspositionTable(size_mb=0.001)
+    buckets = tt.size // 2
+    deep, shallow, other = 1, 1 + buckets, 1 + 2 * buckets  # same bucket
+    tt.store(deep, 6, EXACT, 1.0, 3)
+    tt.store(shallow, 2, LOWER, 2.0, 4)
+    assert tt.probe(deep) == (6, EXACT, 1.0, 3)
+    assert tt.probe(shallow) == (2, LOWER, 2.0, 4)
+    tt.store(other, 1, UPPER, 3.0, 5)  # evicts the always-replace entry only
+    assert tt.probe(shallow) is None
+    assert tt.probe(deep) == (6, EXACT, 1.0, 3)
+    assert tt.collisions == 1
+
+
+def test_table_size_is_fixed():
+    tt = TranspositionTable(size_mb=0.01)
+    for key in range(10 * tt.size):
+        tt.store(key, key % 5, EXACT, key, None)
+    assert len(tt) <= tt.size
+    assert len(tt.keys) == tt.size
+
+
+def test_minimax_with_bounds_matches_exhaustive_search():
+    rng = random.Random(1)
+    for _ in range(10):
+        board, piece = create_board(), PLAYER_PIECE
+        for _ in range(rng.randint(0, 16)):
+            col = rng.choice(get_valid_locations(board))
+            board = drop_piece(board, get_next_open_row(board, col), col, piece)
+            piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+        depth = rng.randint(1, 3)
+        minimax_module._transposition_table_ab.clear()
+        noprune_module._transposition_table.clear()
+        _, pruned, _ = minimax_module.minimax(board, depth, -math.inf, math.inf, True, AI_PIECE)
+        _, again, _ = minimax_module.minimax(board, depth, -math.inf, math.inf, True, AI_PIECE)
+        _, full, _ = noprune_module.minimax_noprune(board, depth, True, AI_PIECE)
+        assert pruned == again == full
+
+
+def mirror(board):
+    return "".join(board[r * 7:(r + 1) * 7][::-1] for r in range(6))
+
+
+def test_heuristic_is_mirror_symmetric():
+    from models.heuristics import evaluate_board
+
+    rng = random.Random(16)
+    for _ in range(100):
+        board, piece = create_board(), PLAYER_PIECE
+        for _ in range(rng.randint(0, 40)):
+            col = rng.choice(get_valid_locations(board))
+            board = drop_piece(board, get_next_open_row(board, col), col, piece)
+            piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+        for p in (PLAYER_PIECE, AI_PIECE):
+            assert evaluate_board(board, p) == evaluate_board(mirror(board), p)
+
+
+def test_mirror_image_shares_cache_entries():
+    from models.ai import expectiminimax as em
+    from models.ai import negamax as negamax_module
+
+    board = create_board()
+    for col, piece in [(1, PLAYER_PIECE), (2, AI_PIECE), (1, PLAYER_PIECE)]:
+        board = drop_piece(board, get_next_open_row(board, col), col, piece)
+
+    minimax_module._transposition_table_ab.clear()
+    col, score, _ = minimax_module.minimax(board, 3, -math.inf, math.inf, True, AI_PIECE)
+    used = len(minimax_module._transposition_table_ab)
+    hits = minimax_module._transposition_table_ab.hits
+    m_col, m_score, _ = minimax_module.minimax(mirror(board), 3, -math.inf, math.inf, True, AI_PIECE)
+    assert (m_col, m_score) == (6 - col, score)
+    assert len(minimax_module._transposition_table_ab) == used
+    assert minimax_module._transposition_table_ab.hits == hits + 1
+
+    negamax_module._transposition_table_pvs.clear()
+    col, score, _ = negamax_module.negamax(board, 4, True, AI_PIECE)
+    m_col, m_score, nodes = negamax_module.negamax(mirror(board), 4, True, AI_PIECE)
+    assert (m_col, m_score, nodes) == (6 - col, score, 1)
+
+    em._transposition_table_em.clear()
+    col, score, _ = em.expectiminimax(board, 2, -math.inf, math.inf, True, AI_PIECE)
+    assert em.expectiminimax(mirror(board), 2, -math.inf, math.inf, True, AI_PIECE)[:2] == (6 - col, score)
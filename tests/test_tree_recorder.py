@@ -0,0 +1,68 @@
+# File: tests/test_tree_recorder.py
+import math
+
+from models.ai.expectiminimax import expectiminimax
+from models.ai.minimax import minimax
+from models.ai.minimax_noprune import minimax_noprune
+from models.ai.tree_recorder import TreeRecorder, MAX, MIN, CHANCE, NO_NODE
+from models.board import create_board, drop_piece, get_next_open_row
+from models.constants import AI_PIECE, PLAYER_PIECE
+from utils.arena import clear_tables
+
+
+def test_children_keep_insertion_order_and_export():
+    tree = TreeRecorder()
+    root = tree.add(kind=MAX)
+    a = tree.add(root, MIN, 3)
+    b = tree.add(root, MIN, 4)
+    c = tree.add(a, CHANCE, weight=0.6)
+    tree.set_score(a, 12)
+    tree.set_score(c, 2.5)
+    tree.mark_cached(b, -7)
+
+    assert tree.children(root) == [a, b]
+    assert tree.children(b) == []
+    assert tree.parent[c] == a and tree.parent[root] == NO_NODE
+    graph = tree.to_networkx()
+    assert list(graph.successors(root)) == [a, b]
+    assert graph.nodes[a] == {"label": "col=3\n12", "node_type": "decision"}
+    assert graph.nodes[b] == {"label": "col=4\n-7\nTT", "node_type": "cached"}
+    assert graph.nodes[c] == {"label": "P=0.60\n2.5", "node_type": "chance"}
+
+
+def test_cap_drops_nodes():
+    tree = TreeRecorder(max_nodes=2)
+    root = tree.add()
+    assert tree.add(root) == 1
+    assert tree.add(root) is None
+    assert len(tree) == 2 and tree.dropped == 1
+
+
+def test_recording_does_not_change_the_move():
+    board = create_board()
+    for col, piece in [(3, PLAYER_PIECE), (3, AI_PIECE), (2, PLAYER_PIECE)]:
+        board = drop_piece(board, get_next_open_row(board, col), col, piece)
+
+    searches = [
+        lambda v, g=None: minimax(board, 4, -math.inf, math.inf, True, AI_PIECE, v, graph=g),
+        lambda v, g=None: minimax_noprune(board, 3, True, AI_PIECE, v, graph=g),
+        lambda v, g=None: expectiminimax(board, 2, -math.inf, math.inf, True, AI_PIECE, v, graph=g),
+    ]
+    for search in searches:
+        clear_tables()
+        col, score, graph = search(False)
+        assert graph is None
+        clear_tables()
+        vcol, vscore, tree = search(True)
+        assert (vcol, vscore) == (col, score)
+        assert tree.score[0] == score and len(tree.children(0)) == 7
+
+        # With a warm table the root is still expanded; its children come from the cache
+        warm = search(True)[2]
+        assert len(warm.children(0)) == 7 and len(warm) < len(tree)
+        assert "cached" in {warm.node_type(n) for n in range(len(warm))}
+
+        clear_tables()
+        capped = TreeRecorder(max_nodes=20)
+        assert search(True, capped)[1] == score
+        assert len(capped) == 20 and capped.dropped > 0
@@ -0,0 +1,88 @@
+# File: tests/test_tree_visualizer.py
+import math
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+from models.ai.minimax import minimax, _transposition_table_ab
+from models.board import create_board
+from models.constants import AI_PIECE
+from utils.tree_visualizer import InteractiveTreeVisualizer
+
+
+@pytest.fixture
+def screen(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    yield pygame.display.set_mode((800, 600))
+    pygame.quit()
+
+
+def visualizer(screen, depth=3):
+    _transposition_table_ab.clear()
+    col, _, tree = minimax(create_board(), depth, -math.inf, math.inf, True, AI_PIECE, True)
+    return InteractiveTreeVisualizer(tree.to_networkx(), col, screen, 800, 600)
+
+
+def test_draw_only_when_dirty(screen):
+    vis = visualizer(screen)
+    vis.draw()
+    assert not vis.dirty
+    layout = vis.positions
+    vis.pan(50, 0)
+    assert vis.dirty
+    vis.draw()
+    assert vis.positions is layout  # panning keeps the layout
+
+
+def test_toggle_relayouts_only_the_changed_path(screen):
+    vis = visualizer(screen)
+    vis.draw()
+    child, sibling = vis.children[0][:2]
+    assert vis.children[child] and child in vis.widths and sibling in vis.widths
+
+    x, y = vis.positions[child]
+    assert vis.handle_click((x + vis.offset[0], y + vis.offset[1]))
+    assert child in vis.expanded_nodes and vis.positions is None
+    assert 0 not in vis.widths and child not in vis.widths
+    assert sibling in vis.widths  # a sibling subtree keeps its measurement
+    vis.draw()
+    assert set(vis.positions) == vis.get_visible_nodes()
+    assert set(vis.children[child]) <= set(vis.positions)
+
+
+def test_viewport_query_culls_offscreen_nodes(screen):
+    vis = visualizer(screen)
+    for n in vis.children[0]:
+        vis.toggle(n)
+    vis.layout()
+    view = pygame.Rect(-vis.offset[0], -vis.offset[1], vis.width, vis.height)
+    nodes, edges = vis.query(view)
+    onscreen = {n for n, rect in vis.rects.items() if rect.colliderect(view)}
+    assert onscreen <= nodes < set(vis.positions)
+    assert all(p in vis.positions and c in vis.positions for p, c in edges)
+
+
+def test_full_tree_exports_stream_in_tiles_and_svg(screen, tmp_path):
+    import json
+    import xml.etree.ElementTree as ET
+
+    vis = visualizer(screen)
+    for n in vis.children[0]:
+        vis.toggle(n)
+    left, top, width, height = vis.tree_bounds()
+
+    saved = vis.save_tiles(str(tmp_path), tile=512)
+    index = json.loads((tmp_path / "tiles.json").read_text())
+    assert index["width"] == width and index["tile"] == 512 and index["tiles"] == saved
+    assert len(saved) > 1
+    for entry in saved:  # the last row and column are cut to the tree's size
+        expected = (min(512, width - entry["col"] * 512), min(512, height - entry["row"] * 512))
+        assert pygame.image.load(str(tmp_path / entry["file"])).get_size() == expected
+
+    svg = ET.fromstring("".join(vis.iter_svg()))
+    ns = "{http://www.w3.org/2000/svg}"
+    shapes = svg.findall(f"{ns}ellipse") + svg.findall(f"{ns}rect")[1:]  # the first rect is the background
+    assert len(shapes) == len(vis.positions)
+    assert len(svg.findall(f"{ns}line")) == len(vis.positions) - 1
@@ -0,0 +1,246 @@
+"""
+Headless self-play arena.
+
+Plays games between two engine configurations without pygame and reports
+the score, an Elo difference and move latencies, so a speed change can be
+checked for playing strength.  An engine is written ``name[:key=value,...]``:
+
+    minimax:depth=5            alpha-beta (also batch=1, tactics=1)
+    noprune:depth=4            minimax without pruning
+    expectiminimax:depth=3     expectiminimax with Star1 chance nodes
+    pvs:depth=7                negamax PVS (also tactics=1)
+    iterative:time_ms=200      iterative deepening (engine=minimax|negamax, depth = cap)
+
+Every engine also takes ``strategy`` (default "combined").
+
+Each opening is played twice with the colours swapped.  Openings are
+either seeded random moves or the "book" suite: every position after
+``--opening-plies`` moves, one per mirror pair.  Games run on a process
+pool, and every finished game is appended to the JSONL file at once.
+The engines' transposition tables are cleared before every game.  Within
+a game, two configurations of the same engine share their table.
+
+    python -m utils.arena minimax:depth=4 pvs:depth=6 --games 40 --out arena.jsonl
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from models.bitboard import BitBoard, canonical_position_key
+from models.board import create_board, drop_piece, get_next_open_row, get_valid_locations, check_winner
+from models.constants import PLAYER_PIECE, AI_PIECE, COLUMN_COUNT
+from models.ai.minimax import minimax, _transposition_table_ab
+from models.ai import minimax_noprune as noprune_module
+from models.ai.minimax_noprune import minimax_noprune
+from models.ai.expectiminimax import expectiminimax, _transposition_table_em
+from models.ai.negamax import negamax, _transposition_table_pvs
+from models.ai.iterative import search
+from models.ai.endgame import _solved_table
+
+ENGINES = ("minimax", "noprune", "expectiminimax", "pvs", "iterative")
+
+
+def parse_engine(spec):
+    """``"pvs:depth=7,tactics=1"`` -> {"name": "pvs", "depth": 7, "tactics": True, ...} with defaults filled in."""
+    name, _, options = spec.partition(":")
+    if name not in ENGINES:
+        raise ValueError(f"unknown engine {name!r} (choose from {', '.join(ENGINES)})")
+    config = {"name": name, "depth": 4, "strategy": "combined", "time_ms": 1000, "tactics": False,
+              "batch": False, "engine": "minimax", "spec": spec}
+    for item in filter(None, options.split(",")):
+        key, _, value = item.partition("=")
+        if key not in config or key in ("name", "spec"):
+            raise ValueError(f"unknown option {key!r} in {spec!r}")
+        if isinstance(config[key], bool):
+            config[key] = value.lower() in ("1", "true", "on", "yes")
+        elif isinstance(config[key], int):
+            config[key] = int(value)
+        else:
+            config[key] = value
+    return config
+
+
+def choose_move(config, board, piece):
+    """(col, score) of ``config`` for ``piece`` to move on ``board``."""
+    name, depth, strategy = config["name"], config["depth"], config["strategy"]
+    if name == "minimax":
+        col, score, _ = minimax(board, depth, -math.inf, math.inf, True, piece, strategy=strategy,
+                                batch=config["batch"], tactics=config["tactics"])
+    elif name == "noprune":
+        col, score, _ = minimax_noprune(board, depth, True, piece, strategy=strategy)
+    elif name == "expectiminimax":
+        col, score, _ = expectiminimax(board, depth, -math.inf, math.inf, True, piece, strategy=strategy)
+    elif name == "pvs":
+        col, score, _ = negamax(board, depth, True, piece, strategy, tactics=config["tactics"])
+    else:
+        col, score, _ = search(board, time_limit_ms=config["time_ms"], max_depth=depth, piece=piece,
+                               strategy=strategy, engine=config["engine"], tactics=config["tactics"])
+    return col, score
+
+
+def clear_tables():
+    for table in (_transposition_table_ab, noprune_module._transposition_table, _transposition_table_em,
+                  _transposition_table_pvs, _solved_table):
+        table.clear()
+
+
+def play_game(index, a, b, a_first, opening):
+    """
+    Play ``opening`` (columns) and then engines ``a`` and ``b`` until the
+    board is full; ``a`` is the player ('1', moves first) when ``a_first``.
+    Returns the JSON-ready game record; "winner" is "a", "b" or None.
+    """
+    clear_tables()
+    first, second = (a, b) if a_first else (b, a)
+    board = create_board()
+    moves = []
+    engines = {PLAYER_PIECE: first, AI_PIECE: second}
+    piece = PLAYER_PIECE
+    for col in opening:
+        board = drop_piece(board, get_next_open_row(board, col), col, piece)
+        moves.append(col)
+        piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+
+    times = {PLAYER_PIECE: [], AI_PIECE: []}
+    while True:
+        valid = get_valid_locations(board)
+        if not valid:
+            break
+        start = time.perf_counter()
+        col, _ = choose_move(engines[piece], board, piece)
+        times[piece].append(round((time.perf_counter() - start) * 1000, 2))
+        if col not in valid:  # an engine that gives no legal move forfeits the choice
+            col = valid[0]
+        board = drop_piece(board, get_next_open_row(board, col), col, piece)
+        moves.append(col)
+        piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+
+    fours = check_winner(board)
+    a_piece, b_piece = (PLAYER_PIECE, AI_PIECE) if a_first else (AI_PIECE, PLAYER_PIECE)
+    if fours[a_piece] != fours[b_piece]:
+        winner = "a" if fours[a_piece] > fours[b_piece] else "b"
+    else:
+        winner = None
+    return {
+        "game": index, "a": a["spec"], "b": b["spec"], "a_first": a_first, "opening": list(opening),
+        "moves": moves, "fours": {"a": fours[a_piece], "b": fours[b_piece]}, "winner": winner,
+        "move_ms": {"a": times[a_piece], "b": times[b_piece]},
+    }
+
+
+def random_opening(rng, plies):
+    board, opening, piece = create_board(), [], PLAYER_PIECE
+    for _ in range(plies):
+        col = rng.choice(get_valid_locations(board))
+        board = drop_piece(board, get_next_open_row(board, col), col, piece)
+        opening.append(col)
+        piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+    return opening
+
+
+def opening_suite(plies):
+    """Every opening of ``plies`` moves, one per mirror pair, in a fixed order."""
+    seen, suite = set(), []
+    board = BitBoard()
+
+    def walk(line):
+        if len(line) == plies:
+            key, _ = canonical_position_key(board)
+            if key not in seen:
+                seen.add(key)
+                suite.append(list(line))
+            return
+        piece = PLAYER_PIECE if len(line) % 2 == 0 else AI_PIECE
+        for col in range(COLUMN_COUNT):
+            if board.can_play(col):
+                board.play(col, piece)
+                walk(line + [col])
+                board.undo()
+
+    walk([])
+    return suite
+
+
+def elo_difference(score):
+    """Elo of A over B from A's score fraction (clamped so 0% and 100% stay finite)."""
+    score = min(max(score, 1e-3), 1 - 1e-3)
+    return -400 * math.log10(1 / score - 1)
+
+
+def latency_summary(samples):
+    if not samples:
+        return {"moves": 0, "mean_ms": None, "p95_ms": None}
+    ordered = sorted(samples)
+    return {"moves": len(ordered), "mean_ms": round(sum(ordered) / len(ordered), 2),
+            "p95_ms": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]}
+
+
+def summarize(records, a, b):
+    """Totals from A's point of view plus each engine's move latency."""
+    wins = sum(r["winner"] == "a" for r in records)
+    losses = sum(r["winner"] == "b" for r in records)
+    draws = len(records) - wins - losses
+    score = (wins + 0.5 * draws) / len(records) if records else 0.5
+    return {
+        "games": len(records), "a": a["spec"], "b": b["spec"],
+        "wins": wins, "draws": draws, "losses": losses,
+        "score": round(score, 3), "elo": round(elo_difference(score), 1),
+        "latency": {side: latency_summary([ms for r in records for ms in r["move_ms"][side]])
+                    for side in ("a", "b")},
+    }
+
+
+def run_arena(a, b, games=20, workers=None, openings="random", opening_plies=2, seed=0, out=None):
+    """Play ``games`` games between configs ``a`` and ``b``; stream them to ``out`` and return the summary."""
+    if openings == "book":
+        suite = opening_suite(opening_plies)
+    else:
+        rng = random.Random(seed)
+        suite = [random_opening(rng, opening_plies) for _ in range((games + 1) // 2)]
+    # Each opening is played with both colour assignments
+    jobs = [(i, a, b, i % 2 == 0, suite[(i // 2) % len(suite)]) for i in range(games)]
+
+    records = []
+    sink = open(out, "w") if out else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for future in as_completed([pool.submit(play_game, *job) for job in jobs]):
+                record = future.result()
+                records.append(record)
+                if sink is not None:
+                    sink.write(json.dumps(record) + "\n")
+                    sink.flush()
+    finally:
+        if sink is not None:
+            sink.close()
+    records.sort(key=lambda r: r["game"])
+    return summarize(records, a, b)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play two engine configurations against each other")
+    parser.add_argument("a", help="engine A, e.g. minimax:depth=4")
+    parser.add_argument("b", help="engine B, e.g. pvs:depth=6,tactics=1")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=0, help="game processes (0 = one per CPU)")
+    parser.add_argument("--openings", choices=("random", "book"), default="random")
+    parser.add_argument("--opening-plies", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="", help="JSONL file receiving every game as it finishes")
+    args = parser.parse_args(argv)
+
+    a, b = parse_engine(args.a), parse_engine(args.b)
+    summary = run_arena(a, b, args.games, args.workers or None, args.openings, args.opening_plies,
+                        args.seed, args.out or None)
+    print(f"{summary['a']} vs {summary['b']}: +{summary['wins']} ={summary['draws']} -{summary['losses']} "
+          f"({summary['score'] * 100:.1f}%, Elo {summary['elo']:+.0f})")
+    for side, stats in summary["latency"].items():
+        print(f"  {summary[side]}: {stats['moves']} moves, mean {stats['mean_ms']} ms, p95 {stats['p95_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Synthetic load for controllers/analysis_server.py.
+
+Opens ``clients`` connections that each ask for ``requests`` analyses of
+random positions, keeping ``concurrency`` requests in flight per client.
+A share of the positions is drawn from a small common pool, the way real
+games share their openings, so the server's coalescing gets exercised.
+Prints throughput, client-side latency percentiles and the server's own
+metrics.
+
+    python utils/load_generator.py --clients 8 --requests 50 --time-ms 100
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from models.board import create_board, drop_piece, get_next_open_row, get_valid_locations
+from models.constants import PLAYER_PIECE, AI_PIECE, ROW_COUNT, COLUMN_COUNT
+
+
+def random_position(rng, plies):
+    """
+    Board after ``plies`` random moves (player first), rounded up to an odd
+    count so the AI ('2') is to move, as the server assumes.
+    """
+    board, piece = create_board(), PLAYER_PIECE
+    for _ in range(min(plies | 1, ROW_COUNT * COLUMN_COUNT - 1)):
+        col = rng.choice(get_valid_locations(board))
+        board = drop_piece(board, get_next_open_row(board, col), col, piece)
+        piece = AI_PIECE if piece == PLAYER_PIECE else PLAYER_PIECE
+    return board
+
+
+async def _client(host, port, boards, concurrency, time_ms, engine, latencies):
+    """Send ``boards`` on one connection with at most ``concurrency`` unanswered. Returns the error count."""
+    reader, writer = await asyncio.open_connection(host, port)
+    slots = asyncio.Semaphore(concurrency)
+    sent = {}
+
+    async def send_all():
+        for i, board in enumerate(boards):
+            await slots.acquire()
+            sent[i] = time.perf_counter()
+            writer.write((json.dumps({"id": i, "board": board, "engine": engine, "time_ms": time_ms}) + "\n").encode())
+            await writer.drain()
+
+    sender = asyncio.ensure_future(send_all())
+    errors = 0
+    for _ in boards:
+        message = json.loads(await reader.readline())
+        latencies.append((time.perf_counter() - sent.pop(message["id"])) * 1000)
+        errors += "error" in message
+        slots.release()
+    await sender
+    writer.close()
+    return errors
+
+
+async def run_load(host="127.0.0.1", port=8765, clients=8, requests=50, concurrency=4, time_ms=100,
+                   engine="negamax", shared=0.3, seed=0):
+    """Drive the server and return a summary dict (client-side latencies plus server metrics)."""
+    rng = random.Random(seed)
+    common = [random_position(rng, rng.randrange(2, 10)) for _ in range(8)]
+    jobs = [[rng.choice(common) if rng.random() < shared else random_position(rng, rng.randrange(2, 20))
+             for _ in range(requests)] for _ in range(clients)]
+    latencies = []
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(_client(host, port, boards, concurrency, time_ms, engine, latencies)
+                                    for boards in jobs))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"op": "metrics"}\n')
+    await writer.drain()
+    metrics = json.loads(await reader.readline())
+    writer.close()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies), "errors": sum(errors), "seconds": round(elapsed, 2),
+        "throughput": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2], 1) if latencies else None,
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 1) if latencies else None,
+        "server": metrics,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic load for the analysis server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=50, help="analyses per client")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight per client")
+    parser.add_argument("--time-ms", type=int, default=100)
+    parser.add_argument("--engine", default="negamax", choices=("minimax", "negamax"))
+    parser.add_argument("--shared", type=float, default=0.3, help="share of requests drawn from common positions")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    summary = asyncio.run(run_load(args.host, args.port, args.clients, args.requests, args.concurrency,
+                                   args.time_ms, args.engine, args.shared, args.seed))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
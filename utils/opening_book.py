@@ -0,0 +1,139 @@
+"""
+Opening book: precomputed AI moves for early positions.
+
+The book is built offline by searching every position the AI can face up
+to ``max_ply`` pieces.  It is stored as a sorted array of fixed-size
+records (position key, best move, value) behind a small header.  A
+position and its mirror image share one record under the smaller key, with
+the move stored for that orientation.  At startup the file is
+memory-mapped and binary-searched in place, so there is no parse step and
+lookups cost microseconds.
+
+Build one with:
+    python -m utils.opening_book --max-ply 5 --depth 7 --out assests/opening_book.bin
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+from functools import lru_cache
+
+from models.bitboard import BitBoard, canonical_position_key
+from models.constants import COLUMN_COUNT, PLAYER_PIECE, AI_PIECE, EMPTY
+from models.zobrist import oriented
+from models.ai.negamax import PVSSearch
+
+MAGIC = b"C4BOOK1\0"
+HEADER = struct.Struct("<8sII")   # magic, record count, search depth
+RECORD = struct.Struct("<QBi")    # position key, best column, value
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+DEFAULT_BOOK_PATH = os.path.join("assests", "opening_book.bin")
+
+
+class OpeningBook:
+    """Read-only, memory-mapped view of a book file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.depth = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not an opening book: {path}")
+
+    def _record(self, i):
+        return RECORD.unpack_from(self.mm, HEADER.size + i * RECORD.size)
+
+    def lookup(self, board):
+        """Return (col, value) for ``board`` with the AI to move, or None."""
+        key, mirrored = canonical_position_key(board)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key = self._record(mid)[0]
+            if mid_key < key:
+                lo = mid + 1
+            elif mid_key > key:
+                hi = mid
+            else:
+                _, col, value = self._record(mid)
+                return oriented(col, mirrored), value
+        return None
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.mm.close()
+
+
+@lru_cache(maxsize=None)
+def load_book(path=DEFAULT_BOOK_PATH):
+    """Open the book at ``path`` once per process; None if there is no book file."""
+    if not path or not os.path.exists(path):
+        return None
+    return OpeningBook(path)
+
+
+def ai_positions(max_ply):
+    """Positions with the AI to move and at most ``max_ply`` pieces (the player moves first), one per mirror pair."""
+    seen = set()
+    positions = []
+    board = BitBoard()
+
+    def walk():
+        plies = len(board.moves)
+        if plies % 2 == 1:
+            key, _ = canonical_position_key(board)
+            if key in seen:
+                return
+            seen.add(key)
+            positions.append(board.copy())
+        if plies == max_ply:
+            return
+        piece = PLAYER_PIECE if plies % 2 == 0 else AI_PIECE
+        for col in range(COLUMN_COUNT):
+            if board.can_play(col):
+                board.play(col, piece)
+                walk()
+                board.undo()
+
+    walk()
+    return positions
+
+
+def build_opening_book(path, max_ply=5, depth=7, verbose=True):
+    """Search every AI position up to ``max_ply`` pieces to ``depth`` plies and write the book."""
+    positions = ai_positions(max_ply)
+    searcher = PVSSearch(AI_PIECE)
+    records = []
+    start = time.time()
+    for i, board in enumerate(positions, 1):
+        col, value = searcher.search(board, min(depth, board.count(EMPTY)))
+        value = max(INT32_MIN, min(INT32_MAX, int(value)))
+        key, mirrored = canonical_position_key(board)
+        records.append((key, oriented(col, mirrored), value))
+        if verbose and i % 100 == 0:
+            print(f"{i}/{len(positions)} positions searched ({time.time() - start:.1f}s)")
+    records.sort()
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(records), depth))
+        for record in records:
+            f.write(RECORD.pack(*record))
+    os.replace(tmp, path)
+    if verbose:
+        print(f"Wrote {len(records)} positions to {path}")
+    return len(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the Connect 4 opening book")
+    parser.add_argument("--max-ply", type=int, default=5, help="deepest position (pieces on the board) to include")
+    parser.add_argument("--depth", type=int, default=7, help="search depth for every book position")
+    parser.add_argument("--out", default=DEFAULT_BOOK_PATH, help="output file")
+    args = parser.parse_args()
+    build_opening_book(args.out, args.max_ply, args.depth)
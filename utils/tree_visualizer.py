@@ -1,14 +1,35 @@
 import pygame
 from collections import deque
 import networkx as nx
-import os, datetime
+import os, datetime, json
+from xml.sax.saxutils import escape
+
+from models.ai.tree_recorder import TreeRecorder
 
 from pygame.locals import (
-    FULLSCREEN, RESIZABLE, VIDEORESIZE, MOUSEWHEEL,
+    FULLSCREEN, RESIZABLE, VIDEORESIZE, VIDEOEXPOSE, MOUSEWHEEL,
     KEYDOWN, K_f, K_LEFT, K_RIGHT, K_UP, K_DOWN
 )
 
+# Side of a spatial index cell, in tree pixels
+GRID_CELL = 256
+# Side of one exported PNG tile; a multiple of GRID_CELL keeps tile queries tight
+TILE_SIZE = 2048
+
+
 class InteractiveTreeVisualizer:
+    """
+    Pannable, click-to-expand view of a search tree.
+
+    The layout is kept between frames: subtree widths are cached and only a
+    toggled node and its ancestors are re-measured, the positions of the
+    visible nodes are rebuilt only when the expansion or window width
+    changes, and label text is rendered once per node.  Node rectangles and
+    edges are bucketed in a grid, so a frame draws only what is in the
+    viewport and a click tests only the nodes in one cell.  ``draw`` does
+    nothing until something marks the view dirty.
+    """
+
     def __init__(self, graph, best_move, screen, width, height):
         self.graph = graph
         self.best_move = best_move
@@ -28,8 +49,17 @@ class InteractiveTreeVisualizer:
         self.precompute_sizes()
         self.save_button_rect = None
 
+        self.widths = {}          # node -> width of its laid-out subtree
+        self.positions = None     # visible node -> (x, y); None when the layout must be rebuilt
+        self.rects = {}           # visible node -> its rectangle in tree coordinates
+        self.node_grid = {}       # grid cell -> nodes whose rectangle touches it
+        self.edge_grid = {}       # grid cell -> (parent, child) edges whose bounding box touches it
+        self.label_cache = {}     # node -> rendered label lines
+        self.dirty = True
+
     def precompute_children(self):
         self.children = {n: list(self.graph.successors(n)) for n in self.graph.nodes}
+        self.parents = {c: n for n, cs in self.children.items() for c in cs}
 
     def precompute_sizes(self):
         self.text_sizes = {n: self.font.size(str(lbl)) for n, lbl in self.labels.items()}
@@ -52,8 +82,10 @@ class InteractiveTreeVisualizer:
         return vis
 
     def compute_widths(self):
-        widths = {}
+        widths = self.widths
         def dfs(n):
+            if n in widths:
+                return widths[n]
             if n not in self.expanded_nodes or not self.children.get(n):
                 w, _ = self.node_dims.get(n, (self.h_spacing, 2*self.node_radius))
                 widths[n] = w
@@ -86,7 +118,87 @@ class InteractiveTreeVisualizer:
         dfs(0, root_x, 80)
         return pos
 
+    def toggle(self, n):
+        """Expand or collapse ``n``; only its subtree width and its ancestors' are re-measured."""
+        self.expanded_nodes ^= {n}
+        while n is not None:
+            self.widths.pop(n, None)
+            n = self.parents.get(n)
+        self.positions = None
+        self.dirty = True
+
+    def set_screen(self, screen):
+        self.screen = screen
+        self.width, self.height = screen.get_size()
+        self.positions = None  # the root is centred in the window
+        self.dirty = True
+
+    def pan(self, dx, dy):
+        self.offset[0] += dx
+        self.offset[1] += dy
+        self.dirty = True
+
+    @staticmethod
+    def _cells(rect):
+        for cx in range(rect.left // GRID_CELL, rect.right // GRID_CELL + 1):
+            for cy in range(rect.top // GRID_CELL, rect.bottom // GRID_CELL + 1):
+                yield cx, cy
+
+    def layout(self):
+        """Rebuild positions, rectangles and the spatial index if the layout changed."""
+        if self.positions is not None:
+            return
+        self.positions = self.assign_positions()
+        self.rects, self.node_grid, self.edge_grid = {}, {}, {}
+        for n, (x, y) in self.positions.items():
+            w, h = self.node_dims.get(n, (2*self.node_radius, 2*self.node_radius))
+            rect = pygame.Rect(int(x-w/2), int(y-h/2), int(w), int(h))
+            self.rects[n] = rect
+            for cell in self._cells(rect):
+                self.node_grid.setdefault(cell, []).append(n)
+            if n in self.expanded_nodes:
+                for c in self.children.get(n, []):
+                    (cx, cy) = self.positions[c]
+                    box = pygame.Rect(int(min(x, cx)), int(y), int(abs(cx - x)) + 1, int(cy - y) + 1)
+                    for cell in self._cells(box):
+                        self.edge_grid.setdefault(cell, []).append((n, c))
+
+    def query(self, view):
+        """Nodes and edges whose grid cells overlap ``view`` (a rect in tree coordinates)."""
+        nodes, edges = set(), set()
+        for cell in self._cells(view):
+            nodes.update(self.node_grid.get(cell, ()))
+            edges.update(self.edge_grid.get(cell, ()))
+        return nodes, edges
+
+    def label_lines(self, n):
+        lines = self.label_cache.get(n)
+        if lines is None:
+            lines = [self.font.render(ln, True, (0,0,0))
+                     for ln in str(self.labels.get(n,'')).split('\n')]
+            self.label_cache[n] = lines
+        return lines
+
+    def draw_node(self, surface, n, x, y):
+        w, h = self.node_dims.get(n, (2*self.node_radius,2*self.node_radius))
+        rect = pygame.Rect(int(x-w/2), int(y-h/2), int(w), int(h))
+        if self.types.get(n)=='chance':
+            pygame.draw.rect(surface, (255,215,0), rect)
+        elif self.types.get(n)=='cached':
+            pygame.draw.ellipse(surface, (200,200,200), rect)
+        else:
+            pygame.draw.ellipse(surface, (173,216,230), rect)
+
+        lh = self.font.get_linesize()
+        lines = self.label_lines(n)
+        start_y = y - len(lines)*lh/2 + lh/2
+        for i, txt in enumerate(lines):
+            surface.blit(txt, txt.get_rect(center=(x, start_y + i*lh)))
+
     def draw(self):
+        if not self.dirty:
+            return
+        self.layout()
         self.screen.fill((255, 255, 255))
 
         # Header & Save button
@@ -97,115 +209,116 @@ class InteractiveTreeVisualizer:
         btn = self.font.render("Save Full Tree", True, (255, 255, 255))
         self.screen.blit(btn, btn.get_rect(center=self.save_button_rect.center))
 
-        # Compute & pan positions
-        self.precompute_children(); self.precompute_sizes()
-        vis = self.get_visible_nodes()
-        raw_pos = self.assign_positions()
-        pos = {n: (raw_pos[n][0] + self.offset[0],
-                   raw_pos[n][1] + self.offset[1])
-               for n in raw_pos}
+        # Only what the viewport shows, in screen coordinates
+        ox, oy = self.offset
+        view = pygame.Rect(-ox, -oy, self.width, self.height)
+        nodes, edges = self.query(view)
+        pos = self.positions
 
-        # Draw edges
-        for n in vis:
-            if n in self.expanded_nodes:
-                for c in self.children.get(n, []):
-                    if c in vis:
-                        pygame.draw.line(self.screen, (0,0,0),
-                                         pos[n], pos[c], 2)
+        for n, c in edges:
+            (x1, y1), (x2, y2) = pos[n], pos[c]
+            pygame.draw.line(self.screen, (0,0,0), (x1+ox, y1+oy), (x2+ox, y2+oy), 2)
 
-        # Draw nodes
-        lh = self.font.get_linesize()
-        for n in vis:
+        for n in nodes:
             x, y = pos[n]
-            w, h = self.node_dims.get(n, (2*self.node_radius,2*self.node_radius))
-            rect = pygame.Rect(int(x-w/2), int(y-h/2), int(w), int(h))
-            if self.types.get(n)=='chance':
-                pygame.draw.rect(self.screen, (255,215,0), rect)
-            else:
-                pygame.draw.ellipse(self.screen, (173,216,230), rect)
-
-            lines = str(self.labels.get(n,'')).split('\n')
-            total_h = len(lines)*lh
-            start_y = y - total_h/2 + lh/2
-            for i, ln in enumerate(lines):
-                txt = self.font.render(ln, True, (0,0,0))
-                self.screen.blit(txt, txt.get_rect(center=(x, start_y + i*lh)))
+            self.draw_node(self.screen, n, x+ox, y+oy)
 
         pygame.display.flip()
+        self.dirty = False
 
     def handle_click(self, mouse_pos):
         # convert click to tree coordinates
-        raw_click = (mouse_pos[0] - self.offset[0],
-                     mouse_pos[1] - self.offset[1])
-        raw_pos = self.assign_positions()
-        for n in self.get_visible_nodes():
-            x, y = raw_pos[n]
+        self.layout()
+        cx, cy = (mouse_pos[0] - self.offset[0],
+                  mouse_pos[1] - self.offset[1])
+        for n in self.node_grid.get((int(cx) // GRID_CELL, int(cy) // GRID_CELL), ()):
+            x, y = self.positions[n]
             w, h = self.node_dims.get(n, (2*self.node_radius,2*self.node_radius))
-            if (x - raw_click[0])**2 + (y - raw_click[1])**2 < (max(w,h)/2)**2:
-                if n in self.expanded_nodes:
-                    self.expanded_nodes.remove(n)
-                else:
-                    self.expanded_nodes.add(n)
+            if (x - cx)**2 + (y - cy)**2 < (max(w,h)/2)**2:
+                self.toggle(n)
                 return True
         return False
 
-    def render_full_tree_surface(self):
-        # fully draw all visible nodes/edges on a big surface
-        pos = self.assign_positions()
-        xs = [p[0] for p in pos.values()]
-        ys = [p[1] for p in pos.values()]
-        m = 50
-        surf_w = int(max(xs) - min(xs) + 2*m)
-        surf_h = int(max(ys) - min(ys) + 2*m)
-        surf = pygame.Surface((surf_w, surf_h))
-        surf.fill((255,255,255))
-
-        off_min = (min(xs), min(ys))
-        new_pos = {
-            n: (pos[n][0] - off_min[0] + m,
-                pos[n][1] - off_min[1] + m)
-            for n in pos
-        }
-        vis = self.get_visible_nodes()
-
-        # edges
-        for n in vis:
+    def tree_bounds(self, margin=50):
+        """(left, top, width, height) of the laid-out tree plus ``margin`` on every side."""
+        self.layout()
+        box = pygame.Rect(self.rects[0]).unionall(list(self.rects.values()))
+        return box.left - margin, box.top - margin, box.width + 2*margin, box.height + 2*margin
+
+    def save_tiles(self, directory, tile=TILE_SIZE):
+        """
+        Render the full tree as ``tile`` x ``tile`` PNGs named tile_<row>_<col>.png
+        (the last row and column are cut to the tree's size).  One tile
+        surface is reused, so memory does not grow with the tree; tiles with
+        nothing on them are skipped and tiles.json lists the rest.
+        """
+        left, top, width, height = self.tree_bounds()
+        os.makedirs(directory, exist_ok=True)
+        surf = pygame.Surface((min(tile, width), min(tile, height)))
+        saved = []
+        for row in range(-(-height // tile)):
+            for col in range(-(-width // tile)):
+                ox, oy = left + col*tile, top + row*tile
+                nodes, edges = self.query(pygame.Rect(ox, oy, tile, tile))
+                if not nodes and not edges:
+                    continue
+                surf.fill((255,255,255))
+                for n, c in edges:
+                    (x1, y1), (x2, y2) = self.positions[n], self.positions[c]
+                    pygame.draw.line(surf, (0,0,0), (x1-ox, y1-oy), (x2-ox, y2-oy), 2)
+                for n in nodes:
+                    x, y = self.positions[n]
+                    self.draw_node(surf, n, x-ox, y-oy)
+                name = f"tile_{row}_{col}.png"
+                size = (min(tile, width - col*tile), min(tile, height - row*tile))
+                pygame.image.save(surf.subsurface((0, 0) + size), os.path.join(directory, name))
+                saved.append({"row": row, "col": col, "file": name})
+        with open(os.path.join(directory, "tiles.json"), "w") as f:
+            json.dump({"width": width, "height": height, "tile": tile, "tiles": saved}, f, indent=1)
+        return saved
+
+    def iter_svg(self):
+        """The full tree as SVG text, one element at a time."""
+        left, top, width, height = self.tree_bounds()
+        pos = self.positions
+        lh = self.font.get_linesize()
+        yield (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+               f'viewBox="{left} {top} {width} {height}" font-family="sans-serif" font-size="16">\n')
+        yield f'<rect x="{left}" y="{top}" width="{width}" height="{height}" fill="white"/>\n'
+        for n in pos:
             if n in self.expanded_nodes:
                 for c in self.children.get(n, []):
-                    if c in vis:
-                        pygame.draw.line(surf, (0,0,0),
-                                         new_pos[n], new_pos[c], 2)
-
-        # nodes
-        lh = self.font.get_linesize()
-        for n in vis:
-            x, y = new_pos[n]
+                    (x1, y1), (x2, y2) = pos[n], pos[c]
+                    yield f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="black" stroke-width="2"/>\n'
+        for n, (x, y) in pos.items():
             w, h = self.node_dims.get(n, (2*self.node_radius,2*self.node_radius))
-            rect = pygame.Rect(int(x-w/2), int(y-h/2), int(w), int(h))
-            if self.types.get(n)=='chance':
-                pygame.draw.rect(surf, (255,215,0), rect)
+            kind = self.types.get(n)
+            if kind == 'chance':
+                yield f'<rect x="{x-w/2}" y="{y-h/2}" width="{w}" height="{h}" fill="#ffd700"/>\n'
             else:
-                pygame.draw.ellipse(surf, (173,216,230), rect)
-
+                fill = "#c8c8c8" if kind == 'cached' else "#add8e6"
+                yield f'<ellipse cx="{x}" cy="{y}" rx="{w/2}" ry="{h/2}" fill="{fill}"/>\n'
             lines = str(self.labels.get(n,'')).split('\n')
-            total_h = len(lines)*lh
-            start_y = y - total_h/2 + lh/2
-            for i, ln in enumerate(lines):
-                txt = self.font.render(ln, True, (0,0,0))
-                surf.blit(txt, txt.get_rect(center=(x, start_y + i*lh)))
-
-        return surf
+            start_y = y - len(lines)*lh/2 + lh/2
+            spans = "".join(f'<tspan x="{x}" y="{start_y + i*lh}">{escape(ln)}</tspan>'
+                            for i, ln in enumerate(lines))
+            yield f'<text text-anchor="middle" dominant-baseline="central">{spans}</text>\n'
+        yield '</svg>\n'
 
     def save_as_image(self):
-        surf = self.render_full_tree_surface()
+        # Streamed: neither export holds more than one tile of pixels, however big the tree
         d = os.path.join(os.getcwd(), 'saved_images')
         os.makedirs(d, exist_ok=True)
-        fname = os.path.join(d, f"tree_vis_{datetime.datetime.now():%Y%m%d_%H%M%S}.png")
-        pygame.image.save(surf, fname)
-        print(f"Saved: {fname}")
+        stem = os.path.join(d, f"tree_vis_{datetime.datetime.now():%Y%m%d_%H%M%S}")
+        with open(stem + ".svg", "w") as f:
+            f.writelines(self.iter_svg())
+        self.save_tiles(stem + "_tiles")
+        print(f"Saved: {stem}.svg and {stem}_tiles/")
 
 
 def draw_graph_process(graph, best_move):
+    if isinstance(graph, TreeRecorder):  # the engines record compactly; networkx only for drawing
+        graph = graph.to_networkx()
     pygame.init()
     width, height = 1200, 800
     fullscreen = False
@@ -228,34 +341,35 @@ def draw_graph_process(graph, best_move):
                         screen = pygame.display.set_mode((0,0), FULLSCREEN)
                     else:
                         screen = pygame.display.set_mode((1200,800), RESIZABLE)
-                    vis.screen = screen
-                    vis.width, vis.height = screen.get_size()
+                    vis.set_screen(screen)
 
                 elif ev.key == K_LEFT:
-                    vis.offset[0] += vis.pan_speed
+                    vis.pan(vis.pan_speed, 0)
                 elif ev.key == K_RIGHT:
-                    vis.offset[0] -= vis.pan_speed
+                    vis.pan(-vis.pan_speed, 0)
                 elif ev.key == K_UP:
-                    vis.offset[1] += vis.pan_speed
+                    vis.pan(0, vis.pan_speed)
                 elif ev.key == K_DOWN:
-                    vis.offset[1] -= vis.pan_speed
+                    vis.pan(0, -vis.pan_speed)
 
             elif ev.type == VIDEORESIZE:
                 width, height = ev.size
                 screen = pygame.display.set_mode((width, height), RESIZABLE)
-                vis.screen, vis.width, vis.height = screen, width, height
+                vis.set_screen(screen)
+
+            elif ev.type == VIDEOEXPOSE:
+                vis.dirty = True
 
             elif ev.type == MOUSEWHEEL:
-                vis.offset[0] += ev.x * vis.pan_speed
-                vis.offset[1] += ev.y * vis.pan_speed
+                vis.pan(ev.x * vis.pan_speed, ev.y * vis.pan_speed)
 
             elif ev.type == pygame.MOUSEBUTTONDOWN and ev.button == 1:
                 if vis.save_button_rect and vis.save_button_rect.collidepoint(ev.pos):
                     vis.save_as_image()
-                elif vis.handle_click(ev.pos):
-                    vis.draw()
+                else:
+                    vis.handle_click(ev.pos)
 
-        vis.draw()
+        vis.draw()  # a no-op unless something changed
         clock.tick(30)
 
     pygame.quit()
@@ -29,3 +29,12 @@ def print_board(board):
     print("\nBoard State:")
     for row in range(rows-1, -1, -1):
         print(" ".join(board_array[row]))
+
+def draw_thinking(screen, width, frame):
+    # Animated "AI is thinking" indicator in the top bar while the search runs.
+    pygame.draw.rect(screen, BLACK, (0, 0, width, SQUARESIZE))
+    font = pygame.font.SysFont("monospace", 40)
+    dots = "." * (frame // 10 % 4)
+    label = font.render(f"AI is thinking{dots}", True, YELLOW)
+    screen.blit(label, (20, SQUARESIZE // 2 - label.get_height() // 2))
+    pygame.display.update()
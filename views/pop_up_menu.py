@@ -1,15 +1,48 @@
+import os
+import socket
 import subprocess
+import tempfile
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import PhotoImage
 
+from models.ai.persistent_cache import DEFAULT_CACHE_PATH
+
+# One engine service per menu session: games connect to it, so the engines and their caches stay loaded
+ENGINE_SOCKET = os.path.join(tempfile.gettempdir(), f"connect4-engine-{os.getpid()}.sock")
+engine_process = None
+
+def engine_socket():
+    """Path of the session's engine service, started on first use; None where Unix sockets are missing."""
+    global engine_process
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    if engine_process is None or engine_process.poll() is not None:
+        engine_process = subprocess.Popen(["python", "controllers/engine_service.py", "--socket", ENGINE_SOCKET])
+    return ENGINE_SOCKET
+
 def exit_program(window):
+    if engine_process is not None:
+        engine_process.terminate()
+        engine_process.wait()
+        if os.path.exists(ENGINE_SOCKET):
+            os.unlink(ENGINE_SOCKET)
     window.destroy()
 
-def button_clicked(mode, window, depth, visualize):
-    exit_program(window)
-    args = ["python", "controllers/game_controller.py", str(mode), str(depth), str(int(visualize))]
+def button_clicked(mode, window, depth, visualize, time_ms, parallel, ponder, cache):
+    window.withdraw()
+    workers = min(7, os.cpu_count() or 1) if parallel else 0
+    args = ["python", "controllers/game_controller.py", str(mode), str(depth), str(int(visualize)),
+            "--time-ms", str(time_ms), "--workers", str(workers)]
+    if ponder:
+        args.append("--ponder")
+    if cache:
+        args += ["--cache", DEFAULT_CACHE_PATH]
+    path = None if visualize else engine_socket()  # the tree visualizer needs an in-process search
+    if path is not None:
+        args += ["--engine", path]
     subprocess.run(args)
+    window.deiconify()  # back to the menu for the next game
 
 def main_menu():
     style = ttk.Style(theme="morph")
@@ -47,6 +80,7 @@ def main_menu():
     window.title("Connect 4")
     window.geometry("800x750")
     window.resizable(False, False)
+    window.protocol("WM_DELETE_WINDOW", lambda: exit_program(window))
 
     # Canvas setup
     canvas = ttk.Canvas(window, width=800, height=750)
@@ -71,7 +105,7 @@ def main_menu():
         canvas.create_window(400, 120, window=header)
 
     # Depth input with spacing
-    depth_container_y = 230
+    depth_container_y = 215
     depth_label = ttk.Label(window, text="Search Depth:")
     canvas.create_window(330, depth_container_y, window=depth_label)
 
@@ -86,31 +120,69 @@ def main_menu():
     depth_var.bind("<FocusIn>", clear_default)
     canvas.create_window(470, depth_container_y, window=depth_var)
 
+    # Time budget input (used by iterative deepening)
+    time_container_y = 270
+    time_label = ttk.Label(window, text="Time (ms):")
+    canvas.create_window(330, time_container_y, window=time_label)
+
+    time_var = ttk.Entry(window, width=5, style="Cloud.TEntry", justify='center')
+    time_var.configure(font=("Arial", 18, "bold"), foreground="darkblue")
+    time_var.insert(0, '1000')
+    canvas.create_window(470, time_container_y, window=time_var)
+
     # Tree Visualizer checkbox
     visualize_var = ttk.IntVar(value=0)
     visualize_cb = ttk.Checkbutton(window, text="Show Tree Visualizer",
                                    variable=visualize_var, style="Cloud.TCheckbutton")
-    canvas.create_window(400, 300, window=visualize_cb)
+    canvas.create_window(250, 320, window=visualize_cb)
+
+    # Persistent search cache checkbox (deep results are kept on disk between games)
+    cache_var = ttk.IntVar(value=0)
+    cache_cb = ttk.Checkbutton(window, text="Keep Cache",
+                               variable=cache_var, style="Cloud.TCheckbutton")
+    canvas.create_window(550, 320, window=cache_cb)
+
+    # Parallel root search checkbox (minimax with pruning and expectiminimax)
+    parallel_var = ttk.IntVar(value=0)
+    parallel_cb = ttk.Checkbutton(window, text="Parallel Search",
+                                  variable=parallel_var, style="Cloud.TCheckbutton")
+    canvas.create_window(250, 365, window=parallel_cb)
+
+    # Pondering checkbox (search the player's replies during the player's turn)
+    ponder_var = ttk.IntVar(value=0)
+    ponder_cb = ttk.Checkbutton(window, text="Ponder",
+                                variable=ponder_var, style="Cloud.TCheckbutton")
+    canvas.create_window(550, 365, window=ponder_cb)
 
     # Algorithm buttons with unified styling
-    button_y_start = 380
-    button_spacing = 80
+    button_y_start = 425
+    button_spacing = 70
 
     btn_prune = ttk.Button(window, text="Minimax with Pruning",
                            style="Algorithm.TButton",
-                           command=lambda: button_clicked(1, window, depth_var.get(), visualize_var.get()))
+                           command=lambda: button_clicked(1, window, depth_var.get(), visualize_var.get(), time_var.get(), parallel_var.get(), ponder_var.get(), cache_var.get()))
     canvas.create_window(400, button_y_start, window=btn_prune)
 
     btn_no_prune = ttk.Button(window, text="Minimax without Pruning",
                               style="Algorithm.TButton",
-                              command=lambda: button_clicked(2, window, depth_var.get(), visualize_var.get()))
+                              command=lambda: button_clicked(2, window, depth_var.get(), visualize_var.get(), time_var.get(), parallel_var.get(), ponder_var.get(), cache_var.get()))
     canvas.create_window(400, button_y_start + button_spacing, window=btn_no_prune)
 
     btn_expectimax = ttk.Button(window, text="Expectiminimax",
                                 style="Algorithm.TButton",
-                                command=lambda: button_clicked(3, window, depth_var.get(), visualize_var.get()))
+                                command=lambda: button_clicked(3, window, depth_var.get(), visualize_var.get(), time_var.get(), parallel_var.get(), ponder_var.get(), cache_var.get()))
     canvas.create_window(400, button_y_start + 2*button_spacing, window=btn_expectimax)
 
+    btn_iterative = ttk.Button(window, text="Iterative Deepening (timed)",
+                               style="Algorithm.TButton",
+                               command=lambda: button_clicked(4, window, depth_var.get(), visualize_var.get(), time_var.get(), parallel_var.get(), ponder_var.get(), cache_var.get()))
+    canvas.create_window(400, button_y_start + 3*button_spacing, window=btn_iterative)
+
+    btn_pvs = ttk.Button(window, text="Negamax PVS",
+                         style="Algorithm.TButton",
+                         command=lambda: button_clicked(5, window, depth_var.get(), visualize_var.get(), time_var.get(), parallel_var.get(), ponder_var.get(), cache_var.get()))
+    canvas.create_window(400, button_y_start + 4*button_spacing, window=btn_pvs)
+
     window.mainloop()
 
 if __name__ == '__main__':